@@ -0,0 +1,122 @@
+"""
+Benchmark: single-pass cue automaton vs. the per-cue find_all loop.
+
+Builds synthetic ~10k-word notes seeded with the shipped cues and times the
+original loop, the forced automaton scan and the default engine (which picks
+one or the other by cue count) on them, first with the shipped cue lists,
+then with enlarged cue sets (thousands of cues) to show how each scales.
+
+Usage:
+    python benchmarks/bench_cue_matcher.py [--words 10000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from dundieplz.extract.cue_engine import CueAutomaton, find_all  # noqa: E402
+from dundieplz.extract.llm_client import (  # noqa: E402
+    AMBIGUOUS_CUES,
+    CONTEXTUAL_CUES,
+    SUBJECTIVE_CUES,
+)
+
+FILLER = (
+    "patient reports sleep appetite mood family history denies allergies "
+    "the and with for was on in to of at by from after before during "
+    "medication dose daily review follow up plan assessment status"
+).split()
+
+
+def build_note(words: int, cues: Sequence[str], cue_rate: float, seed: int) -> str:
+    rng = random.Random(seed)
+    out: List[str] = []
+    while len(out) < words:
+        if rng.random() < cue_rate:
+            out.extend(rng.choice(cues).split())
+        else:
+            out.append(rng.choice(FILLER))
+    return " ".join(out)
+
+
+def synthetic_cues(n: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(FILLER) for _ in range(rng.randint(3, 6))) + f" x{i}" for i in range(n)]
+
+
+def loop_match(lower: str, cue_sets: Dict[str, Sequence[str]]) -> Dict[str, List[Tuple[str, list]]]:
+    # Mirrors the original Extractor._match_cues loop.
+    result: Dict[str, List[Tuple[str, list]]] = {}
+    for category, cues in cue_sets.items():
+        hits = []
+        for cue in cues:
+            spans = find_all(lower, cue.lower())
+            if spans:
+                hits.append((cue, spans))
+        result[category] = hits
+    return result
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(label: str, cue_sets: Dict[str, Sequence[str]], words: int, repeat: int) -> None:
+    all_cues = [c for cues in cue_sets.values() for c in cues]
+    lower = build_note(words, all_cues, cue_rate=0.02, seed=42).lower()
+
+    t0 = time.perf_counter()
+    automaton = CueAutomaton(cue_sets, min_automaton_needles=0)
+    build_s = time.perf_counter() - t0
+    engine = CueAutomaton(cue_sets)
+
+    expected = loop_match(lower, cue_sets)
+    assert automaton.scan(lower) == expected, "automaton output differs"
+    assert engine.scan(lower) == expected, "engine output differs"
+
+    loop_s = best_of(lambda: loop_match(lower, cue_sets), repeat)
+    ac_s = best_of(lambda: automaton.scan(lower), repeat)
+    engine_s = best_of(lambda: engine.scan(lower), repeat)
+
+    print(
+        f"{label:<22} cues={len(all_cues):>5} chars={len(lower):>7} "
+        f"loop={loop_s * 1e3:8.2f} ms  automaton={ac_s * 1e3:8.2f} ms "
+        f"(build {build_s * 1e3:6.1f} ms)  "
+        f"engine[{'automaton' if engine.uses_automaton else 'find'}]={engine_s * 1e3:8.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--words", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    shipped = {
+        "contextual": CONTEXTUAL_CUES,
+        "subjective": SUBJECTIVE_CUES,
+        "ambiguous": AMBIGUOUS_CUES,
+    }
+    run("shipped cue lists", shipped, args.words, args.repeat)
+
+    for n in (100, 200, 500, 2000, 5000):
+        enlarged = dict(shipped)
+        enlarged["contextual"] = list(CONTEXTUAL_CUES) + synthetic_cues(n, seed=n)
+        run(f"shipped + {n} cues", enlarged, args.words, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
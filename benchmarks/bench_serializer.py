@@ -0,0 +1,89 @@
+"""
+Benchmark: ResultSerializer vs. model_dump(mode="json") + json.dumps.
+
+Extracts a batch of synthetic notes once, then times how fast each path
+turns the results into JSONL bytes: the old two-pass route, pydantic's
+model_dump_json, and ResultSerializer with each available backend (full
+and compact), from ExtractionResult models and from ResultRecords.
+
+Usage:
+    python benchmarks/bench_serializer.py [--docs 2000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Sequence
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from dundieplz.extract import serializer as serializer_module  # noqa: E402
+from dundieplz.extract.extractor import Extractor  # noqa: E402
+from dundieplz.extract.llm_client import CONTEXTUAL_CUES, SUBJECTIVE_CUES  # noqa: E402
+from dundieplz.extract.rule_llm_client import RuleLLMClient  # noqa: E402
+from dundieplz.extract.serializer import ResultSerializer  # noqa: E402
+
+PHRASES = [
+    "Patient reports poor sleep.",
+    "I want to die.",
+    "Denies suicidal ideation.",
+    "Overdose last night, brought by ambulance.",
+    "Left a note for the family.",
+    "Follow up next week.",
+] + [c + "." for c in CONTEXTUAL_CUES + SUBJECTIVE_CUES]
+
+
+def build_notes(n: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(PHRASES) for _ in range(rng.randint(3, 12))) for _ in range(n)]
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def report(label: str, seconds: float, docs: int, nbytes: int) -> None:
+    print(f"{label:<34} {docs / seconds:>10,.0f} docs/s  {nbytes / seconds / 1e6:>8.1f} MB/s  {nbytes / docs:>7.0f} B/doc")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    extractor = Extractor(llm_client=RuleLLMClient())
+    notes = build_notes(args.docs)
+    models = [extractor.extract(t) for t in notes]
+    records = [extractor.extract_record(t) for t in notes]
+
+    def run(label: str, items: Sequence[object], dump: Callable[[object], bytes]) -> None:
+        nbytes = sum(len(dump(x)) + 1 for x in items)
+        seconds = best_of(lambda: b"\n".join(dump(x) for x in items), args.repeat)
+        report(label, seconds, len(items), nbytes)
+
+    run("model_dump + json.dumps", models, lambda m: json.dumps(m.model_dump(mode="json")).encode("utf-8"))
+    run("model_dump_json", models, lambda m: m.model_dump_json().encode("utf-8"))
+
+    backends = ["auto", "json", "pydantic"] + (["orjson"] if serializer_module.orjson is not None else [])
+    for backend in backends:
+        for compact in (False, True):
+            ser = ResultSerializer(compact=compact, backend=backend)
+            tag = f"{backend}{' compact' if compact else ''}"
+            run(f"serializer[{tag}] models", models, ser.dumps)
+            run(f"serializer[{tag}] records", records, ser.dumps)
+
+
+if __name__ == "__main__":
+    main()
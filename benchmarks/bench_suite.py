@@ -0,0 +1,334 @@
+"""
+Benchmark suite: throughput, latency and memory of each extraction stage.
+
+Generates synthetic notes at several sizes and cue densities from the
+shipped synthetic cases (gui_app.SYNTHETIC_CASES when the GUI dependencies
+are installed, data/Synth_Case_1.json always), then measures, each on its
+own and each in a fresh subprocess:
+
+    dummy      DummyLLMClient.generate_json
+    rules      RuleLLMClient.generate_json
+    cues       the cue matcher (Extractor._match_cues on a prepared note)
+    serialize  ResultSerializer.dumps on a ResultRecord
+
+For every (stage, size, density) cell it reports docs/s, MB/s, p50/p95/p99
+latency and peak RSS, and writes everything as JSON. With --compare, the
+run is checked against an earlier results file and the exit status is 1
+when any cell got slower than --tolerance allows.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 1KB,10KB,100KB,1MB]
+        [--densities low,medium,high] [--stages dummy,rules,cues,serialize]
+        [--docs 50] [--budget 4MB] [--out bench_results.json]
+        [--compare baseline.json] [--tolerance 0.25]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+SCHEMA_VERSION = 1
+STAGES = ("dummy", "rules", "cues", "serialize")
+DENSITIES = {"low": 0.02, "medium": 0.1, "high": 0.3}
+DEFAULT_SIZES = "1KB,10KB,100KB,1MB"
+
+# Sentences without any cue; everything else comes from the synthetic cases.
+FILLER = [
+    "Patient reports poor sleep and reduced appetite over the last weeks.",
+    "Vital signs stable, afebrile, normotensive.",
+    "Medication reconciliation performed with the pharmacist.",
+    "Follow-up arranged with the outpatient team.",
+    "Laboratory results within normal limits.",
+    "Family members were present during the interview.",
+    "No acute distress observed at the time of evaluation.",
+    "Discussed sleep hygiene and daily routine.",
+]
+
+_SENTENCE_RE = re.compile(r"[^.!?\n]+[.!?]?")
+
+
+# -----------------------------
+# Corpus
+# -----------------------------
+
+def parse_size(value: str) -> int:
+    m = re.fullmatch(r"\s*(\d+)\s*([KM]?B?)\s*", value.upper())
+    if m is None:
+        raise argparse.ArgumentTypeError(f"bad size: {value!r}")
+    return int(m.group(1)) * {"": 1, "B": 1, "K": 1024, "KB": 1024, "M": 1 << 20, "MB": 1 << 20}[m.group(2)]
+
+
+def case_texts() -> List[str]:
+    texts: List[str] = []
+    try:
+        from dundieplz.gui_app import SYNTHETIC_CASES
+    except ImportError:  # streamlit not installed
+        pass
+    else:
+        texts.extend(case["text"] for case in SYNTHETIC_CASES.values())
+    cases = json.loads((project_root / "data" / "Synth_Case_1.json").read_text(encoding="utf-8"))
+    texts.extend(case["text"] for case in cases)
+    return list(dict.fromkeys(texts))
+
+
+def cue_sentences() -> List[str]:
+    """
+    Sentences of the synthetic cases plus the shipped cues, as sentences.
+    """
+    from dundieplz.extract.packs import all_packs
+
+    out = [m.group().strip() for text in case_texts() for m in _SENTENCE_RE.finditer(text)]
+    out += [cue + "." for cues in all_packs().cues.values() for cue in cues]
+    return [s for s in dict.fromkeys(out) if len(s) > 3]
+
+
+def build_note(size: int, density: float, sentences: Sequence[str], seed: int) -> str:
+    rng = random.Random(seed)
+    parts: List[str] = []
+    length = 0
+    while length < size:
+        sentence = rng.choice(sentences) if rng.random() < density else rng.choice(FILLER)
+        parts.append(sentence)
+        length += len(sentence) + 1
+        if rng.random() < 0.1:
+            parts.append("\n")
+    return " ".join(parts)[:size]
+
+
+# -----------------------------
+# Measurement (runs in a subprocess per cell)
+# -----------------------------
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """
+    Nearest-rank percentile of `samples` (q in [0, 100]).
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def stage_runner(stage: str, notes: Sequence[str]) -> Callable[[int], object]:
+    """
+    Prepares everything the stage needs outside the timed region and
+    returns the timed call (index of the note -> result).
+    """
+    from dundieplz.extract.extractor import Extractor
+    from dundieplz.extract.llm_client import DummyLLMClient
+    from dundieplz.extract.packs import packs_for
+    from dundieplz.extract.preprocess import _build_document
+    from dundieplz.extract.rule_llm_client import RuleLLMClient
+    from dundieplz.extract.serializer import ResultSerializer
+
+    if stage == "dummy":
+        client = DummyLLMClient()
+        return lambda i: client.generate_json(notes[i])
+    if stage == "rules":
+        client = RuleLLMClient()
+        return lambda i: client.generate_json(notes[i])
+    if stage == "cues":
+        extractor = Extractor(llm_client=DummyLLMClient())
+        docs = [_build_document(t) for t in notes]
+        routed = [packs_for(doc) for doc in docs]  # language id happens here, untimed
+        return lambda i: extractor._match_cues(docs[i], routed[i])
+    if stage == "serialize":
+        extractor = Extractor(llm_client=RuleLLMClient())
+        records = [extractor.extract_record(t) for t in notes]
+        serializer = ResultSerializer()
+        return lambda i: serializer.dumps(records[i])
+    raise ValueError(f"unknown stage {stage!r}")
+
+
+def measure(spec: Dict) -> Dict:
+    sentences = cue_sentences()
+    notes = [
+        build_note(spec["size"], DENSITIES[spec["density"]], sentences, seed=spec["seed"] + i)
+        for i in range(spec["docs"])
+    ]
+    run = stage_runner(spec["stage"], notes)
+    run(0)  # warm-up: packs, matchers, language model
+    rss_before = peak_rss_mb()
+
+    # Notes alternate, so the per-thread Document memo never hits.
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for _ in range(spec["repeat"]):
+        for i in range(len(notes)):
+            t0 = time.perf_counter()
+            run(i)
+            latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - start
+
+    nbytes = sum(len(n.encode("utf-8")) for n in notes) * spec["repeat"]
+    return {
+        **{k: spec[k] for k in ("stage", "size", "density", "docs", "repeat")},
+        "docs_per_sec": len(latencies) / total,
+        "mb_per_sec": nbytes / total / 1e6,
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1e3,
+            "p95": percentile(latencies, 95) * 1e3,
+            "p99": percentile(latencies, 99) * 1e3,
+            "max": max(latencies) * 1e3,
+        },
+        "rss_mb": {"setup": rss_before, "peak": peak_rss_mb()},
+    }
+
+
+def run_cell(spec: Dict) -> Dict:
+    # One interpreter per cell: peak RSS belongs to that cell alone.
+    proc = subprocess.run(
+        [sys.executable, __file__, "--cell", json.dumps(spec)],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"benchmark cell {spec} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout)
+
+
+# -----------------------------
+# Report / regression check
+# -----------------------------
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=project_root, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+    }
+
+
+def cell_id(result: Dict) -> str:
+    return f"{result['stage']}/{result['size']}/{result['density']}"
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Cells whose throughput fell or whose p95 latency rose by more than
+    `tolerance` (a fraction) against the baseline run.
+    """
+    before = {cell_id(r): r for r in baseline.get("results", [])}
+    problems: List[str] = []
+    for result in current["results"]:
+        old = before.get(cell_id(result))
+        if old is None:
+            continue
+        if result["docs_per_sec"] < old["docs_per_sec"] * (1 - tolerance):
+            problems.append(
+                f"{cell_id(result)}: {result['docs_per_sec']:,.1f} docs/s (was {old['docs_per_sec']:,.1f})"
+            )
+        if result["latency_ms"]["p95"] > old["latency_ms"]["p95"] * (1 + tolerance):
+            problems.append(
+                f"{cell_id(result)}: p95 {result['latency_ms']['p95']:.3f} ms (was {old['latency_ms']['p95']:.3f})"
+            )
+    return problems
+
+
+def print_row(result: Dict) -> None:
+    lat = result["latency_ms"]
+    rss = result["rss_mb"]["peak"]
+    print(
+        f"{cell_id(result):<28} {result['docs_per_sec']:>10,.1f} docs/s {result['mb_per_sec']:>8.2f} MB/s"
+        f"  p50 {lat['p50']:>9.3f}  p95 {lat['p95']:>9.3f}  p99 {lat['p99']:>9.3f} ms"
+        f"  rss {rss if rss is None else f'{rss:.1f}'} MB",
+        flush=True,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated note sizes (e.g. 1KB,1MB).")
+    parser.add_argument("--densities", default=",".join(DENSITIES), help=f"Subset of {list(DENSITIES)}.")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Subset of {list(STAGES)}.")
+    parser.add_argument("--docs", type=int, default=50, help="Max distinct notes per cell.")
+    parser.add_argument("--budget", type=parse_size, default="4MB", help="Max text per cell and pass.")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the notes of a cell.")
+    parser.add_argument("--seed", type=int, default=17)
+    parser.add_argument("--out", default="bench_results.json", help="Where to write the JSON results.")
+    parser.add_argument("--compare", help="Earlier results file to check for regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before failing.")
+    parser.add_argument("--cell", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cell:
+        print(json.dumps(measure(json.loads(args.cell))))
+        return
+
+    stages = [s for s in args.stages.split(",") if s]
+    densities = [d for d in args.densities.split(",") if d]
+    for name, allowed in (("stage", STAGES), ("density", DENSITIES)):
+        bad = [v for v in (stages if name == "stage" else densities) if v not in allowed]
+        if bad:
+            parser.error(f"unknown {name}: {', '.join(bad)}")
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s]
+
+    results = []
+    for stage in stages:
+        for size in sizes:
+            for density in densities:
+                # at least two notes so the Document memo never serves a repeat
+                docs = max(2, min(args.docs, args.budget // size))
+                spec = {
+                    "stage": stage, "size": size, "density": density,
+                    "docs": docs, "repeat": args.repeat, "seed": args.seed,
+                }
+                result = run_cell(spec)
+                print_row(result)
+                results.append(result)
+
+    report = {
+        "schema": SCHEMA_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment(),
+        "params": {k: getattr(args, k) for k in ("sizes", "densities", "stages", "docs", "budget", "repeat", "seed")},
+        "results": results,
+    }
+    Path(args.out).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"wrote {args.out}")
+
+    if args.compare:
+        problems = compare(report, json.loads(Path(args.compare).read_text(encoding="utf-8")), args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Builds src/dundieplz/extract/data/langid_trigrams.bin from the seed
+corpora in scripts/langid_corpus/<label>.txt (one file per language; the
+file name is the meta label, e.g. pt-BR.txt).
+
+- per-word trigram counts per language (padded as in langid.trigrams),
+  add-alpha smoothed over the shared vocabulary
+- every corpus is also counted without accents (half weight), since notes
+  are often typed without them ("nao", "amanha")
+- costs are stored relative to the most likely language per trigram
+
+Usage:
+    python scripts/build_langid_model.py [--alpha 0.5] [--scale 16] [--temperature 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from dundieplz.extract.langid import MODEL_PATH, trigrams, words, write_model  # noqa: E402
+from dundieplz.extract.preprocess import strip_accents  # noqa: E402
+
+CORPUS_DIR = Path(__file__).parent / "langid_corpus"
+
+
+def count_trigrams(text: str) -> Counter:
+    counts: Counter = Counter()
+    for word in words(text):
+        counts.update(trigrams(word))
+        for gram in trigrams(strip_accents(word)):
+            counts[gram] += 0.5
+    return counts
+
+
+def build_costs(corpora: Dict[str, Counter], alpha: float, scale: float) -> Dict[str, List[int]]:
+    languages = list(corpora)
+    vocab = set().union(*corpora.values())
+    totals = {lang: sum(counts.values()) + alpha * len(vocab) for lang, counts in corpora.items()}
+
+    costs: Dict[str, List[int]] = {}
+    for gram in vocab:
+        logp = [math.log((corpora[lang][gram] + alpha) / totals[lang]) for lang in languages]
+        best = max(logp)
+        costs[gram] = [round((best - lp) * scale) for lp in logp]
+    return costs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--alpha", type=float, default=0.5)
+    parser.add_argument("--scale", type=float, default=16.0)
+    parser.add_argument("--temperature", type=float, default=4.0)
+    parser.add_argument("--out", type=Path, default=MODEL_PATH)
+    args = parser.parse_args()
+
+    corpora = {
+        path.stem: count_trigrams(path.read_text(encoding="utf-8"))
+        for path in sorted(CORPUS_DIR.glob("*.txt"))
+    }
+    costs = build_costs(corpora, args.alpha, args.scale)
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    write_model(args.out, list(corpora), costs, args.scale, args.temperature)
+    print(f"{args.out}: {len(corpora)} languages, {len(costs)} trigrams, {args.out.stat().st_size} bytes")
+
+
+if __name__ == "__main__":
+    main()
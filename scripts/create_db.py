@@ -1,56 +1,22 @@
 import sqlite3
+import sys
 from pathlib import Path
 
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from dundieplz.store.repository import INDEX_STATEMENTS, SCHEMA_STATEMENTS  # noqa: E402
+
 db_path = Path("dondieplz.db")
 
 conn = sqlite3.connect(db_path)
 cur = conn.cursor()
 
 cur.execute("PRAGMA foreign_keys = ON;")
+cur.execute("PRAGMA journal_mode = WAL;")
 
-cur.execute("""
-CREATE TABLE IF NOT EXISTS synthetic_cases (
-    case_id TEXT PRIMARY KEY,
-    text TEXT NOT NULL,
-    language TEXT DEFAULT 'pt',
-    notes TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-""")
-
-cur.execute("""
-CREATE TABLE IF NOT EXISTS extraction_runs (
-    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    model_name TEXT NOT NULL,
-    extractor_version TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-""")
-
-cur.execute("""
-CREATE TABLE IF NOT EXISTS extracted_outputs (
-    output_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    run_id INTEGER NOT NULL,
-    case_id TEXT NOT NULL,
-    suicidal_ideation_presence TEXT,
-    evidence_json TEXT,
-    uncertainty_cues_json TEXT,
-    missing_information_json TEXT,
-    raw_output_json TEXT,
-    FOREIGN KEY (run_id) REFERENCES extraction_runs(run_id),
-    FOREIGN KEY (case_id) REFERENCES synthetic_cases(case_id)
-);
-""")
-
-cur.execute("""
-CREATE TABLE IF NOT EXISTS framework_projections (
-    projection_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    output_id INTEGER NOT NULL,
-    framework TEXT NOT NULL,
-    projection_json TEXT NOT NULL,
-    FOREIGN KEY (output_id) REFERENCES extracted_outputs(output_id)
-);
-""")
+for stmt in SCHEMA_STATEMENTS + INDEX_STATEMENTS:
+    cur.execute(stmt)
 
 conn.commit()
 conn.close()
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from dundieplz.extract.llm_client import AsyncLLMClient, LLMBackendError
+
+
+# -----------------------------
+# HTTP backend (stdlib only)
+# -----------------------------
+
+class HTTPLLMClient:
+    """
+    Minimal JSON-over-HTTP backend.
+
+    - POSTs {"prompt": ...} to `url`, expects a JSON object back
+    - HTTP errors surface as LLMBackendError(status_code=...)
+    - blocking urllib calls run on a dedicated thread pool, so the async
+      path is not capped by asyncio's default executor size
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 60.0,
+        max_connections: int = 32,
+        headers: Optional[Dict[str, str]] = None,
+        backend_name: str = "llm",
+    ) -> None:
+        self.backend_name = backend_name
+        self.url = url
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_connections,
+            thread_name_prefix="dundieplz-http",
+        )
+
+    def generate_json(self, prompt: str) -> Dict:
+        body = json.dumps({"prompt": prompt}).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, headers=self.headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as exc:
+            retry_after = exc.headers.get("Retry-After") if exc.headers else None
+            raise LLMBackendError(
+                f"HTTP {exc.code} from backend",
+                status_code=exc.code,
+                retry_after=_parse_retry_after(retry_after),
+            ) from exc
+        except urllib.error.URLError as exc:
+            raise LLMBackendError(f"backend unreachable: {exc.reason}") from exc
+
+        if not isinstance(payload, dict):
+            raise LLMBackendError("backend did not return a JSON object")
+        return payload
+
+    async def agenerate_json(self, prompt: str) -> Dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.generate_json, prompt)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+# -----------------------------
+# Concurrency / retry / coalescing wrapper
+# -----------------------------
+
+class ResilientLLMClient:
+    """
+    Wraps an AsyncLLMClient for network-bound batch use.
+
+    - semaphore caps concurrent backend calls
+    - per-call timeout (asyncio.wait_for)
+    - retries on 429/5xx and timeouts with full-jitter exponential backoff
+      (Retry-After is honoured when the backend sends it)
+    - identical prompts already in flight share one backend call
+    """
+
+    def __init__(
+        self,
+        client: AsyncLLMClient,
+        max_concurrency: int = 16,
+        timeout: Optional[float] = 60.0,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.client = client
+        self.backend_name = getattr(client, "backend_name", "llm")
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._rng = rng or random.Random()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        # Counters (monotonic, for logging/metrics)
+        self.calls = 0
+        self.retries = 0
+        self.coalesced = 0
+
+    def generate_json(self, prompt: str) -> Dict:
+        return asyncio.run(self.agenerate_json(prompt))
+
+    async def agenerate_json(self, prompt: str) -> Dict:
+        self._bind_loop()
+
+        shared = self._inflight.get(prompt)
+        if shared is not None:
+            self.coalesced += 1
+            return await asyncio.shield(shared)
+
+        task = asyncio.ensure_future(self._call_with_retries(prompt))
+        self._inflight[prompt] = task
+        task.add_done_callback(lambda _t, p=prompt: self._inflight.pop(p, None))
+        return await asyncio.shield(task)
+
+    def _bind_loop(self) -> None:
+        # asyncio primitives belong to one loop; rebuild them if a new
+        # loop (e.g. another asyncio.run) starts using this client.
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._inflight = {}
+
+    async def _call_with_retries(self, prompt: str) -> Dict:
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    self.calls += 1
+                    if self.timeout is None:
+                        return await self.client.agenerate_json(prompt)
+                    return await asyncio.wait_for(self.client.agenerate_json(prompt), self.timeout)
+            except (LLMBackendError, asyncio.TimeoutError) as exc:
+                retryable = isinstance(exc, asyncio.TimeoutError) or exc.retryable
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt, exc))
+                attempt += 1
+                self.retries += 1
+
+    def _backoff(self, attempt: int, exc: BaseException) -> float:
+        delay = self._rng.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        retry_after = getattr(exc, "retry_after", None)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
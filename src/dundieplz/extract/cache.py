@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+from dundieplz.schemas.extractor_schema import ExtractionResult
+
+
+# -----------------------------
+# Keys / fingerprints
+# -----------------------------
+
+@lru_cache(maxsize=256)
+def _fingerprint(key: Tuple[Tuple[str, ...], ...]) -> str:
+    h = hashlib.sha256()
+    for items in key:
+        for item in items:
+            h.update(item.encode("utf-8"))
+            h.update(b"\x1f")
+        h.update(b"\x1e")
+    return h.hexdigest()[:16]
+
+
+def fingerprint(*lists: Sequence[str]) -> str:
+    """
+    Short, stable hash of one or more cue/pattern lists.
+    Any edit to any list changes the fingerprint.
+    """
+    return _fingerprint(tuple(tuple(items) for items in lists))
+
+
+def cache_key(text: str, backend_name: str, extractor_version: str, cue_version: str) -> str:
+    """
+    Content address of one extraction.
+
+    The text is hashed verbatim (no whitespace/case normalization) because
+    evidence offsets refer to the exact input string.
+    """
+    h = hashlib.sha256()
+    for part in (backend_name, extractor_version, cue_version):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x1f")
+    h.update(text.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+# -----------------------------
+# Cache
+# -----------------------------
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    disk_hits: int = 0
+    disk_writes: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class ExtractionCache:
+    """
+    Two-tier extraction result cache.
+
+    - memory tier: LRU bounded by entry count and (optionally) bytes
+    - disk tier (optional): SQLite file that persists across runs
+    - entries are stored as JSON, so every hit returns a fresh object
+    - cached results keep their original meta.created_at
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_bytes: Optional[int] = None,
+        path: Optional[Union[str, Path]] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = Path(path) if path is not None else None
+        self.stats = CacheStats()
+
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    # Pickling (process pools): ship settings, not the connection or entries.
+    def __getstate__(self) -> Dict:
+        return {"max_entries": self.max_entries, "max_bytes": self.max_bytes, "path": self.path}
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__init__(**state)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[ExtractionResult]:
+        with self._lock:
+            raw = self._entries.get(key)
+            if raw is not None:
+                self._entries.move_to_end(key)
+            elif self.path is not None:
+                raw = self._disk_get(key)
+                if raw is not None:
+                    self.stats.disk_hits += 1
+                    self._remember(key, raw)
+
+            if raw is None:
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+        return ExtractionResult.model_validate_json(raw)
+
+    def put(self, key: str, result: ExtractionResult) -> None:
+        raw = result.model_dump_json()
+        with self._lock:
+            self._remember(key, raw)
+            if self.path is not None:
+                self._disk_put(key, raw)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # -----------------------------
+    # Memory tier
+    # -----------------------------
+
+    def _remember(self, key: str, raw: str) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        self._entries[key] = raw
+        self._bytes += len(raw)
+
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.stats.evictions += 1
+
+    # -----------------------------
+    # Disk tier
+    # -----------------------------
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL;")
+            self._conn.execute("PRAGMA synchronous=NORMAL;")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS extraction_cache ("
+                " cache_key TEXT PRIMARY KEY,"
+                " result_json TEXT NOT NULL,"
+                " created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+            )
+        return self._conn
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        row = self._db().execute(
+            "SELECT result_json FROM extraction_cache WHERE cache_key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _disk_put(self, key: str, raw: str) -> None:
+        with self._db() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO extraction_cache (cache_key, result_json) VALUES (?, ?)",
+                (key, raw),
+            )
+        self.stats.disk_writes += 1
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, List, Tuple
+
+from dundieplz.schemas.extractor_schema import EvidenceSource, Presence, Temporal
+
+from dundieplz.extract.preprocess import Document
+from dundieplz.extract.records import SIGNAL_NAMES, SignalRecord, SignalsRecord, signals_from_dict
+from dundieplz.extract.segment import BODY
+from dundieplz.extract.spans import merge_evidence
+
+# -----------------------------
+# Chunked extraction
+# -----------------------------
+#
+# Long notes are cut into overlapping windows; the backend runs once per
+# window and the window results are combined into one SignalsRecord.
+#
+# A backend whose decision is a function of what it matched in the text
+# (RuleLLMClient) provides scan_window(text) -> matches and
+# decide_windows(doc, matches): the windows are only scanned, and the
+# backend decides once on the matches of all windows (document offsets),
+# so a denial in one window and ideation language in another are decided
+# as on the unchunked note.
+#
+# Other backends return a decision per window, merged here:
+# - a window that starts inside a section gets that section's header in
+#   front ("Family history:\n...", or "FH: ..." when it starts on the
+#   header's own line), so section-scoped backends
+#   (rule_llm_client.FAMILY_SCOPES) see the same scope as on the full
+#   note; evidence inside that prefix is dropped
+# - evidence offsets are shifted from window to document coordinates
+# - spans seen twice in an overlap (or cut short at a window edge and
+#   contained in the full span) are dropped by spans.merge_evidence
+# - presence: a window reporting indeterminate *with* evidence saw both
+#   sides (e.g. a denial next to ideation language) and wins; otherwise
+#   PRESENCE_PRECEDENCE, the first value any window reports wins.
+#   Evidence comes from the windows that reported the winning value
+# - temporal: TEMPORAL_PRECEDENCE, the same way
+# - uncertainty cues qualify the suicidal_ideation decision and missing
+#   information the ideation and plan decisions (rule_llm_client,
+#   llm_client.DummyLLMClient): each is taken from the windows that made
+#   the merged decision on those signals (first-seen order), so a window
+#   that reported "no ideation evidence" does not speak for a note where
+#   another window found it
+
+PRESENCE_PRECEDENCE = (Presence.present, Presence.absent, Presence.indeterminate)
+TEMPORAL_PRECEDENCE = (Temporal.current, Temporal.recent, Temporal.future, Temporal.past, Temporal.unknown)
+
+
+@dataclass(frozen=True)
+class ChunkingConfig:
+    """
+    - window: max characters of the note sent to the backend in one call
+      (plus, for windows starting inside a section, its header line)
+    - overlap: characters shared by consecutive windows; should exceed the
+      longest evidence span the backend can report
+    - workers: windows of one document in flight at once; each holds only
+      its own window text
+    """
+
+    window: int = 8000
+    overlap: int = 400
+    workers: int = 4
+
+    def __post_init__(self) -> None:
+        if self.window <= 0:
+            raise ValueError("window must be positive")
+        if not 0 <= self.overlap < self.window // 2:
+            raise ValueError("overlap must be >= 0 and less than half the window")
+        if self.workers < 1:
+            raise ValueError("workers must be >= 1")
+
+    @property
+    def version(self) -> str:
+        # Part of the cache key: window layout changes what backends see
+        # ("+ctx": windows carry their section header; "+merge2": the
+        # merge rules in the module comment).
+        return f"chunk:{self.window}/{self.overlap}+ctx+merge2"
+
+
+def plan_windows(doc: Document, window: int, overlap: int) -> List[Tuple[int, int]]:
+    """
+    (start, end) windows covering doc.text; consecutive windows share at
+    least `overlap` chars.
+
+    - a window ends at the last sentence end (segment.py) in its second
+      half, else at the last whitespace there, else after `window` chars
+    - the next window starts `overlap` chars before that end, moved back
+      to a sentence start when one is less than overlap/2 further back
+    """
+    text = doc.text
+    n = len(text)
+    if n <= window:
+        return [(0, n)]
+
+    sentences = doc.segments.sentences
+    ends = [s.end for s in sentences]
+    starts = [s.start for s in sentences]
+
+    out: List[Tuple[int, int]] = []
+    start = 0
+    while True:
+        hard = start + window
+        if hard >= n:
+            out.append((start, n))
+            return out
+        low = start + window // 2
+        i = bisect_right(ends, hard) - 1
+        if i >= 0 and ends[i] > low:
+            end = ends[i]
+        else:
+            space = max(text.rfind(" ", low, hard), text.rfind("\n", low, hard))
+            end = space + 1 if space > 0 else hard
+        out.append((start, end))
+
+        nxt = end - overlap
+        j = bisect_right(starts, nxt) - 1
+        if j >= 0 and starts[j] > max(nxt - overlap // 2, (start + end) // 2):
+            nxt = starts[j]
+        start = max(nxt, start + 1)
+
+
+def window_context(doc: Document, start: int) -> str:
+    """
+    Header of the section a window starting at `start` falls in ("" when
+    the window starts at or before the header, or in the BODY); followed
+    by a space when the window starts on the header's line, so a one-line
+    entry stays one line.
+    """
+    section = doc.segments.section_at(start)
+    if section.name == BODY or start < section.header_end:
+        return ""
+    same_line = doc.text.find("\n", section.header_end, start) < 0
+    return doc.text[section.start : section.header_end].strip() + (" " if same_line else "\n")
+
+
+def _shifted(signals: SignalsRecord, offset: int, context: int = 0) -> SignalsRecord:
+    # Window -> document offsets; the first `context` window chars are the
+    # prepended header, whose evidence is not part of this window's text.
+    for name in SIGNAL_NAMES:
+        signal = getattr(signals, name)
+        if context:
+            signal.evidence = [sp for sp in signal.evidence if sp.start is None or sp.start >= context]
+        if offset:
+            for span in signal.evidence:
+                if span.start is not None:
+                    span.start += offset
+                if span.end is not None:
+                    span.end += offset
+    return signals
+
+
+def _same_decision(signal: SignalRecord, merged: SignalRecord) -> bool:
+    return signal.presence == merged.presence and bool(signal.evidence) == bool(merged.evidence)
+
+
+def merge_window_signals(parts: List[SignalsRecord]) -> SignalsRecord:
+    """
+    Merges per-window results (already in document coordinates), see the
+    module comment for the precedence rules.
+    """
+    merged = SignalsRecord()
+    if not parts:
+        return merged
+    for name in SIGNAL_NAMES:
+        signals = [getattr(part, name) for part in parts]
+        contested = [s for s in signals if s.presence == Presence.indeterminate and s.evidence]
+        if contested:
+            presence = Presence.indeterminate
+            signals = contested
+        else:
+            presence = min((s.presence for s in signals), key=PRESENCE_PRECEDENCE.index)
+        evidence = merge_evidence(*(s.evidence for s in signals if s.presence == presence))
+        setattr(merged, name, SignalRecord(presence, evidence))
+    merged.temporal = min((part.temporal for part in parts), key=TEMPORAL_PRECEDENCE.index)
+
+    ideation = [p for p in parts if _same_decision(p.suicidal_ideation, merged.suicidal_ideation)]
+    planned = [p for p in ideation if _same_decision(p.plan, merged.plan)]
+    merged.uncertainty_cues = list(dict.fromkeys(c for part in ideation for c in part.uncertainty_cues))
+    merged.missing_information = list(dict.fromkeys(m for part in planned for m in part.missing_information))
+    return merged
+
+
+Matches = Dict[str, List[Tuple[int, int]]]
+
+
+def _shifted_matches(found: Matches, offset: int, context: int) -> Matches:
+    # scan_window() output -> document offsets, prefix matches dropped
+    return {name: [(s + offset, e + offset) for s, e in spans if s >= context] for name, spans in found.items()}
+
+
+def _window_scanner(backend: Any) -> Any:
+    return getattr(backend, "scan_window", None) if hasattr(backend, "decide_windows") else None
+
+
+def _combine(parts: List[Any], doc: Document, source: EvidenceSource, backend: Any) -> SignalsRecord:
+    if _window_scanner(backend) is None:
+        return merge_window_signals(parts)
+    found: Matches = {}
+    for part in parts:
+        for name, spans in part.items():
+            found.setdefault(name, []).extend(spans)
+    return signals_from_dict(backend.decide_windows(doc, found), source)
+
+
+def _window_texts(doc: Document, windows: List[Tuple[int, int]]) -> Iterator[Tuple[int, int, str]]:
+    # (offset, context length, text); sliced only when submitted, so at
+    # most `workers` window copies exist.
+    for start, end in windows:
+        context = window_context(doc, start)
+        yield start - len(context), len(context), context + doc.text[start:end]
+
+
+def extract_chunked(
+    generate: Callable[[str], Dict],
+    doc: Document,
+    config: ChunkingConfig,
+    source: EvidenceSource,
+    backend: Any = None,
+) -> SignalsRecord:
+    """
+    Runs `generate` (a backend's generate_json) over the windows of `doc`
+    on a thread pool and merges the results; with a `backend` that has
+    scan_window / decide_windows, those run instead (module comment).
+    """
+    windows = plan_windows(doc, config.window, config.overlap)
+    scan = _window_scanner(backend)
+
+    def run(offset: int, context: int, text: str) -> Any:
+        if scan is not None:
+            return _shifted_matches(scan(text), offset, context)
+        return _shifted(signals_from_dict(generate(text), source), offset, context)
+
+    if len(windows) == 1 or config.workers == 1:
+        return _combine([run(*window) for window in _window_texts(doc, windows)], doc, source, backend)
+
+    parts: List[Any] = []
+    with ThreadPoolExecutor(max_workers=config.workers, thread_name_prefix="dundieplz-chunk") as pool:
+        pending: Deque[Future] = deque()
+        for window in _window_texts(doc, windows):
+            pending.append(pool.submit(run, *window))
+            if len(pending) >= config.workers:
+                parts.append(pending.popleft().result())
+        while pending:
+            parts.append(pending.popleft().result())
+    return _combine(parts, doc, source, backend)
+
+
+async def aextract_chunked(
+    agenerate: Callable[[str], Awaitable[Dict]],
+    doc: Document,
+    config: ChunkingConfig,
+    source: EvidenceSource,
+    backend: Any = None,
+) -> SignalsRecord:
+    """
+    Async counterpart of extract_chunked: `config.workers` tasks take the
+    next window when they finish one, so at most that many window texts
+    exist at once.
+    """
+    import asyncio
+
+    scan = _window_scanner(backend)
+    windows = enumerate(_window_texts(doc, plan_windows(doc, config.window, config.overlap)))
+    parts: Dict[int, Any] = {}
+
+    async def run() -> None:
+        # the shared iterator is only advanced between awaits
+        for index, (offset, context, text) in windows:
+            if scan is not None:
+                parts[index] = _shifted_matches(scan(text), offset, context)
+            else:
+                out = await agenerate(text)
+                parts[index] = _shifted(signals_from_dict(out, source), offset, context)
+
+    await asyncio.gather(*(run() for _ in range(config.workers)))
+    return _combine([parts[i] for i in range(len(parts))], doc, source, backend)
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+from dundieplz.extract.preprocess import strip_accents
+
+Span = Tuple[int, int]
+
+# Below this many distinct needles, one C-level str.find scan per needle is
+# cheaper than stepping the automaton in Python (see
+# benchmarks/bench_cue_matcher.py for the crossover).
+AUTOMATON_MIN_NEEDLES = 200
+
+
+def find_all(haystack_lower: str, needle_lower: str) -> List[Span]:
+    """
+    Returns (start, end) spans for literal substring matches.
+    Deterministic and audit-friendly.
+    """
+    if not needle_lower:
+        return []
+
+    out: List[Span] = []
+    start = 0
+    while True:
+        idx = haystack_lower.find(needle_lower, start)
+        if idx == -1:
+            break
+        out.append((idx, idx + len(needle_lower)))
+        start = idx + 1  # allow overlaps
+    return out
+
+
+# -----------------------------
+# Aho-Corasick automaton
+# -----------------------------
+
+class CueAutomaton:
+    """
+    Multi-pattern literal matcher (Aho-Corasick).
+
+    - built once per cue set
+    - finds every cue of every category in a single pass over the text
+    - overlapping matches are reported, exactly like find_all()
+    - deterministic: hits come back in cue-list order, spans in text order
+
+    Small cue sets fall back to per-needle find_all() scans, which are
+    faster in CPython; output is identical either way.
+
+    With accent_insensitive=True cues are accent-stripped too and scan()
+    expects Document.plain (offsets then need Document.to_original).
+    """
+
+    def __init__(
+        self,
+        cue_sets: Dict[str, Sequence[str]],
+        min_automaton_needles: int = AUTOMATON_MIN_NEEDLES,
+        accent_insensitive: bool = False,
+    ) -> None:
+        # Entries keep category/cue order so scan() output mirrors the
+        # original per-cue loop exactly (duplicates included).
+        self._entries: List[Tuple[str, str, int]] = []
+        self._categories: List[str] = list(cue_sets.keys())
+
+        needle_ids: Dict[str, int] = {}
+        for category, cues in cue_sets.items():
+            for cue in cues:
+                needle = cue.lower()
+                if accent_insensitive:
+                    needle = strip_accents(needle)
+                if not needle:
+                    continue
+                nid = needle_ids.setdefault(needle, len(needle_ids))
+                self._entries.append((category, cue, nid))
+
+        self._needles: List[str] = list(needle_ids.keys())
+        self._needle_lens: List[int] = [len(n) for n in self._needles]
+        self.uses_automaton = len(self._needles) >= min_automaton_needles
+        if self.uses_automaton:
+            self._build(self._needles)
+
+    @property
+    def max_length(self) -> int:
+        """
+        Length of the longest cue (as matched); 0 without cues.
+        """
+        return max(self._needle_lens, default=0)
+
+    def cues(self, category: str) -> List[str]:
+        """
+        The cues of `category`, in the order scan() reports them.
+        """
+        return [cue for cat, cue, _ in self._entries if cat == category]
+
+    def _build(self, needles: List[str]) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]
+
+        for nid, needle in enumerate(needles):
+            state = 0
+            for ch in needle:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(nid)
+
+        # Breadth-first failure links; outputs of the failure state are
+        # merged in so the scan never has to walk dictionary links.
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt].extend(out[fail[nxt]])
+
+        self._goto = goto
+        self._fail = fail
+        self._out: List[Tuple[int, ...]] = [tuple(o) for o in out]
+        self._alphabet = frozenset(ch for edges in goto for ch in edges)
+
+    def _scan_automaton(self, lower: str) -> Dict[int, List[Span]]:
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        alphabet = self._alphabet
+        lens = self._needle_lens
+
+        found: Dict[int, List[Span]] = {}
+        state = 0
+        for i, ch in enumerate(lower):
+            if ch not in alphabet:
+                state = 0
+                continue
+            while True:
+                nxt = goto[state].get(ch)
+                if nxt is not None:
+                    state = nxt
+                    break
+                if not state:
+                    break
+                state = fail[state]
+            if out[state]:
+                end = i + 1
+                for nid in out[state]:
+                    spans = found.get(nid)
+                    if spans is None:
+                        spans = found[nid] = []
+                    spans.append((end - lens[nid], end))
+        return found
+
+    def _scan_needles(self, lower: str) -> Dict[int, List[Span]]:
+        found: Dict[int, List[Span]] = {}
+        for nid, needle in enumerate(self._needles):
+            spans = find_all(lower, needle)
+            if spans:
+                found[nid] = spans
+        return found
+
+    def scan(self, lower: str) -> Dict[str, List[Tuple[str, List[Span]]]]:
+        """
+        Returns {category: [(cue, [(start, end), ...]), ...]} for cues with hits.
+
+        `lower` must already be lowercased (cues are lowercased at build time).
+        """
+        if self.uses_automaton:
+            found = self._scan_automaton(lower)
+        else:
+            found = self._scan_needles(lower)
+
+        result: Dict[str, List[Tuple[str, List[Span]]]] = {c: [] for c in self._categories}
+        if not found:
+            return result
+        for category, cue, nid in self._entries:
+            spans = found.get(nid)
+            if spans:
+                result[category].append((cue, list(spans)))
+        return result
+
+
+@lru_cache(maxsize=32)
+def _compile(key: Tuple[Tuple[str, Tuple[str, ...]], ...], accent_insensitive: bool) -> CueAutomaton:
+    return CueAutomaton({category: cues for category, cues in key}, accent_insensitive=accent_insensitive)
+
+
+def compile_cue_sets(cue_sets: Dict[str, Sequence[str]], accent_insensitive: bool = False) -> CueAutomaton:
+    """
+    Returns a cached automaton for the given cue sets.
+    Editing a cue list yields a new key, hence a fresh automaton.
+    """
+    key = tuple((category, tuple(cues)) for category, cues in cue_sets.items())
+    return _compile(key, accent_insensitive)
@@ -1,96 +1,46 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import os
+from collections import deque
+from concurrent.futures import Future
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from itertools import islice
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple, Union
 
 from dundieplz.schemas.extractor_schema import (
-    CueHit,
-    CueHits,
     EvidenceSource,
     EvidenceSpan,
+    ExtractionFailure,
     ExtractionResult,
     ExtractorMeta,
-    Presence,
-    Signal,
-    Signals,
-    Temporal,
 )
 
+from dundieplz.extract.cache import ExtractionCache, cache_key
+from dundieplz.extract.chunking import ChunkingConfig, aextract_chunked, extract_chunked
+from dundieplz.extract.cue_engine import CueAutomaton
+from dundieplz.extract.incremental import diff_texts, update_cue_hits
+from dundieplz.extract.instrument import ExtractionMetrics, Instrumentation, StageTimer
+from dundieplz.extract.langid import get_model as get_langid_model
 from dundieplz.extract.llm_client import LLMClient
+from dundieplz.extract.packs import PackSet, packs_for, packs_version
+from dundieplz.extract.records import (
+    SIGNAL_NAMES,
+    CueHitRecord,
+    CueHitsRecord,
+    MetaRecord,
+    ResultRecord,
+    SignalsRecord,
+    SpanRecord,
+    signals_from_dict,
+)
+from dundieplz.extract.preprocess import PREPROCESS_VERSION, Document, prepare
+from dundieplz.extract.spans import merge_evidence
 
 
-# -----------------------------
-# Extras
-# -----------------------------
-
-def _detect_language(text: str) -> str:
-    """
-    Very lightweight language guess (non-NLP).
-    """
-    lower = text.lower()
-
-    # Portuguese (pt-BR) hints
-    if any(ch in lower for ch in ["ã", "õ", "ç", "á", "é", "í", "ó", "ú"]) or any(
-        w in lower for w in ["não", "queria", "amanhã", "filhos", "esposa", "marido"]
-    ):
-        return "pt-BR"
-
-    # English hints
-    if any(w in lower for w in [" i ", " my ", " wish", " die", " kill", " suicide"]):
-        return "en"
-
-    return "unknown"
-
-
-def _find_all(haystack_lower: str, needle_lower: str) -> List[Tuple[int, int]]:
-    """
-    Returns (start, end) spans for literal substring matches.
-    Deterministic and audit-friendly.
-    """
-    if not needle_lower:
-        return []
-
-    out: List[Tuple[int, int]] = []
-    start = 0
-    while True:
-        idx = haystack_lower.find(needle_lower, start)
-        if idx == -1:
-            break
-        out.append((idx, idx + len(needle_lower)))
-        start = idx + 1  # allow overlaps
-    return out
-
-
-def _dict_to_signal(obj: Dict, default_source: EvidenceSource) -> Signal:
-    """
-    Converts a backend dict into a Signal schema object.
-    """
-    presence_raw = obj.get("presence", "indeterminate")
-    try:
-        presence = Presence(presence_raw)
-    except Exception:
-        presence = Presence.indeterminate
-
-    evidence_list = []
-    for ev in obj.get("evidence", []) or []:
-        evidence_list.append(
-            EvidenceSpan(
-                text=str(ev.get("text", "")),
-                start=ev.get("start"),
-                end=ev.get("end"),
-                source=default_source,
-            )
-        )
-
-    return Signal(presence=presence, evidence=evidence_list)
-
-
-def _dict_to_temporal(value: str) -> Temporal:
-    try:
-        return Temporal(value)
-    except Exception:
-        return Temporal.unknown
+def _no_lap(name: str) -> None:
+    # StageTimer.lap stand-in when the extractor is not instrumented
+    pass
 
 
 # -----------------------------
@@ -105,108 +55,473 @@ class Extractor:
     - calls backend (dummy / rules / llm)
     - runs cue matcher
     - returns ExtractionResult
+    - optional cache: content-addressed, see cache.py
+    - optional chunking: notes longer than one window go to the backend
+      as overlapping windows and the results are merged, see chunking.py
+    - optional instrumentation: per-stage timings, counters and sampled
+      profiles of extract / extract_record, see instrument.py
     """
 
     llm_client: LLMClient
+    cache: Optional[ExtractionCache] = None
+    chunking: Optional[ChunkingConfig] = None
+    instrumentation: Optional[Instrumentation] = None
 
     def extract(self, text: str) -> ExtractionResult:
         raw_text = text or ""
-        lower = raw_text.lower()
+        if self.instrumentation is not None:
+            return self._observed(raw_text, as_record=False)
+        return self._run(raw_text, as_record=False)[0]
 
-        # Call backend
-        llm_out = self.llm_client.generate_json(raw_text)
+    async def aextract(self, text: str) -> ExtractionResult:
+        """
+        Async variant of extract().
+        Uses the backend's agenerate_json when it has one (AsyncLLMClient);
+        sync backends run in a thread so the event loop is never blocked.
+        """
+        raw_text = text or ""
 
-        # Detect backend identity
-        backend_name = getattr(self.llm_client, "backend_name", "llm")
+        key = self.cache_key(raw_text) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
 
-        # Decide evidence source based on backend
-        if backend_name == "rules":
-            default_source = EvidenceSource.rule
+        agenerate = getattr(self.llm_client, "agenerate_json", None)
+        if agenerate is None:
+            import asyncio
+
+            signals = await asyncio.to_thread(self._generate, raw_text)
+        elif self._chunked(raw_text):
+            signals = await aextract_chunked(
+                agenerate, prepare(raw_text), self.chunking, self._default_source(), self.llm_client
+            )
         else:
-            default_source = EvidenceSource.llm
+            signals = signals_from_dict(await agenerate(raw_text), self._default_source())
 
-        # Build signals
-        signals = Signals(
-            suicidal_ideation=_dict_to_signal(
-                llm_out.get("suicidal_ideation", {}),
-                default_source,
-            ),
-            self_harm=_dict_to_signal(
-                llm_out.get("self_harm", {}),
-                default_source,
-            ),
-            intent=_dict_to_signal(
-                llm_out.get("intent", {}),
-                default_source,
-            ),
-            plan=_dict_to_signal(
-                llm_out.get("plan", {}),
-                default_source,
-            ),
-            past_behavior=_dict_to_signal(
-                llm_out.get("past_behavior", {}),
-                default_source,
-            ),
-            temporal=_dict_to_temporal(llm_out.get("temporal", "unknown")),
-            uncertainty_cues=list(llm_out.get("uncertainty_cues", []) or []),
-            missing_information=list(llm_out.get("missing_information", []) or []),
+        result = self._build_result(raw_text, signals)
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+
+    def reextract(self, previous: ExtractionResult, text: str) -> ExtractionResult:
+        """
+        extract() for an edited version of previous.text (an appended
+        addendum, a correction), without redoing the whole note:
+        - the two texts are diffed and only the edited region (plus the
+          longest cue / pattern) is scanned again, see incremental.py
+        - cue hits outside it are reused from `previous`, shifted; so are
+          the backend's matches when it has generate_json_incremental
+          (RuleLLMClient); other backends get the whole note again
+        - signal-level decisions are recomputed from the merged matches
+        """
+        raw_text = text or ""
+        edit = diff_texts(previous.text, raw_text)
+        if edit is None:
+            return previous
+
+        key = self.cache_key(raw_text) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        incremental = getattr(self.llm_client, "generate_json_incremental", None)
+        if incremental is None or self._chunked(raw_text):
+            signals = self._generate(raw_text)
+        else:
+            signals = signals_from_dict(incremental(previous.text, raw_text, edit), self._default_source())
+
+        doc = prepare(raw_text)
+        packs = packs_for(doc)
+        if doc.aligned and list(packs.tags) == previous.meta.cue_packs:
+            previous_hits = {
+                "contextual": previous.cue_hits.contextual,
+                "subjective": previous.cue_hits.subjective,
+                "ambiguous": previous.cue_hits.ambiguous,
+            }
+            matcher = packs.matcher("cue_matcher", _compile_cue_matcher)
+            cue_hits = update_cue_hits(previous_hits, doc, matcher, edit)
+        else:
+            cue_hits = self._match_cues(doc, packs)
+
+        result = self._build_record(raw_text, signals, cue_hits).to_model()
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+
+    def cache_key(self, text: str) -> str:
+        """
+        Content address for `text` under this extractor's configuration:
+        backend, extractor version, cue packs, backend pattern lists,
+        normalization and language model.
+        """
+        backend_name = getattr(self.llm_client, "backend_name", "llm")
+        extractor_version = ExtractorMeta.model_fields["extractor_version"].default
+        cue_version = "{}:{}:{}:{}".format(
+            packs_version(),
+            getattr(self.llm_client, "pattern_version", ""),
+            PREPROCESS_VERSION,
+            get_langid_model().digest,
         )
+        if self.chunking is not None:
+            cue_version += ":" + self.chunking.version
+        return cache_key(text, backend_name, extractor_version, cue_version)
+
+    def extract_record(self, text: str) -> ResultRecord:
+        """
+        Model-free fast path: returns the internal ResultRecord
+        (record.to_json() gives the same JSON as extract().model_dump_json()).
+        Does not use the cache, which stores ExtractionResults.
+        """
+        raw_text = text or ""
+        if self.instrumentation is not None:
+            return self._observed(raw_text, as_record=True)
+        return self._run(raw_text, as_record=True)[0]
+
+    def _default_source(self) -> EvidenceSource:
+        # Decide evidence source based on backend
+        if getattr(self.llm_client, "backend_name", "llm") == "rules":
+            return EvidenceSource.rule
+        return EvidenceSource.llm
 
+    def _chunked(self, raw_text: str) -> bool:
+        return self.chunking is not None and len(raw_text) > self.chunking.window
+
+    def _run(
+        self, raw_text: str, as_record: bool, timer: Optional[StageTimer] = None
+    ) -> Tuple[Union[ExtractionResult, ResultRecord], bool]:
+        """
+        The extract() / extract_record() pipeline; returns (output, served
+        from cache). `timer` gets a lap per stage (instrumented path).
+        """
+        lap = timer.lap if timer is not None else _no_lap
+        key = None
+        if self.cache is not None and not as_record:
+            key = self.cache_key(raw_text)
+            cached = self.cache.get(key)
+            lap("cache_lookup")
+            if cached is not None:
+                return cached, True
+
+        # Normalized once per note; the backend and the cue matcher reuse
+        # the memo (preprocess.py).
+        doc = prepare(raw_text)
+        lap("preprocess")
+        packs_for(doc)
+        lap("language")
+
+        record = self._build_record(raw_text, self._generate(raw_text, timer), timer=timer)
+        if as_record:
+            return record, False
+        result = record.to_model()
+        lap("validation")
+        if key is not None:
+            self.cache.put(key, result)
+            lap("cache_store")
+        return result, False
+
+    def _generate(self, raw_text: str, timer: Optional[StageTimer] = None) -> SignalsRecord:
+        """
+        Backend call: the whole note, or its windows when chunking applies.
+        """
+        lap = timer.lap if timer is not None else _no_lap
+        source = self._default_source()
+        if self._chunked(raw_text):
+            signals = extract_chunked(
+                self.llm_client.generate_json, prepare(raw_text), self.chunking, source, self.llm_client
+            )
+            lap("backend")
+            return signals
+        payload = self.llm_client.generate_json(raw_text)
+        lap("backend")
+        signals = signals_from_dict(payload, source)
+        lap("signals")
+        return signals
+
+    def _build_result(self, raw_text: str, signals: SignalsRecord) -> ExtractionResult:
+        # Pydantic models are only built here, at the API boundary.
+        return self._build_record(raw_text, signals).to_model()
+
+    def _build_record(
+        self,
+        raw_text: str,
+        signals: SignalsRecord,
+        cue_hits: Optional[CueHitsRecord] = None,
+        timer: Optional[StageTimer] = None,
+    ) -> ResultRecord:
+        lap = timer.lap if timer is not None else _no_lap
+        # Normalized once per note; offline backends already prepared the
+        # same text, so this is a memo hit (preprocess.py).
+        doc = prepare(raw_text)
+        packs = packs_for(doc)
         # Cue matcher (literal, deterministic)
-        cue_hits = self._match_cues(raw_text, lower)
+        if cue_hits is None:
+            cue_hits = self._match_cues(doc, packs)
+            lap("cue_matcher")
 
-        # Meta
-        meta = ExtractorMeta(
-            llm_backend=backend_name,
-            language=_detect_language(raw_text),
-        )
+        # Detect backend identity
+        backend_name = getattr(self.llm_client, "backend_name", "llm")
 
-        return ExtractionResult(
+        record = ResultRecord(
             text=raw_text,
             signals=signals,
             cue_hits=cue_hits,
-            meta=meta,
+            meta=MetaRecord(
+                llm_backend=backend_name,
+                language=doc.langid.language,
+                language_confidence=round(doc.langid.confidence, 4),
+                cue_packs=list(packs.tags),
+            ),
         )
+        lap("record")
+        return record
+
+    # -----------------------------
+    # Instrumented path
+    # -----------------------------
+
+    def _observed(self, raw_text: str, as_record: bool) -> Union[ExtractionResult, ResultRecord]:
+        """
+        extract() / extract_record() with stage timings, counters and the
+        sampled profile sent to the instrumentation sinks.
+        """
+        instrumentation = self.instrumentation
+        metrics = ExtractionMetrics(backend=getattr(self.llm_client, "backend_name", "llm"))
+        timer = StageTimer()
+        sampler = instrumentation.start_profile()
+        try:
+            out, metrics.cached = self._run(raw_text, as_record, timer)
+        finally:
+            metrics.profile = instrumentation.stop_profile(sampler) if sampler is not None else None
+        metrics.stages = timer.stages
+
+        metrics.counters["chars"] = len(raw_text)
+        if not metrics.cached:
+            # ExtractionResult and ResultRecord share the attribute tree
+            signals, cue_hits = out.signals, out.cue_hits
+            metrics.counters["spans"] = sum(len(getattr(signals, name).evidence) for name in SIGNAL_NAMES)
+            hits = cue_hits.contextual + cue_hits.subjective + cue_hits.ambiguous
+            metrics.counters["cue_hits"] = len(hits)
+            metrics.counters["cue_spans"] = sum(len(hit.evidence) for hit in hits)
+        instrumentation.emit(metrics)
+        return out
+
+    @staticmethod
+    def merge_evidence(result: ExtractionResult, include_cues: bool = True) -> List[EvidenceSpan]:
+        """
+        All evidence of a result in one list, without spans contained in
+        other spans (see spans.py). Backend evidence (rules / LLM) wins
+        over cue-matcher evidence on identical offsets.
+        """
+        groups = [
+            value.evidence for value in result.signals.__dict__.values() if hasattr(value, "evidence")
+        ]
+        if include_cues:
+            cue_hits = result.cue_hits
+            groups += [
+                hit.evidence
+                for hits in (cue_hits.contextual, cue_hits.subjective, cue_hits.ambiguous)
+                for hit in hits
+            ]
+        return merge_evidence(*groups)
+
+    def extract_many(
+        self,
+        texts: Iterable[str],
+        workers: Optional[int] = None,
+        chunksize: int = 64,
+    ) -> List[Union[ExtractionResult, ExtractionFailure]]:
+        """
+        Batch extraction over a process pool.
+        - results come back in input order
+        - a document that raises yields an ExtractionFailure, not a dead batch
+        - each worker receives this Extractor (and its backend) once
+        - workers=None uses every core; workers<=1 runs in-process
+        """
+        items = list(texts)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(items))
+        return list(self.iter_extract(items, workers=workers, chunksize=chunksize))
+
+    async def aextract_many(
+        self,
+        texts: Iterable[str],
+        concurrency: int = 16,
+    ) -> List[Union[ExtractionResult, ExtractionFailure]]:
+        """
+        Concurrent async batch extraction.
+        - at most `concurrency` documents in flight (semaphore)
+        - results come back in input order
+        - a document that raises (backend error, timeout) yields an
+          ExtractionFailure instead of cancelling the batch
+        """
+        import asyncio
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(index: int, text: str) -> Union[ExtractionResult, ExtractionFailure]:
+            async with semaphore:
+                try:
+                    return await self.aextract(text)
+                except Exception as exc:
+                    return ExtractionFailure(index=index, error_type=type(exc).__name__, message=str(exc))
+
+        return list(await asyncio.gather(*(run(i, t) for i, t in enumerate(texts))))
+
+    def iter_extract(
+        self,
+        items: Iterable[Any],
+        workers: Optional[int] = None,
+        chunksize: int = 64,
+        max_pending: Optional[int] = None,
+        loader: Optional[Callable[[Any], str]] = None,
+        as_records: bool = False,
+        keep_text: bool = True,
+    ) -> Iterator[Union[ExtractionResult, ResultRecord, ExtractionFailure]]:
+        """
+        Streaming counterpart of extract_many.
+        - consumes `items` lazily, in chunks of `chunksize`
+        - at most `max_pending` chunks (default 2 per worker) are in flight;
+          input is only read further as the caller consumes results
+        - `loader` turns an item into text inside the worker (e.g. JSON
+          parsing); its errors become ExtractionFailure entries too
+        - `as_records` yields ResultRecords (extract_record) instead of
+          ExtractionResults: no models are built and less is pickled
+        - `keep_text=False` returns results with text "" (the caller keeps
+          the notes, e.g. in a store.corpus.CorpusStore with a CorpusLoader
+          as `loader`), so notes cross the process boundary in neither
+          direction
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        chunks = _chunked(enumerate(items), max(1, chunksize))
+
+        if workers <= 1:
+            for chunk in chunks:
+                yield from _extract_chunk(self, chunk, loader, as_records, keep_text)
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        if max_pending is None:
+            max_pending = 2 * workers
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self,),
+        ) as pool:
+            pending: Deque[Future] = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(_extract_chunk_in_worker, chunk, loader, as_records, keep_text))
+                if len(pending) >= max(1, max_pending):
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
 
     # -----------------------------
     # Cue matcher
     # -----------------------------
 
-    def _match_cues(self, raw_text: str, lower: str) -> CueHits:
+    def _match_cues(self, doc: Document, packs: PackSet) -> CueHitsRecord:
         """
-        Literal cue matching with offsets.
+        Literal cue matching with offsets (see cue_engine.py). Only the packs
+        routed for this note run; their automaton is compiled once (packs.py).
+        Accent-insensitive: runs on doc.plain, offsets map back to doc.text.
         """
-        from dundieplz.extract.llm_client import (
-            CONTEXTUAL_CUES,
-            SUBJECTIVE_CUES,
-            AMBIGUOUS_CUES,
+        found = packs.matcher("cue_matcher", _compile_cue_matcher).scan(doc.plain)
+
+        text = doc.text
+        source = EvidenceSource.cue_matcher
+
+        def build_hits(category: str) -> List[CueHitRecord]:
+            return [
+                CueHitRecord(
+                    cue=cue,
+                    evidence=[
+                        SpanRecord(text[s:e], s, e, source)
+                        for (s, e) in doc.to_original_spans(spans)
+                    ],
+                )
+                for cue, spans in found[category]
+            ]
+
+        return CueHitsRecord(
+            contextual=build_hits("contextual"),
+            subjective=build_hits("subjective"),
+            ambiguous=build_hits("ambiguous"),
         )
 
-        def build_hits(cues: List[str]) -> List[CueHit]:
-            hits: List[CueHit] = []
-            for cue in cues:
-                cue_l = cue.lower()
-                spans = _find_all(lower, cue_l)
-                if not spans:
-                    continue
-
-                evidence = [
-                    EvidenceSpan(
-                        text=raw_text[s:e],
-                        start=s,
-                        end=e,
-                        source=EvidenceSource.cue_matcher,
-                    )
-                    for (s, e) in spans
-                ]
-                hits.append(CueHit(cue=cue, evidence=evidence))
-            return hits
-
-        return CueHits(
-            contextual=build_hits(CONTEXTUAL_CUES),
-            subjective=build_hits(SUBJECTIVE_CUES),
-            ambiguous=build_hits(AMBIGUOUS_CUES),
-        )
+
+def _compile_cue_matcher(packs: PackSet) -> CueAutomaton:
+    cues = packs.cues
+    return CueAutomaton(
+        {
+            "contextual": cues["contextual"],
+            "subjective": cues["subjective"],
+            "ambiguous": cues["ambiguous"],
+        },
+        accent_insensitive=True,
+    )
+
+
+# -----------------------------
+# Batch workers
+# -----------------------------
+
+_worker_extractor: Optional[Extractor] = None
+
+
+def _init_worker(extractor: Extractor) -> None:
+    global _worker_extractor
+    _worker_extractor = extractor
+
+
+def _chunked(items: Iterable[Tuple[int, Any]], size: int) -> Iterator[List[Tuple[int, Any]]]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _extract_item(
+    extractor: Extractor,
+    item: Tuple[int, Any],
+    loader: Optional[Callable[[Any], str]] = None,
+    as_records: bool = False,
+    keep_text: bool = True,
+) -> Union[ExtractionResult, ResultRecord, ExtractionFailure]:
+    index, payload = item
+    try:
+        text = loader(payload) if loader is not None else payload
+        result = extractor.extract_record(text) if as_records else extractor.extract(text)
+        if not keep_text:
+            result.text = ""
+        return result
+    except Exception as exc:
+        return ExtractionFailure(index=index, error_type=type(exc).__name__, message=str(exc))
+
+
+def _extract_chunk(
+    extractor: Extractor,
+    chunk: List[Tuple[int, Any]],
+    loader: Optional[Callable[[Any], str]] = None,
+    as_records: bool = False,
+    keep_text: bool = True,
+) -> List[Union[ExtractionResult, ResultRecord, ExtractionFailure]]:
+    return [_extract_item(extractor, item, loader, as_records, keep_text) for item in chunk]
+
+
+def _extract_chunk_in_worker(
+    chunk: List[Tuple[int, Any]],
+    loader: Optional[Callable[[Any], str]] = None,
+    as_records: bool = False,
+    keep_text: bool = True,
+) -> List[Union[ExtractionResult, ResultRecord, ExtractionFailure]]:
+    return _extract_chunk(_worker_extractor, chunk, loader, as_records, keep_text)
 
 
 # -----------------------------
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from dundieplz.schemas.extractor_schema import CueHit, EvidenceSource
+
+from dundieplz.extract.cue_engine import CueAutomaton
+from dundieplz.extract.preprocess import Document
+from dundieplz.extract.records import CueHitRecord, CueHitsRecord, SpanRecord
+
+# -----------------------------
+# Incremental re-extraction
+# -----------------------------
+#
+# An edited note is compared with the text of its previous result; the
+# difference is one replaced region (common prefix / common suffix), so
+# an appended addendum or a local correction is a small TextEdit even on
+# a long note. Matches entirely outside the region are reused, shifted
+# when they lie after it; only the region plus a margin is scanned again.
+
+_BLOCK = 4096
+
+
+@dataclass(frozen=True)
+class TextEdit:
+    """
+    old[start:old_end] was replaced by new[start:new_end].
+    """
+
+    start: int
+    old_end: int
+    new_end: int
+
+    @property
+    def delta(self) -> int:
+        return self.new_end - self.old_end
+
+
+def _common_prefix(a: str, b: str) -> int:
+    # Block-wise slice comparisons (memcmp), then a binary search inside
+    # the first differing block.
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i : i + _BLOCK] == b[i : i + _BLOCK]:
+        i += _BLOCK
+    if i >= n:
+        return n
+    lo, hi = i, min(i + _BLOCK, n)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[i:mid] == b[i:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    la, lb = len(a), len(b)
+    k = 0
+    while k < limit:
+        step = min(k + _BLOCK, limit)
+        if a[la - step : la - k] != b[lb - step : lb - k]:
+            break
+        k = step
+    if k >= limit:
+        return limit
+    lo, hi = k, min(k + _BLOCK, limit)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[la - mid : la - k] == b[lb - mid : lb - k]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def diff_texts(old: str, new: str) -> Optional[TextEdit]:
+    """
+    The single region that differs between `old` and `new`; None if equal.
+    Several edits far apart come back as one region spanning all of them.
+    """
+    if old == new:
+        return None
+    prefix = _common_prefix(old, new)
+    suffix = _common_suffix(old, new, min(len(old), len(new)) - prefix)
+    return TextEdit(prefix, len(old) - suffix, len(new) - suffix)
+
+
+# -----------------------------
+# Cue hits
+# -----------------------------
+
+def _reused(spans: Sequence, edit: TextEdit) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+    # Literal matches are context-free: one that ends before the edit or
+    # starts after it is still there, in the same place or shifted.
+    before: List[Tuple[int, int]] = []
+    after: List[Tuple[int, int]] = []
+    for span in spans:
+        if span.start is None or span.end is None:
+            continue
+        if span.end <= edit.start:
+            before.append((span.start, span.end))
+        elif span.start >= edit.old_end:
+            after.append((span.start + edit.delta, span.end + edit.delta))
+    return before, after
+
+
+def update_cue_hits(
+    previous: Dict[str, List[CueHit]],
+    doc: Document,
+    matcher: CueAutomaton,
+    edit: TextEdit,
+) -> CueHitsRecord:
+    """
+    Cue hits of `doc` from the previous result's hits ({category: hits})
+    and a scan of the edited region widened by the longest cue.
+
+    `doc` must be aligned (Document.aligned) and routed to the same packs
+    as the previous result.
+    """
+    margin = matcher.max_length
+    lo = max(0, edit.start - margin)
+    fresh = matcher.scan(doc.plain[lo : edit.new_end + margin])
+
+    text = doc.text
+    source = EvidenceSource.cue_matcher
+    out: Dict[str, List[CueHitRecord]] = {}
+    for category in ("contextual", "subjective", "ambiguous"):
+        spans_by_cue: Dict[str, List[Tuple[int, int]]] = {}
+        for hit in previous.get(category, ()):
+            if hit.cue not in spans_by_cue:
+                before, after = _reused(hit.evidence, edit)
+                spans_by_cue[hit.cue] = before + after
+        for cue, spans in fresh.get(category, ()):
+            # only matches overlapping the edit are new; the rest are reused
+            new = [(s + lo, e + lo) for s, e in spans if e + lo > edit.start and s + lo < edit.new_end]
+            if new:
+                spans_by_cue[cue] = sorted(spans_by_cue.get(cue, []) + new)
+        out[category] = [
+            CueHitRecord(cue=cue, evidence=[SpanRecord(text[s:e], s, e, source) for s, e in spans_by_cue[cue]])
+            for cue in matcher.cues(category)
+            if spans_by_cue.get(cue)
+        ]
+    return CueHitsRecord(**out)
@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import io
+import itertools
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+# -----------------------------
+# Per-stage instrumentation
+# -----------------------------
+#
+# Opt-in: Extractor(instrumentation=Instrumentation(...)). Without it the
+# extractor takes its usual path and pays one `is None` check per note.
+#
+# Stages of Extractor.extract / extract_record, in order:
+#   cache_lookup  content-address + cache get (only with a cache)
+#   preprocess    normalization (preprocess.prepare)
+#   language      language id + pack routing (packs_for)
+#   backend       backend call (whole chunked run when chunking applies)
+#   signals       backend JSON -> SignalsRecord (not with chunking)
+#   cue_matcher   Extractor._match_cues
+#   record        ResultRecord assembly
+#   validation    pydantic model (ResultRecord.to_model; extract only)
+#   cache_store   cache put (only with a cache)
+#
+# A sink is any callable taking ExtractionMetrics; LoggingSink and
+# PrometheusTextfileSink are provided.
+
+STAGES = (
+    "cache_lookup",
+    "preprocess",
+    "language",
+    "backend",
+    "signals",
+    "cue_matcher",
+    "record",
+    "validation",
+    "cache_store",
+)
+
+PROFILE_MODES = ("cprofile", "tracemalloc")
+
+Sink = Callable[["ExtractionMetrics"], None]
+
+logger = logging.getLogger("dundieplz.extract")
+
+
+@dataclass
+class ExtractionMetrics:
+    """
+    What one extraction cost.
+
+    - stages: seconds per stage (time.perf_counter), in execution order
+    - counters: chars, spans (signal evidence), cue_hits, cue_spans
+    - cached: served from the cache (only cache_lookup ran)
+    - profile: cProfile / tracemalloc report of a sampled note
+    """
+
+    backend: str
+    stages: Dict[str, float] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+    cached: bool = False
+    profile: Optional[Dict[str, Any]] = None
+
+    @property
+    def total(self) -> float:
+        return sum(self.stages.values())
+
+    def as_dict(self) -> Dict[str, Any]:
+        out = asdict(self)
+        out["total"] = self.total
+        return out
+
+
+class StageTimer:
+    """
+    Lap timer: lap(name) charges the time since the previous lap to `name`.
+    """
+
+    __slots__ = ("stages", "_last")
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def lap(self, name: str) -> None:
+        now = time.perf_counter()
+        self.stages[name] = self.stages.get(name, 0.0) + (now - self._last)
+        self._last = now
+
+
+# -----------------------------
+# Profiling samplers
+# -----------------------------
+
+class _CProfileSampler:
+    def __init__(self, top: int) -> None:
+        import cProfile
+
+        self._top = top
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self) -> Dict[str, Any]:
+        self._profile.disable()
+        import pstats  # after disable(): a first import would top the report
+
+        out = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=out)
+        stats.sort_stats("cumulative").print_stats(self._top)
+        return {"kind": "cprofile", "report": out.getvalue()}
+
+
+class _TracemallocSampler:
+    def __init__(self, top: int) -> None:
+        import tracemalloc
+
+        self._top = top
+        self._owner = not tracemalloc.is_tracing()
+        if self._owner:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._before = tracemalloc.take_snapshot()
+
+    def stop(self) -> Dict[str, Any]:
+        import tracemalloc
+
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        if self._owner:
+            tracemalloc.stop()
+        diff = after.compare_to(self._before, "lineno")
+        return {
+            "kind": "tracemalloc",
+            "current_bytes": current,
+            "peak_bytes": peak,
+            "top": [str(stat) for stat in diff[: self._top]],
+        }
+
+
+# -----------------------------
+# Instrumentation
+# -----------------------------
+
+class Instrumentation:
+    """
+    Per-stage timings and counters for every note, sent to `sinks`.
+
+    - profile: "cprofile" or "tracemalloc" adds a report to every
+      `sample_every`-th note (0 = never); one sampled note at a time,
+      concurrent notes are not profiled
+    - sinks run in the extracting thread; a sink that raises is logged
+      and skipped, the extraction result is unaffected
+    - in worker processes (extract_many / iter_extract) each worker gets
+      its own copy, sinks included
+    """
+
+    def __init__(
+        self,
+        sinks: Iterable[Sink] = (),
+        profile: Optional[str] = None,
+        sample_every: int = 0,
+        profile_top: int = 25,
+    ) -> None:
+        if profile is not None and profile not in PROFILE_MODES:
+            raise ValueError(f"profile must be one of {PROFILE_MODES}, got {profile!r}")
+        if sample_every < 0:
+            raise ValueError("sample_every must be >= 0")
+        self.sinks: List[Sink] = list(sinks)
+        self.profile = profile
+        self.sample_every = sample_every
+        self.profile_top = profile_top
+        self._count = itertools.count(1)
+        self._profiling = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_count"], state["_profiling"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._count = itertools.count(1)
+        self._profiling = threading.Lock()
+
+    def start_profile(self) -> Optional[Union[_CProfileSampler, _TracemallocSampler]]:
+        """
+        A running sampler when this note is sampled, else None.
+        """
+        if self.profile is None or not self.sample_every:
+            return None
+        if next(self._count) % self.sample_every:
+            return None
+        if not self._profiling.acquire(blocking=False):
+            return None
+        try:
+            if self.profile == "cprofile":
+                return _CProfileSampler(self.profile_top)
+            return _TracemallocSampler(self.profile_top)
+        except BaseException:
+            self._profiling.release()
+            raise
+
+    def stop_profile(self, sampler: Union[_CProfileSampler, _TracemallocSampler]) -> Dict[str, Any]:
+        try:
+            return sampler.stop()
+        finally:
+            self._profiling.release()
+
+    def emit(self, metrics: ExtractionMetrics) -> None:
+        for sink in self.sinks:
+            try:
+                sink(metrics)
+            except Exception:
+                logger.exception("instrumentation sink %r failed", sink)
+
+
+# -----------------------------
+# Sinks
+# -----------------------------
+
+class LoggingSink:
+    """
+    One log record per note: stage times in ms and counters in the
+    message, the full ExtractionMetrics dict as `record.metrics`.
+    """
+
+    def __init__(self, logger_: Optional[logging.Logger] = None, level: int = logging.INFO) -> None:
+        self.logger = logger_ or logger
+        self.level = level
+
+    def __call__(self, metrics: ExtractionMetrics) -> None:
+        if not self.logger.isEnabledFor(self.level):
+            return
+        stages = " ".join(f"{name}={seconds * 1e3:.3f}" for name, seconds in metrics.stages.items())
+        counters = " ".join(f"{name}={value}" for name, value in metrics.counters.items())
+        self.logger.log(
+            self.level,
+            "extract backend=%s cached=%s total_ms=%.3f %s %s",
+            metrics.backend,
+            metrics.cached,
+            metrics.total * 1e3,
+            stages,
+            counters,
+            extra={"metrics": metrics.as_dict()},
+        )
+
+
+class PrometheusTextfileSink:
+    """
+    Aggregates every note and writes the Prometheus text exposition format
+    to `path` (node_exporter textfile collector style).
+
+    - rewritten atomically (temp file + rename) every `write_every` notes
+      and on flush()
+    - counters only (totals since the sink was created)
+    - meant for one process: with worker processes each worker holds its
+      own totals, so give each its own path or use a callback sink
+    - path=None only aggregates; render() serves the totals directly
+      (e.g. the /metrics endpoint of ui/server.py)
+    """
+
+    PREFIX = "dundieplz_extract"
+
+    def __init__(self, path: Optional[Union[str, Path]], write_every: int = 100) -> None:
+        self.path = Path(path) if path is not None else None
+        self.write_every = max(1, write_every)
+        self._lock = threading.Lock()
+        self._documents: Dict[str, int] = {}
+        self._stage_seconds: Dict[str, float] = {}
+        self._stage_calls: Dict[str, int] = {}
+        self._counters: Dict[str, int] = {}
+        self._pending = 0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __call__(self, metrics: ExtractionMetrics) -> None:
+        with self._lock:
+            key = f'backend="{metrics.backend}",cached="{str(metrics.cached).lower()}"'
+            self._documents[key] = self._documents.get(key, 0) + 1
+            for name, seconds in metrics.stages.items():
+                self._stage_seconds[name] = self._stage_seconds.get(name, 0.0) + seconds
+                self._stage_calls[name] = self._stage_calls.get(name, 0) + 1
+            for name, value in metrics.counters.items():
+                self._counters[name] = self._counters.get(name, 0) + value
+            self._pending += 1
+            if self._pending >= self.write_every and self.path is not None:
+                self._write()
+
+    def flush(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            self._write()
+
+    def render(self) -> str:
+        with self._lock:
+            return self._render()
+
+    def _render(self) -> str:
+        p = self.PREFIX
+        lines = [
+            f"# HELP {p}_documents_total Notes extracted.",
+            f"# TYPE {p}_documents_total counter",
+        ]
+        lines += [f"{p}_documents_total{{{key}}} {value}" for key, value in sorted(self._documents.items())]
+        lines += [
+            f"# HELP {p}_stage_seconds_total Time spent per extraction stage.",
+            f"# TYPE {p}_stage_seconds_total counter",
+        ]
+        lines += [
+            f'{p}_stage_seconds_total{{stage="{name}"}} {seconds:.9f}'
+            for name, seconds in self._stage_seconds.items()
+        ]
+        lines += [
+            f"# HELP {p}_stage_calls_total Notes that went through each stage.",
+            f"# TYPE {p}_stage_calls_total counter",
+        ]
+        lines += [f'{p}_stage_calls_total{{stage="{name}"}} {value}' for name, value in self._stage_calls.items()]
+        for name, value in self._counters.items():
+            lines += [f"# TYPE {p}_{name}_total counter", f"{p}_{name}_total {value}"]
+        return "\n".join(lines) + "\n"
+
+    def _write(self) -> None:
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(self._render(), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._pending = 0
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import re
+from array import array
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# -----------------------------
+# Character trigram language identifier
+# -----------------------------
+#
+# Naive-Bayes over the character trigrams of each word (padded with one
+# space on each side) with a precomputed model (data/langid_trigrams.bin,
+# built by scripts/build_langid_model.py):
+# - the model stores, per trigram, one uint8 cost per language: how many
+#   1/scale nats less likely that trigram is than under its most likely
+#   language. Only the differences between languages matter for the
+#   decision, so this is lossless up to quantization.
+# - on load the per-language costs are packed into one int per trigram
+#   (one lane per language), so a word costs one C-level sum() over dict
+#   lookups for all languages at once
+# - costs are memoized per whitespace token ("die," included), so the
+#   common case per token is one dict hit: notes repeat most of their words
+# - a token that clearly favours one language (DECISIVE_NATS) also adds
+#   one vote to that language's vote lane, so the same sum counts votes;
+#   votes reveal code-switched notes (LanguageGuess.secondary)
+# - text is scored in chunks of about CHUNK_CHARS and scoring stops as
+#   soon as the best language reaches the confidence threshold
+
+MODEL_PATH = Path(__file__).with_name("data") / "langid_trigrams.bin"
+MODEL_FORMAT = 1
+
+# Meta label for languages the model cannot tell apart / too little text.
+UNKNOWN = "unknown"
+
+# Chunks end at a space at most 2 * CHUNK_CHARS in. Costs of <= 255 per
+# trigram over the whole text (max_chars) stay far below 2**32 per lane.
+CHUNK_CHARS = 128
+_LANE_BITS = 32
+_LANE_MASK = (1 << _LANE_BITS) - 1
+_TOKEN_MEMO_SIZE = 50_000
+
+# Default decision thresholds (see identify()).
+THRESHOLD = 0.99
+MIN_CONFIDENCE = 0.5
+MAX_CHARS = 4096
+
+# Secondary languages: at least SECONDARY_SHARE of the decisive tokens
+# and at least SECONDARY_MIN_VOTES of them.
+DECISIVE_NATS = 2.0
+SECONDARY_SHARE = 0.15
+SECONDARY_MIN_VOTES = 3
+
+_NON_LETTER_RE = re.compile(r"[^\w\s]+|[\d_]+")
+
+
+def words(text: str) -> List[str]:
+    """
+    Lowercased letter runs (model alphabet); digits and punctuation split words.
+    """
+    return _NON_LETTER_RE.sub(" ", text.lower()).split()
+
+
+def trigrams(word: str) -> List[str]:
+    """
+    Trigrams of one word, padded with a space on each side.
+    """
+    padded = f" {word} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+# -----------------------------
+# Model
+# -----------------------------
+
+@dataclass(frozen=True)
+class LangIdModel:
+    """
+    Loaded trigram model.
+
+    - languages: meta labels, lane order of the packed costs
+    - scale: cost units per nat
+    - temperature: divides the summed log-likelihood before the softmax;
+      overlapping trigrams are far from independent, so the raw naive-Bayes
+      posterior would be overconfident
+    - packed: trigram -> per-language costs, one lane each; lanes
+      len(languages).. of a token's packed value hold its votes
+    - digest: short hash of the model file (cache keys / meta)
+    """
+
+    languages: Tuple[str, ...]
+    scale: float
+    temperature: float
+    packed: Dict[str, int]
+    digest: str
+    _token_costs: Dict[str, int] = field(default_factory=dict, compare=False, repr=False)
+
+    def score(self, tokens: List[str]) -> int:
+        """
+        Packed costs of lowercased whitespace tokens.
+        """
+        memo = self._token_costs
+        total = 0
+        for token in tokens:
+            cost = memo.get(token)
+            if cost is None:
+                if len(memo) >= _TOKEN_MEMO_SIZE:
+                    memo.clear()
+                cost = memo[token] = self._token_cost(token)
+            total += cost
+        return total
+
+    def _token_cost(self, token: str) -> int:
+        packed_get = self.packed.get
+        cost = sum(sum(map(packed_get, trigrams(word), repeat(0))) for word in words(token))
+        lanes = self.lanes(cost)
+        ranked = sorted(range(len(lanes)), key=lanes.__getitem__)
+        if len(ranked) > 1 and lanes[ranked[1]] - lanes[ranked[0]] >= DECISIVE_NATS * self.scale:
+            cost += 1 << ((len(lanes) + ranked[0]) * _LANE_BITS)
+        return cost
+
+    def lanes(self, packed: int, first: int = 0) -> List[int]:
+        """
+        Unpacks len(languages) lanes starting at lane `first`
+        (0: costs, len(languages): votes).
+        """
+        return [
+            (packed >> (lane * _LANE_BITS)) & _LANE_MASK
+            for lane in range(first, first + len(self.languages))
+        ]
+
+    def posterior(self, costs: List[int]) -> List[float]:
+        best = min(costs)
+        factor = 1.0 / (self.scale * self.temperature)
+        weights = [math.exp((best - c) * factor) for c in costs]
+        total = sum(weights)
+        return [w / total for w in weights]
+
+
+def write_model(
+    path: Path,
+    languages: List[str],
+    costs: Dict[str, List[int]],
+    scale: float,
+    temperature: float,
+) -> None:
+    """
+    Model file layout: one JSON header line, the trigrams (UTF-8, joined
+    by newlines, which never occur in the model alphabet), then a uint8
+    array of len(trigrams) x len(languages) costs, trigram-major.
+    """
+    grams = sorted(costs)
+    blob = "\n".join(grams).encode("utf-8")
+    table = array("B", (min(255, c) for g in grams for c in costs[g]))
+    header = {
+        "format": MODEL_FORMAT,
+        "languages": languages,
+        "scale": scale,
+        "temperature": temperature,
+        "grams": len(grams),
+        "gram_bytes": len(blob),
+    }
+    with open(path, "wb") as fh:
+        fh.write(json.dumps(header, sort_keys=True).encode("utf-8") + b"\n")
+        fh.write(blob)
+        fh.write(table.tobytes())
+
+
+def read_model(path: Path) -> LangIdModel:
+    raw = Path(path).read_bytes()
+    head, _, body = raw.partition(b"\n")
+    header = json.loads(head)
+    if header.get("format") != MODEL_FORMAT:
+        raise ValueError(f"unsupported langid model format: {header.get('format')!r}")
+
+    languages = tuple(header["languages"])
+    grams = body[:header["gram_bytes"]].decode("utf-8").split("\n")
+    table = array("B")
+    table.frombytes(body[header["gram_bytes"]:])
+    width = len(languages)
+    if len(grams) != header["grams"] or len(table) != len(grams) * width:
+        raise ValueError(f"corrupt langid model: {path}")
+
+    shifts = [lane * _LANE_BITS for lane in range(width)]
+    packed = {
+        gram: sum(table[row + lane] << shift for lane, shift in enumerate(shifts))
+        for gram, row in zip(grams, range(0, len(table), width))
+    }
+    return LangIdModel(
+        languages=languages,
+        scale=float(header["scale"]),
+        temperature=float(header["temperature"]),
+        packed=packed,
+        digest=hashlib.sha256(raw).hexdigest()[:16],
+    )
+
+
+@lru_cache(maxsize=1)
+def get_model() -> LangIdModel:
+    """
+    The shipped model, loaded on first use.
+    """
+    return read_model(MODEL_PATH)
+
+
+# -----------------------------
+# Identification
+# -----------------------------
+
+@dataclass(frozen=True)
+class LanguageGuess:
+    """
+    - language: best meta label ("en", "pt-BR", "es", "fr") or "unknown"
+      when confidence is below the minimum
+    - best: best label regardless of confidence ("unknown" only when no
+      word of the text is known to the model)
+    - confidence: posterior of `best`; 0.0 when nothing could be scored
+    - chars: characters scored before stopping
+    - secondary: other languages with a real share of the decisive
+      tokens in the scored part (code-switched notes)
+    """
+
+    language: str
+    best: str
+    confidence: float
+    chars: int
+    secondary: Tuple[str, ...] = ()
+
+
+def _chunks(text: str, max_chars: int) -> Iterator[Tuple[int, List[str]]]:
+    # Chunks end at a space so words are not cut in two; the chunk is
+    # only lowercased and split here, the rest happens per distinct token.
+    limit = min(len(text), max_chars)
+    pos = 0
+    while pos < limit:
+        end = text.find(" ", pos + CHUNK_CHARS, min(pos + 2 * CHUNK_CHARS, limit))
+        if end < 0:
+            end = min(pos + 2 * CHUNK_CHARS, limit)
+        yield end, text[pos:end].lower().split()
+        pos = end
+
+
+def identify(
+    text: str,
+    threshold: float = THRESHOLD,
+    min_confidence: float = MIN_CONFIDENCE,
+    max_chars: int = MAX_CHARS,
+) -> LanguageGuess:
+    """
+    Identifies the language of `text`.
+
+    - scores CHUNK_CHARS at a time and stops once the best language's
+      posterior reaches `threshold` (most notes settle in the first chunk)
+    - never reads past `max_chars`
+    - `language` falls back to "unknown" below `min_confidence`
+    """
+    model = get_model()
+    total = 0
+    chars = 0
+    posterior: Optional[List[float]] = None
+
+    for chars, chunk in _chunks(text, max_chars):
+        scored = model.score(chunk)
+        if not scored:
+            continue
+        total += scored
+        posterior = model.posterior(model.lanes(total))
+        if max(posterior) >= threshold:
+            break
+
+    if posterior is None:
+        return LanguageGuess(language=UNKNOWN, best=UNKNOWN, confidence=0.0, chars=chars)
+    confidence = max(posterior)
+    best = model.languages[posterior.index(confidence)]
+
+    votes = model.lanes(total, len(model.languages))
+    floor = max(SECONDARY_MIN_VOTES, SECONDARY_SHARE * sum(votes))
+    secondary = tuple(
+        lang for lang, count in zip(model.languages, votes) if lang != best and count >= floor
+    )
+    return LanguageGuess(
+        language=best if confidence >= min_confidence else UNKNOWN,
+        best=best,
+        confidence=confidence,
+        chars=chars,
+        secondary=secondary,
+    )
@@ -2,58 +2,35 @@
 
 from __future__ import annotations
 
-from typing import Dict, List, Protocol
+from typing import Dict, List, Optional, Protocol
+
+from dundieplz.extract.cue_engine import CueAutomaton
+from dundieplz.extract.packs import PackSet, all_packs, packs_for, packs_version
+from dundieplz.extract.preprocess import Document, prepare
 
 
 # -----------------------------
-# Cues (used by cue_matcher in extractor.py)
+# Cues (moved to per-language packs, see packs.py)
 # -----------------------------
 
-CONTEXTUAL_CUES: List[str] = [
-    "I gave my dog away",
-    "I gave my pet away",
-    "I gave my pets away",
-    "My pets will be fine",
-    "I separated the inheritance",
-    "I already separated the inheritance",
-    "My kids will be fine",
-    "My children will be fine",
-    "My wife will be fine",
-    "My husband will be fine",
-    "I feel sorry for my wife",
-    "I feel sorry for my husband",
-    "I feel sorry for my kids",
-    "I feel sorry for my children",
-    "I cannot keep waiting",
-    "Better I do it",
-]
-
-SUBJECTIVE_CUES: List[str] = [
-    "there is only one way to solve this",
-    "only one way to solve this",
-    "I cannot take it anymore",
-    "I am done",
-    "I am exhausted",
-    "I am a burden",
-    "I cause too much trouble",
-]
-
-AMBIGUOUS_CUES: List[str] = [
-    "saio da vida para entrar na historia",
-    "chega eu nao aguento mais",
-    "eu queria nao acordar amanha",
-]
-
-DIRECT_SUICIDAL_CUES: List[str] = [
-    "kill myself",
-    "suicide",
-    "want to die",
-    "wish i were dead",
-    "end it all",
-    "better off dead",
-    "eu queria nao acordar amanha",
-    "vou por uma bala na minha cabeca",
-]
+# Legacy module constants: every pack's cues of that category, merged.
+_LEGACY_CUE_LISTS = {
+    "CONTEXTUAL_CUES": "contextual",
+    "SUBJECTIVE_CUES": "subjective",
+    "AMBIGUOUS_CUES": "ambiguous",
+    "DIRECT_SUICIDAL_CUES": "direct",
+}
+
+
+def __getattr__(name: str) -> List[str]:
+    category = _LEGACY_CUE_LISTS.get(name)
+    if category is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return list(all_packs().cues[category])
+
+
+def _compile_direct_cues(packs: PackSet) -> CueAutomaton:
+    return CueAutomaton({"direct": packs.cues["direct"]}, accent_insensitive=True)
 
 
 # -----------------------------
@@ -65,6 +42,32 @@ class LLMClient(Protocol):
         ...
 
 
+class AsyncLLMClient(Protocol):
+    async def agenerate_json(self, prompt: str) -> Dict:
+        ...
+
+
+class LLMBackendError(Exception):
+    """
+    Backend call failed. status_code is set for HTTP-style backends.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        # Rate limits and server-side failures are transient; 4xx are not.
+        return self.status_code == 429 or (self.status_code is not None and self.status_code >= 500)
+
+
 # -----------------------------
 # Dummy backend (heuristic baseline)
 # -----------------------------
@@ -80,11 +83,17 @@ class DummyLLMClient:
     def __init__(self) -> None:
         self.backend_name = "dummy"
 
+    @property
+    def pattern_version(self) -> str:
+        # Cache invalidation: changes whenever a cue pack changes
+        return packs_version()
+
     def generate_json(self, prompt: str) -> Dict:
-        text = prompt or ""
-        lower = text.lower()
+        doc = prepare(prompt or "")
+        lower = doc.folded
 
-        ideation_hits = self._find_any(lower, DIRECT_SUICIDAL_CUES)
+        # Direct cues of the note's language only (packs.py)
+        ideation_hits = self._find_any(doc, packs_for(doc).matcher("direct_cues", _compile_direct_cues))
 
         temporal = "unknown"
         if any(w in lower for w in ["now", "right now", "today", "emergency department"]):
@@ -126,22 +135,19 @@ class DummyLLMClient:
             "missing_information": missing_information,
         }
 
-    def _find_any(self, lower_text: str, cues: List[str]) -> List[Dict]:
+    def _find_any(self, doc: Document, matcher: CueAutomaton) -> List[Dict]:
+        # Accent-insensitive: "nao acordar amanha" also matches the accented
+        # spelling; offsets refer to the original text.
         evidence: List[Dict] = []
-        for cue in cues:
-            cue_l = cue.lower()
-            start = 0
-            while True:
-                idx = lower_text.find(cue_l, start)
-                if idx == -1:
-                    break
+        found = matcher.scan(doc.plain)
+        for cue, spans in found["direct"]:
+            for start, end in doc.to_original_spans(spans):
                 evidence.append(
                     {
                         "text": cue,
-                        "start": idx,
-                        "end": idx + len(cue_l),
+                        "start": start,
+                        "end": end,
                         "source": "llm",
                     }
                 )
-                start = idx + 1
         return evidence
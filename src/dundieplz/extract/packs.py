@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Tuple, TypeVar
+
+from dundieplz.extract.cache import fingerprint
+from dundieplz.extract.langid import LanguageGuess
+from dundieplz.extract.preprocess import Document
+
+# -----------------------------
+# Per-language cue / pattern packs
+# -----------------------------
+#
+# One JSON file per language under data/packs/ (file name = meta language
+# label, e.g. pt-BR.json):
+#
+#   {"format": 1, "language": "en", "version": "1",
+#    "cues": {"contextual": [...], "subjective": [...], "ambiguous": [...],
+#             "direct": [...]},
+#    "patterns": {"denial": [...], "ideation": [...], ...}}
+#
+# - cues: literal phrases (cue matcher, DummyLLMClient)
+# - patterns: RuleLLMClient regex families
+# Packs are read on first use and kept for the life of the process, and
+# so are the matchers compiled from them (PackSet.matcher).
+
+T = TypeVar("T")
+
+PACK_DIR = Path(__file__).with_name("data") / "packs"
+PACK_FORMAT = 1
+
+CUE_CATEGORIES = ("contextual", "subjective", "ambiguous", "direct")
+
+# Documents identified with at least this confidence only run the packs
+# of their language and of any secondary (code-switched) language; the
+# rest (unknown language, or no pack for any of those) run every pack.
+ROUTE_CONFIDENCE = 0.9
+
+
+@dataclass(frozen=True)
+class CuePack:
+    """
+    One language's cues and patterns.
+
+    - tag: "<language>@<version>:<digest>", digest = hash of the file
+      bytes; recorded in ExtractorMeta.cue_packs
+    """
+
+    language: str
+    version: str
+    cues: Dict[str, Tuple[str, ...]]
+    patterns: Dict[str, Tuple[str, ...]]
+    digest: str
+
+    @property
+    def tag(self) -> str:
+        return f"{self.language}@{self.version}:{self.digest}"
+
+
+@dataclass(frozen=True)
+class PackSet:
+    """
+    The packs one document runs: cue and pattern lists merged in language
+    order (exact duplicates dropped), plus the tags of the packs used.
+    """
+
+    languages: Tuple[str, ...]
+    cues: Dict[str, Tuple[str, ...]]
+    patterns: Dict[str, Tuple[str, ...]]
+    tags: Tuple[str, ...]
+    _matchers: Dict[str, Any] = field(default_factory=dict, compare=False, repr=False)
+
+    def matcher(self, name: str, build: Callable[[PackSet], T]) -> T:
+        """
+        Matcher `name` compiled from this pack set by `build`, on first use only.
+        """
+        found = self._matchers.get(name)
+        if found is None:
+            found = self._matchers[name] = build(self)
+        return found
+
+
+def _string_lists(path: Path, section: str, obj: object) -> Dict[str, Tuple[str, ...]]:
+    if not isinstance(obj, dict):
+        raise ValueError(f"{path}: '{section}' must be an object of string lists")
+    out: Dict[str, Tuple[str, ...]] = {}
+    for name, items in obj.items():
+        if not isinstance(items, list) or not all(isinstance(i, str) for i in items):
+            raise ValueError(f"{path}: '{section}.{name}' must be a list of strings")
+        out[name] = tuple(items)
+    return out
+
+
+def read_pack(path: Path) -> CuePack:
+    raw = Path(path).read_bytes()
+    data = json.loads(raw)
+    if data.get("format") != PACK_FORMAT:
+        raise ValueError(f"{path}: unsupported pack format {data.get('format')!r}")
+    if data.get("language") != Path(path).stem:
+        raise ValueError(f"{path}: language {data.get('language')!r} does not match the file name")
+    cues = _string_lists(path, "cues", data.get("cues", {}))
+    unknown = set(cues) - set(CUE_CATEGORIES)
+    if unknown:
+        raise ValueError(f"{path}: unknown cue categories {sorted(unknown)}")
+    return CuePack(
+        language=data["language"],
+        version=str(data.get("version", "")),
+        cues=cues,
+        patterns=_string_lists(path, "patterns", data.get("patterns", {})),
+        digest=hashlib.sha256(raw).hexdigest()[:16],
+    )
+
+
+@lru_cache(maxsize=None)
+def available_languages() -> Tuple[str, ...]:
+    return tuple(sorted(p.stem for p in PACK_DIR.glob("*.json")))
+
+
+@lru_cache(maxsize=None)
+def load_pack(language: str) -> CuePack:
+    if language not in available_languages():
+        raise KeyError(f"no cue pack for language {language!r}")
+    return read_pack(PACK_DIR / f"{language}.json")
+
+
+def _merge(lists: Iterable[Tuple[str, ...]]) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(item for items in lists for item in items))
+
+
+@lru_cache(maxsize=None)
+def pack_set(languages: Tuple[str, ...]) -> PackSet:
+    packs = [load_pack(lang) for lang in languages]
+    pattern_names: List[str] = list(dict.fromkeys(n for p in packs for n in p.patterns))
+    return PackSet(
+        languages=languages,
+        cues={c: _merge(p.cues.get(c, ()) for p in packs) for c in CUE_CATEGORIES},
+        patterns={n: _merge(p.patterns.get(n, ()) for p in packs) for n in pattern_names},
+        tags=tuple(p.tag for p in packs),
+    )
+
+
+def all_packs() -> PackSet:
+    """
+    Every shipped pack (fallback route; also backs the legacy cue constants).
+    """
+    return pack_set(available_languages())
+
+
+def select_languages(guess: LanguageGuess) -> Tuple[str, ...]:
+    available = available_languages()
+    if guess.confidence < ROUTE_CONFIDENCE:
+        return available
+    wanted = {guess.language, *guess.secondary}
+    return tuple(lang for lang in available if lang in wanted) or available
+
+
+def packs_for(doc: Document) -> PackSet:
+    """
+    Routes a document to its language's pack (see ROUTE_CONFIDENCE).
+    """
+    return pack_set(select_languages(doc.langid))
+
+
+def reload_packs() -> None:
+    """
+    Drops the loaded packs (e.g. after editing a pack file or PACK_DIR).
+    """
+    available_languages.cache_clear()
+    load_pack.cache_clear()
+    pack_set.cache_clear()
+
+
+def packs_version() -> str:
+    """
+    Fingerprint of every shipped pack; part of extraction cache keys.
+    """
+    return fingerprint(all_packs().tags)
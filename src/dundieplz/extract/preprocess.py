@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import re
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from dundieplz.extract.langid import LanguageGuess, identify
+from dundieplz.extract.segment import Segmentation, segment
+
+# Part of the cache key: bump when normalization (or segmentation)
+# changes what matches.
+PREPROCESS_VERSION = "3"
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+# -----------------------------
+# Accent stripping table
+# -----------------------------
+
+_LATIN_RANGES = ((0x00C0, 0x0250), (0x1E00, 0x1F00))
+_COMBINING_RANGE = (0x0300, 0x0370)
+
+
+_COMBINING_RE = re.compile("[\u0300-\u036f]")
+_NON_ASCII_RE = re.compile("[^\x00-\x7f]")
+
+
+@lru_cache(maxsize=1)
+def _strip_table() -> Dict[str, Optional[str]]:
+    """
+    Accented Latin letter -> base letter (one char); combining
+    diacritics -> None (deleted). Built on first use.
+    """
+    table: Dict[str, Optional[str]] = {chr(cp): None for cp in range(*_COMBINING_RANGE)}
+    for lo, hi in _LATIN_RANGES:
+        for cp in range(lo, hi):
+            ch = chr(cp)
+            base = "".join(c for c in unicodedata.normalize("NFD", ch) if not unicodedata.combining(c))
+            if len(base) == 1 and base != ch:
+                table[ch] = base
+    return table
+
+
+def _replace_accented(text: str) -> str:
+    # Only non-ASCII chars reach Python; precomposed accents map 1:1, so
+    # offsets are unchanged. Callers handle combining marks separately.
+    table = _strip_table()
+    return _NON_ASCII_RE.sub(lambda m: table.get(m.group(), m.group()) or "", text)
+
+
+def strip_accents(text: str) -> str:
+    """
+    Accent-insensitive form of a (lowercased) string, e.g. for cue lists.
+    """
+    return text if text.isascii() else _replace_accented(text)
+
+
+def _fold(text: str) -> str:
+    # str.lower() keeps one char per char except for a few code points
+    # (e.g. U+0130); those stay as-is so offsets remain valid. casefold()
+    # is not used for the same reason ("ß" -> "ss").
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return "".join(low if len(low) == 1 else ch for ch, low in ((c, c.lower()) for c in text))
+
+
+# -----------------------------
+# Document
+# -----------------------------
+
+@dataclass
+class Document:
+    """
+    One note, normalized once and shared by the cue matcher and backends.
+
+    - text: original input; all reported offsets refer to it
+    - folded: lowercased, same length/offsets as text
+    - plain: folded with accents stripped (accent-insensitive matching);
+      may be shorter than text when it contains combining marks, use
+      to_original() to map plain offsets back
+    - tokens: word token (start, end) offsets in text, computed on demand
+    - langid: language guess with confidence (langid.py), computed on demand
+    - segments: sections and sentences (segment.py), offsets in text,
+      computed on demand
+    """
+
+    text: str
+    folded: str
+    plain: str
+    _offsets: Optional[array] = field(default=None, repr=False)
+
+    @property
+    def aligned(self) -> bool:
+        """
+        True when plain shares offsets with text (no combining marks).
+        """
+        return self._offsets is None
+
+    def to_original(self, start: int, end: int) -> Tuple[int, int]:
+        """
+        Maps a [start, end) span of `plain` onto `text`.
+        """
+        if self._offsets is None:
+            return start, end
+        return self._offsets[start], self._offsets[end]
+
+    def to_original_spans(self, spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """
+        to_original() for a list of spans; returns `spans` itself when
+        plain and text share offsets (the common case).
+        """
+        offsets = self._offsets
+        if offsets is None:
+            return spans
+        return [(offsets[s], offsets[e]) for s, e in spans]
+
+    def to_plain_spans(self, spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """
+        Inverse of to_original_spans(): maps spans of `text` onto `plain`.
+        """
+        offsets = self._offsets
+        if offsets is None:
+            return spans
+        return [(bisect_left(offsets, s), bisect_left(offsets, e)) for s, e in spans]
+
+    @cached_property
+    def tokens(self) -> List[Tuple[int, int]]:
+        return [m.span() for m in _TOKEN_RE.finditer(self.text)]
+
+    @cached_property
+    def langid(self) -> LanguageGuess:
+        return identify(self.folded)
+
+    @cached_property
+    def segments(self) -> Segmentation:
+        return segment(self.folded)
+
+    def seed_segments(self, segments: Segmentation) -> None:
+        """
+        Installs segments computed elsewhere (segment.resegment() during
+        incremental re-extraction) instead of segmenting the whole note.
+        """
+        self.__dict__["segments"] = segments
+
+
+_local = threading.local()
+
+
+def prepare(text: str) -> Document:
+    """
+    Returns the Document for one note.
+
+    The last Document is memoized per thread, so the extractor, the
+    backend and the cue matcher all share one normalization pass for the
+    same note without passing it through the LLMClient protocol.
+    """
+    text = text or ""
+    last = getattr(_local, "doc", None)
+    if last is not None and last.text == text:
+        return last
+    doc = _build_document(text)
+    _local.doc = doc
+    return doc
+
+
+def _build_document(text: str) -> Document:
+    # ASCII notes share one lowercased string for folded and plain; others
+    # take one regex substitution over their non-ASCII chars, plus an
+    # offset map only when combining marks have to be removed.
+    folded = _fold(text)
+    if text.isascii():
+        return Document(text=text, folded=folded, plain=folded)
+    if _COMBINING_RE.search(folded) is None:
+        return Document(text=text, folded=folded, plain=_replace_accented(folded))
+
+    table = _strip_table()
+    chars: List[str] = []
+    offsets = array("l")
+    for i, ch in enumerate(folded):
+        repl = table.get(ch, ch)
+        if repl is None:
+            continue
+        chars.append(repl)
+        offsets.append(i)
+    offsets.append(len(text))
+    return Document(text=text, folded=folded, plain="".join(chars), _offsets=offsets)
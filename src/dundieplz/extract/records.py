@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from pydantic import TypeAdapter
+
+from dundieplz.schemas.extractor_schema import (
+    EvidenceSource,
+    ExtractionResult,
+    ExtractorMeta,
+    Presence,
+    Temporal,
+)
+
+
+# -----------------------------
+# Internal result records
+# -----------------------------
+#
+# Validation-free mirror of the ExtractionResult tree (same field names,
+# same order). The extractor fills these in; pydantic models are only
+# produced at the API boundary:
+# - to_model(): one pydantic-core pass over the whole tree
+#   (from_attributes), instead of one validated constructor per node
+# - to_json(): serialized straight from the records, byte-identical to
+#   ExtractionResult.model_dump_json(); no model is built at all
+
+SIGNAL_NAMES = ("suicidal_ideation", "self_harm", "intent", "plan", "past_behavior")
+
+_META_DEFAULTS = {name: f.default for name, f in ExtractorMeta.model_fields.items()}
+
+
+@dataclass(slots=True)
+class SpanRecord:
+    text: str
+    start: Optional[int] = None
+    end: Optional[int] = None
+    source: EvidenceSource = EvidenceSource.llm
+
+
+@dataclass(slots=True)
+class SignalRecord:
+    presence: Presence = Presence.indeterminate
+    evidence: List[SpanRecord] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class SignalsRecord:
+    suicidal_ideation: SignalRecord = field(default_factory=SignalRecord)
+    self_harm: SignalRecord = field(default_factory=SignalRecord)
+    intent: SignalRecord = field(default_factory=SignalRecord)
+    plan: SignalRecord = field(default_factory=SignalRecord)
+    past_behavior: SignalRecord = field(default_factory=SignalRecord)
+    temporal: Temporal = Temporal.unknown
+    uncertainty_cues: List[str] = field(default_factory=list)
+    missing_information: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class CueHitRecord:
+    cue: str
+    evidence: List[SpanRecord] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class CueHitsRecord:
+    contextual: List[CueHitRecord] = field(default_factory=list)
+    subjective: List[CueHitRecord] = field(default_factory=list)
+    ambiguous: List[CueHitRecord] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class MetaRecord:
+    extractor_name: str = _META_DEFAULTS["extractor_name"]
+    extractor_version: str = _META_DEFAULTS["extractor_version"]
+    llm_backend: str = _META_DEFAULTS["llm_backend"]
+    language: str = _META_DEFAULTS["language"]
+    language_confidence: float = _META_DEFAULTS["language_confidence"]
+    cue_packs: List[str] = field(default_factory=list)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass(slots=True)
+class ResultRecord:
+    text: str
+    signals: SignalsRecord = field(default_factory=SignalsRecord)
+    cue_hits: CueHitsRecord = field(default_factory=CueHitsRecord)
+    meta: MetaRecord = field(default_factory=MetaRecord)
+
+    def to_model(self) -> ExtractionResult:
+        return ExtractionResult.model_validate(self, from_attributes=True)
+
+    def to_json(self) -> bytes:
+        return _result_adapter().dump_json(self)
+
+
+@lru_cache(maxsize=None)
+def _result_adapter() -> TypeAdapter:
+    # built on first serialization rather than at import
+    return TypeAdapter(ResultRecord)
+
+
+# -----------------------------
+# Backend dict -> records
+# -----------------------------
+#
+# Backend output is untrusted JSON, so this is where the checks the
+# pydantic constructors used to do now live: enum values fall back to
+# their defaults, offsets are coerced to int, cue lists to str.
+
+_PRESENCE = {p.value: p for p in Presence}
+_TEMPORAL = {t.value: t for t in Temporal}
+
+
+def _enum_value(table: Dict, value: Any, default: Any) -> Any:
+    # Table lookup instead of Enum(value): same result, no exception path.
+    return table.get(value, default) if isinstance(value, str) else default
+
+
+def _opt_int(value: Any) -> Optional[int]:
+    if value is None or type(value) is int:
+        return value
+    return int(value)
+
+
+def span_from_dict(obj: Dict, source: EvidenceSource) -> SpanRecord:
+    text = obj.get("text", "")
+    return SpanRecord(
+        text if type(text) is str else str(text),
+        _opt_int(obj.get("start")),
+        _opt_int(obj.get("end")),
+        source,
+    )
+
+
+def signal_from_dict(obj: Dict, source: EvidenceSource) -> SignalRecord:
+    return SignalRecord(
+        _enum_value(_PRESENCE, obj.get("presence"), Presence.indeterminate),
+        [span_from_dict(ev, source) for ev in obj.get("evidence", []) or []],
+    )
+
+
+def temporal_from_value(value: Any) -> Temporal:
+    return _enum_value(_TEMPORAL, value, Temporal.unknown)
+
+
+def signals_from_dict(llm_out: Dict, source: EvidenceSource) -> SignalsRecord:
+    """
+    Converts a backend JSON dict into a SignalsRecord.
+    """
+    signals = {name: signal_from_dict(llm_out.get(name, {}), source) for name in SIGNAL_NAMES}
+    return SignalsRecord(
+        **signals,
+        temporal=temporal_from_value(llm_out.get("temporal", "unknown")),
+        uncertainty_cues=[str(c) for c in llm_out.get("uncertainty_cues", []) or []],
+        missing_information=[str(m) for m in llm_out.get("missing_information", []) or []],
+    )
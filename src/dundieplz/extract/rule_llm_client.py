@@ -2,14 +2,236 @@
 
 import re
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
 
+from dundieplz.extract.incremental import TextEdit
+from dundieplz.extract.packs import PackSet, packs_for, packs_version
+from dundieplz.extract.preprocess import Document, prepare
+from dundieplz.extract.segment import Segmentation, resegment
+from dundieplz.extract.spans import Span, dedupe_spans
+
+try:
+    from re import _parser as _sre_parser
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parser
+
+
+_REGEX_META = frozenset("\\()[]{}?*+.|^$")
+
+
+def _literal_prefix(pattern: str) -> Tuple[bool, str]:
+    """
+    Splits a pattern into (starts with \\b, literal text every match begins with).
+    Returns an empty literal when no safe prefix can be read off the pattern.
+    """
+    anchored = pattern.startswith(r"\b")
+    body = pattern[2:] if anchored else pattern
+    if "|" in body:
+        return anchored, ""
+    out: List[str] = []
+    for i, ch in enumerate(body):
+        if ch in _REGEX_META:
+            break
+        if i + 1 < len(body) and body[i + 1] in "?*{":
+            break
+        out.append(ch)
+    return anchored, "".join(out)
+
+
+def _trie_regex(strings: List[str]) -> str:
+    """
+    Regex matching any of `strings`, factored as a trie so the regex engine
+    does not retry every alternative at every position.
+    """
+    trie: Dict[str, dict] = {}
+    for s in strings:
+        node = trie
+        for ch in s:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        # A complete prefix already flags a candidate; longer ones add nothing.
+        if "" in node:
+            return ""
+        alts = [re.escape(ch) + emit(child) for ch, child in sorted(node.items())]
+        return alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+
+    return emit(trie)
+
+
+class PatternFamilies:
+    """
+    Pattern families compiled once for a single scan of the text.
+
+    - one trie-factored regex over the patterns' literal prefixes finds every
+      position where some pattern can start (one C-level pass)
+    - only at those positions are the per-family alternations checked
+    - per family, the longest match at each position is kept, which is what
+      containment dedup retains from separate per-pattern scans
+    """
+
+    def __init__(self, families: Dict[str, List[str]], flags: int = re.IGNORECASE) -> None:
+        self.names: List[str] = list(families.keys())
+        active = [name for name in self.names if families[name]]
+        self._family_res = [
+            (name, re.compile("|".join(f"(?:{p})" for p in families[name]), flags))
+            for name in active
+        ]
+        self._pattern_res = {
+            name: [re.compile(p, flags) for p in families[name]] for name in active
+        }
+
+        anchored: List[str] = []
+        unanchored: List[str] = []
+        opaque: List[str] = []
+        for name in active:
+            for pat in families[name]:
+                is_anchored, literal = _literal_prefix(pat)
+                if not literal or flags & re.VERBOSE:
+                    opaque.append(f"(?:{pat})")
+                elif is_anchored:
+                    anchored.append(literal)
+                else:
+                    unanchored.append(literal)
+
+        branches = opaque
+        if unanchored:
+            branches = [_trie_regex(unanchored)] + branches
+        if anchored:
+            branches = [r"\b" + _trie_regex(anchored)] + branches
+        self._finder = re.compile("(?=" + "|".join(branches) + ")", flags) if branches else None
+
+    def scan(
+        self, text: str, ranges: Optional[Sequence[Tuple[int, int]]] = None
+    ) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Returns {family: [(start, end), ...]} with one span per matching start.
+        With `ranges`, only those (start, end) slices of text are scanned and
+        no match extends past its range; offsets stay those of `text`.
+        """
+        found: Dict[str, List[Tuple[int, int]]] = {name: [] for name in self.names}
+        if self._finder is None:
+            return found
+
+        for start, stop in ranges if ranges is not None else ((0, len(text)),):
+            for m in self._finder.finditer(text, start, stop):
+                pos = m.start()
+                for name, family_re in self._family_res:
+                    if not family_re.match(text, pos, stop):
+                        continue
+                    end = max(
+                        pm.end() for pm in (p.match(text, pos, stop) for p in self._pattern_res[name]) if pm
+                    )
+                    found[name].append((pos, end))
+        return found
+
+
+# Pattern families RuleLLMClient reads from the packs' "patterns" section.
+FAMILIES = (
+    "denial",
+    "ideation",
+    "attempt",
+    "firearm",
+    "indirect",
+    "temporal_current",
+    "temporal_recent",
+    "temporal_past",
+    "temporal_future",
+)
+
+
+# Sections (segment.py) a family is NOT matched in. Family history is
+# about relatives; past medical history and the plan carry time words
+# that belong to other episodes or to follow-up ("return today", "next
+# week"). Notes without section headers are matched whole.
+_RELATIVES = frozenset({"family_history"})
+_OTHER_EPISODES = _RELATIVES | {"medical_history"}
+
+FAMILY_SCOPES: Dict[str, FrozenSet[str]] = {
+    "denial": _RELATIVES,
+    "ideation": _RELATIVES,
+    "attempt": _RELATIVES,
+    "firearm": _RELATIVES,
+    "indirect": _RELATIVES,
+    "temporal_current": _OTHER_EPISODES | {"plan"},
+    "temporal_recent": _OTHER_EPISODES,
+    "temporal_past": _RELATIVES,
+    "temporal_future": _OTHER_EPISODES | {"plan"},
+}
+
+
+def compile_families(packs: PackSet, names: Sequence[str] = FAMILIES) -> PatternFamilies:
+    return PatternFamilies({name: list(packs.patterns.get(name, ())) for name in names})
+
+
+def _families_builder(names: Tuple[str, ...]) -> Callable[[PackSet], PatternFamilies]:
+    return lambda packs: compile_families(packs, names)
+
+
+# Patterns without an upper bound on their match length ("\d+ days? ago")
+# count as this long when sizing the incremental re-scan margin.
+UNBOUNDED_MATCH = 256
+
+
+def max_match_length(packs: PackSet) -> int:
+    """
+    Longest match any family pattern can produce (capped at UNBOUNDED_MATCH).
+    """
+    longest = 0
+    for name in FAMILIES:
+        for pattern in packs.patterns.get(name, ()):
+            try:
+                width = _sre_parser.parse(pattern, re.IGNORECASE).getwidth()[1]
+            except Exception:
+                width = UNBOUNDED_MATCH
+            longest = max(longest, min(width, UNBOUNDED_MATCH))
+    return longest
+
+
+def _clip(ranges: List[Tuple[int, int]], lo: int, hi: int) -> List[Tuple[int, int]]:
+    return [(max(s, lo), min(e, hi)) for s, e in ranges if s < hi and e > lo]
+
+
+@dataclass
+class ScanState:
+    """
+    Raw family matches of one note (text offsets, one per matching start,
+    before dedup) and what they depend on, for generate_json_incremental.
+    """
 
-@dataclass(frozen=True)
-class Span:
     text: str
-    start: int
-    end: int
+    languages: Tuple[str, ...]
+    segments: Segmentation
+    found: Dict[str, List[Tuple[int, int]]]
+
+
+def _section_keys(segments: Segmentation, edit: Optional[TextEdit] = None) -> set:
+    """
+    (name, start, header end) of each section; with `edit`, the sections
+    outside the edited region in post-edit offsets.
+    """
+    if edit is None:
+        return {(s.name, s.start, s.header_end) for s in segments.sections}
+    keys = set()
+    for s in segments.sections:
+        if s.start < edit.start:
+            keys.add((s.name, s.start, s.header_end))
+        elif s.start >= edit.old_end:
+            keys.add((s.name, s.start + edit.delta, s.header_end + edit.delta))
+    return keys
+
+
+def _same_section(segments: Segmentation, first: List[Span], second: List[Span]) -> bool:
+    """
+    True if some span of `first` and some span of `second` share a section.
+    """
+    if not (first and second):
+        return False
+    if len(segments.sections) == 1:
+        return True
+    sections = {segments.section_index(sp.start) for sp in first}
+    return any(segments.section_index(sp.start) in sections for sp in second)
 
 
 class RuleLLMClient:
@@ -19,95 +241,117 @@ class RuleLLMClient:
     - Deterministic & audit-friendly
     - NOT a clinical model
     - Returns JSON-like dict compatible with Extractor schema adapter
+    - Patterns come from the per-language packs (packs.py); each note
+      only runs its own language's families
+    - Each family only runs in its sections (FAMILY_SCOPES), and
+      temporal pairs (attempt + "now") must share a section
+    - generate_json_incremental() re-scans only the edited part of a note
     """
 
+    # Scan states kept for generate_json_incremental (most recent texts)
+    STATE_CACHE_SIZE = 32
+
     def __init__(self) -> None:
         # IMPORTANT: used by Extractor to tag meta.llm_backend and EvidenceSource
         self.backend_name = "rules"
 
-        # Explicit denial patterns
-        self._denial_patterns = [
-            r"\bdenies suicidal ideation\b",
-            r"\bdenies suicide ideation\b",
-            r"\bdenies suicidal thoughts\b",
-            r"\bdenies SI\b",
-        ]
-
-        # Direct ideation language
-        self._ideation_patterns = [
-            r"\bi want to die\b",
-            r"\bwant to die\b",
-            r"\bwish i were dead\b",
-            r"\bend it all\b",
-            r"\bkill myself\b",
-            r"\bsuicide\b",
-            r"\bbetter off dead\b",
-        ]
+        # Cache invalidation: changes whenever a cue/pattern pack changes
+        self.pattern_version = packs_version()
 
-        # Attempt / intoxication markers
-        self._attempt_patterns = [
-            r"\bsuicide attempt\b",
-            r"\battempted suicide\b",
-            r"\bexogenous intoxication\b",
-            r"\boverdose\b",
-            r"\bintoxication\b",
-        ]
-
-        # Firearm / post-mortem markers
-        self._firearm_patterns = [
-            r"\bgunshot\b",
-            r"\bfirearm\b",
-            r"\bfirearm injury\b",
-            r"\btraumatic brain injury\b",
-            r"\bleft temporal region\b",
-        ]
-
-        # Indirect / third-party reconstruction
-        self._indirect_intent_patterns = [
-            r"\bfarewell messages\b",
-            r"\bfarewell message\b",
-            r"\bleft a letter\b",
-            r"\bleft (?:a )?note\b",
-        ]
-
-        # Temporal hints
-        self._temporal_current_patterns = [
-            r"\bemergency department\b",
-            r"\bat triage\b",
-            r"\bchief complaint\b",
-            r"\btoday\b",
-            r"\bnow\b",
-            r"\bright now\b",
-        ]
-        self._temporal_recent_patterns = [
-            r"\byesterday\b",
-            r"\blast night\b",
-            r"\bearlier today\b",
-            r"\bthree months ago\b",
-            r"\b(\d+)\s+months?\s+ago\b",
-            r"\brecent\b",
-            r"\boutpatient\b",
-            r"\bpsychiatric assessment\b",
-        ]
-        self._temporal_past_patterns = [
-            r"\bdeath was confirmed\b",
-            r"\bwithout vital signs\b",
-            r"\bmedical examiner\b",
-            r"\bpost-mortem\b",
-            r"\bambulance\b",
-            r"\bsamu\b",
-        ]
+        self._states: Dict[str, ScanState] = {}
 
     def generate_json(self, prompt: str) -> Dict:
         text = self._extract_text_block(prompt) or prompt
         return self._extract_signals_from_text(text)
 
+    def generate_json_incremental(self, previous_text: str, text: str, edit: TextEdit) -> Dict:
+        """
+        generate_json(text) for `text` = `previous_text` with `edit` applied.
+
+        Matches further than the longest pattern from the edit are reused
+        from the previous scan (kept for the last STATE_CACHE_SIZE texts;
+        otherwise previous_text is scanned once). Only the edited region
+        plus that margin is scanned again, widened to whole sections when
+        the edit adds, removes or renames a section header.
+        """
+        state = self._states.pop(previous_text, None)
+        if state is None:
+            state = self._scan_state(prepare(previous_text))
+        doc = prepare(text)
+        if not doc.aligned or packs_for(doc).languages != state.languages:
+            new_state = self._scan_state(doc)
+        else:
+            new_state = self._rescan(state, doc, edit)
+        self._remember(state)
+        self._remember(new_state)
+        return self._decide(self._spans(doc, new_state.found), doc.segments)
+
+    def _remember(self, state: ScanState) -> None:
+        self._states.pop(state.text, None)
+        self._states[state.text] = state
+        while len(self._states) > self.STATE_CACHE_SIZE:
+            self._states.pop(next(iter(self._states)))
+
+    def _scan_state(self, doc: Document) -> ScanState:
+        return ScanState(doc.text, packs_for(doc).languages, doc.segments, self._scan_raw(doc))
+
+    def _rescan(self, state: ScanState, doc: Document, edit: TextEdit) -> ScanState:
+        packs = packs_for(doc)
+        n = len(doc.text)
+        segments = resegment(state.segments, doc.text, edit.start, edit.old_end, edit.new_end)
+        doc.seed_segments(segments)
+
+        # Matches starting in [lo, hi) are found again; the rest are reused.
+        margin = packs.matcher("max_match_length", max_match_length) + 1
+        lo, hi = edit.start - margin, edit.new_end + margin
+        for _, start, _ in _section_keys(state.segments, edit) ^ _section_keys(segments):
+            lo = min(lo, start - margin)
+            hi = max(hi, segments.section_at(start).end)
+        if any(edit.start <= s.start < edit.old_end for s in state.segments.sections):
+            # a header was deleted: the text after the edit changed section
+            hi = max(hi, segments.section_at(edit.new_end).end)
+        lo, hi = max(0, lo), min(n, hi)
+
+        fresh = self._scan_raw(doc, (lo, min(n, hi + margin)))
+        found: Dict[str, List[Tuple[int, int]]] = {}
+        for name in FAMILIES:
+            old = state.found[name]
+            found[name] = (
+                [sp for sp in old if sp[0] < lo]
+                + [sp for sp in fresh[name] if sp[0] < hi]
+                + [(s + edit.delta, e + edit.delta) for s, e in old if s + edit.delta >= hi and s >= edit.old_end]
+            )
+        return ScanState(doc.text, packs.languages, segments, found)
+
+    # ------------------------------
+    # Chunked extraction (chunking.py)
+    # ------------------------------
+
+    def scan_window(self, text: str) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Family matches of one window of a long note (window offsets,
+        deduped per family), for decide_windows().
+        """
+        return {name: [(sp.start, sp.end) for sp in spans] for name, spans in self._scan(text).items()}
+
+    def decide_windows(self, doc: Document, found: Dict[str, List[Tuple[int, int]]]) -> Dict:
+        """
+        generate_json() output for the whole note from the matches of all
+        its windows (document offsets): the same decision as on the
+        unchunked note, e.g. for a denial and ideation language that land
+        in different windows.
+        """
+        return self._decide(self._spans(doc, found), doc.segments)
+
     def _extract_signals_from_text(self, text: str) -> Dict:
-        denial_spans = self._find_any(text, self._denial_patterns)
-        ideation_spans = self._find_any(text, self._ideation_patterns)
-        attempt_spans = self._find_any(text, self._attempt_patterns)
-        firearm_spans = self._find_any(text, self._firearm_patterns)
-        indirect_spans = self._find_any(text, self._indirect_intent_patterns)
+        return self._decide(self._scan(text), prepare(text).segments)
+
+    def _decide(self, found: Dict[str, List[Span]], segments: Segmentation) -> Dict:
+        denial_spans = found["denial"]
+        ideation_spans = found["ideation"]
+        attempt_spans = found["attempt"]
+        firearm_spans = found["firearm"]
+        indirect_spans = found["indirect"]
 
         uncertainty_cues: List[str] = []
         missing_information: List[str] = []
@@ -154,7 +398,7 @@ class RuleLLMClient:
         self_harm = self._signal("indeterminate", [])
 
         # temporal
-        temporal = self._infer_temporal(text, attempt_spans, firearm_spans, indirect_spans)
+        temporal = self._infer_temporal(found, segments)
 
         # missing info hint
         if suicidal_ideation["presence"] == "present" and plan["presence"] in ("indeterminate", "absent"):
@@ -171,26 +415,26 @@ class RuleLLMClient:
             "missing_information": missing_information,
         }
 
-    def _infer_temporal(
-        self,
-        text: str,
-        attempt_spans: List[Span],
-        firearm_spans: List[Span],
-        indirect_spans: List[Span],
-    ) -> str:
-        if attempt_spans and self._has_any_patterns(text, self._temporal_current_patterns):
+    def _infer_temporal(self, found: Dict[str, List[Span]], segments: Optional[Segmentation] = None) -> str:
+        # Without segments the whole note is one scope.
+        def together(first: List[Span], second: List[Span]) -> bool:
+            if segments is None:
+                return bool(first and second)
+            return _same_section(segments, first, second)
+
+        if together(found["attempt"], found["temporal_current"]):
             return "current"
 
-        if (firearm_spans or indirect_spans) and self._has_any_patterns(text, self._temporal_past_patterns):
+        if together(found["firearm"] + found["indirect"], found["temporal_past"]):
             return "past"
 
-        if self._has_any_patterns(text, self._temporal_recent_patterns):
+        if found["temporal_recent"]:
             return "recent"
 
-        if indirect_spans:
+        if found["indirect"]:
             return "past"
 
-        if re.search(r"\btonight\b|\btomorrow\b|\bnext week\b", text, flags=re.IGNORECASE):
+        if found["temporal_future"]:
             return "future"
 
         return "unknown"
@@ -207,30 +451,55 @@ class RuleLLMClient:
             "evidence": [{"text": sp.text, "start": sp.start, "end": sp.end, "source": "rule"} for sp in evidence],
         }
 
-    def _has_any_patterns(self, text: str, patterns: List[str]) -> bool:
-        return any(re.search(p, text, flags=re.IGNORECASE) for p in patterns)
+    def _scan(self, text: str) -> Dict[str, List[Span]]:
+        """
+        Scan of the note's pattern families, restricted to their sections;
+        spans deduped per family. Families whose sections cover the same
+        ranges share one pass (a note without headers: one pass in all).
+        Runs on the shared accent-stripped text (preprocess.py); spans are
+        mapped back to the original text.
+        """
+        doc = prepare(text)
+        return self._spans(doc, self._scan_raw(doc))
+
+    def _spans(self, doc: Document, found: Dict[str, List[Tuple[int, int]]]) -> Dict[str, List[Span]]:
+        text = doc.text
+        return {
+            name: self._dedupe_overlapping_spans([Span(text=text[s:e], start=s, end=e) for s, e in found[name]])
+            for name in FAMILIES
+        }
 
-    def _find_any(self, text: str, patterns: List[str]) -> List[Span]:
-        spans: List[Span] = []
-        for pat in patterns:
-            for m in re.finditer(pat, text, flags=re.IGNORECASE):
-                spans.append(Span(text=text[m.start() : m.end()], start=m.start(), end=m.end()))
-        return self._dedupe_overlapping_spans(spans)
+    def _scan_raw(
+        self, doc: Document, window: Optional[Tuple[int, int]] = None
+    ) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Family matches in text offsets, one per matching start, not deduped;
+        with `window` only matches within it.
+        """
+        packs = packs_for(doc)
+        segments = doc.segments
+
+        ranges_by_scope: Dict[FrozenSet[str], Tuple[Tuple[int, int], ...]] = {}
+        groups: Dict[Tuple[Tuple[int, int], ...], List[str]] = {}
+        for name in FAMILIES:
+            scope = FAMILY_SCOPES.get(name, frozenset())
+            ranges = ranges_by_scope.get(scope)
+            if ranges is None:
+                ranges = ranges_by_scope[scope] = tuple(segments.ranges(scope))
+            groups.setdefault(ranges, []).append(name)
+
+        out: Dict[str, List[Tuple[int, int]]] = {}
+        for ranges, names in groups.items():
+            if len(names) == len(FAMILIES):
+                families = packs.matcher("rule_families", compile_families)
+            else:
+                key = tuple(names)
+                families = packs.matcher("rule_families:" + ",".join(key), _families_builder(key))
+            scoped = list(ranges) if window is None else _clip(list(ranges), *window)
+            for name, found in families.scan(doc.plain, doc.to_plain_spans(scoped)).items():
+                out[name] = doc.to_original_spans(found)
+        return {name: out[name] for name in FAMILIES}
 
     def _dedupe_overlapping_spans(self, spans: List[Span]) -> List[Span]:
-        if not spans:
-            return []
-
-        spans_sorted = sorted(spans, key=lambda s: (s.start, -(s.end - s.start), s.text.lower()))
-        kept: List[Span] = []
-
-        for sp in spans_sorted:
-            if any(sp.start >= kp.start and sp.end <= kp.end for kp in kept):
-                continue
-            kept.append(sp)
-
-        kept = sorted(kept, key=lambda s: (s.start, s.end))
-        uniq: Dict[Tuple[int, int, str], Span] = {}
-        for sp in kept:
-            uniq[(sp.start, sp.end, sp.text)] = sp
-        return list(uniq.values())
+        # Sort-and-sweep containment dedup, O(n log n); see spans.py
+        return dedupe_spans(spans)
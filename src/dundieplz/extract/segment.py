@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, FrozenSet, List, Tuple
+
+# -----------------------------
+# Section headers
+# -----------------------------
+#
+# A header is a known alias at the start of a line, followed directly by
+# a colon or by the end of the line ("Plan to end it all: ..." is not a
+# header). Free-text notes rarely close a section with another header, so
+# a section ends early:
+# - a one-line entry ("FH: noncontributory.") ends with its line
+# - a header alone on its line ("Family history:") runs to the first
+#   blank line after its content, or to the next header
+# Text outside every section (before the first header, after a section
+# ended, or in a note without headers) belongs to the BODY section.
+
+BODY = "body"
+
+SECTION_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "chief_complaint": (
+        "chief complaint", "presenting complaint", "reason for visit", "reason for consultation", "cc",
+        "queixa principal", "motivo da consulta", "qp",
+    ),
+    "history": (
+        "history of present illness", "present illness", "clinical history", "history", "hpi",
+        "história da doença atual", "historia da doenca atual", "anamnese", "hda",
+    ),
+    "family_history": (
+        "family history", "fh",
+        "história familiar", "historia familiar", "antecedentes familiares",
+    ),
+    "medical_history": (
+        "personal medical history", "past medical history", "medical history", "past history", "pmh",
+        "antecedentes pessoais", "antecedentes", "comorbidades",
+    ),
+    "medications": (
+        "current medications", "medications",
+        "medicações em uso", "medicacoes em uso", "medicações", "medicacoes",
+    ),
+    "mental_status": (
+        "mental status examination", "mental status exam", "mental status", "mse",
+        "exame do estado mental", "exame psíquico", "exame psiquico",
+    ),
+    "triage": (
+        "at triage", "triage", "vital signs", "vitals",
+        "triagem", "sinais vitais",
+    ),
+    "assessment": (
+        "assessment", "impression", "diagnoses", "diagnosis",
+        "hipótese diagnóstica", "hipotese diagnostica", "diagnóstico", "diagnostico", "hd",
+    ),
+    "plan": (
+        "plan", "conduct", "recommendations", "disposition",
+        "conduta", "plano",
+    ),
+    "outcome": (
+        "outcome", "evolution",
+        "evolução", "evolucao", "desfecho",
+    ),
+    "cause_of_death": (
+        "cause of death",
+        "causa da morte", "causa mortis",
+    ),
+}
+
+_ALIAS_TO_SECTION = {alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+# Longest aliases first so "history of present illness" wins over "history".
+_HEADER_RE = re.compile(
+    r"[ \t]*(?:[-*#>]+[ \t]*)?(?P<alias>"
+    + "|".join(re.escape(a) for a in sorted(_ALIAS_TO_SECTION, key=len, reverse=True))
+    + r")\b[ \t]*(?::|$)",
+    re.MULTILINE,
+)
+
+_BLANK_LINE_RE = re.compile(r"\n[ \t\r]*(?=\n)")
+_SPACE_RE = re.compile(r"\s*")
+
+
+# -----------------------------
+# Sentences
+# -----------------------------
+
+# End punctuation (plus closing quotes/brackets) before whitespace, or a
+# line break; a period after a lone letter ("M.F.A.") or a known
+# abbreviation does not end a sentence.
+_BOUNDARY_RE = re.compile(r"[.!?]+[\"'”’)\]]*(?=\s)|\n")
+_ABBREVIATIONS = frozenset({
+    "dr", "dra", "mr", "mrs", "ms", "sr", "sra", "st", "vs", "approx", "e.g", "i.e", "etc",
+})
+_WORD_BEFORE_RE = re.compile(r"([\w.]+)\.+$")
+
+
+@dataclass(frozen=True)
+class Section:
+    """
+    - name: canonical section name (SECTION_ALIASES key) or BODY
+    - start/end: the section, header line included; where it ends is
+      described in the module comment
+    - header_end: end of the header ("Plan:"); == start for BODY
+    """
+
+    name: str
+    start: int
+    end: int
+    header_end: int
+
+
+@dataclass(frozen=True)
+class Sentence:
+    start: int
+    end: int
+    section: int  # index into Segmentation.sections
+
+
+class Segmentation:
+    """
+    Sections and sentences of one note, with offsets into the segmented
+    string (Document.folded, hence into Document.text).
+
+    - sections are found on construction (one regex pass); sentences
+      only when first asked for
+    - sections tile the text: every offset belongs to exactly one
+    """
+
+    def __init__(self, text: str, sections: List[Section]) -> None:
+        self._text = text
+        self.sections = sections
+        self._starts = [s.start for s in sections]
+
+    @property
+    def has_headers(self) -> bool:
+        return any(s.name != BODY for s in self.sections)
+
+    def section_index(self, pos: int) -> int:
+        return max(0, bisect_right(self._starts, pos) - 1)
+
+    def section_at(self, pos: int) -> Section:
+        return self.sections[self.section_index(pos)]
+
+    def ranges(self, excluded: FrozenSet[str] = frozenset()) -> List[Tuple[int, int]]:
+        """
+        Merged (start, end) ranges of every section not named in `excluded`.
+        """
+        out: List[Tuple[int, int]] = []
+        for section in self.sections:
+            if section.name in excluded:
+                continue
+            if out and out[-1][1] == section.start:
+                out[-1] = (out[-1][0], section.end)
+            else:
+                out.append((section.start, section.end))
+        return out
+
+    @cached_property
+    def sentences(self) -> List[Sentence]:
+        out: List[Sentence] = []
+        text = self._text
+        for index, section in enumerate(self.sections):
+            pos = section.start
+            for m in _BOUNDARY_RE.finditer(text, section.start, section.end):
+                if m.group() != "\n" and _is_abbreviation(text, pos, m.start()):
+                    continue
+                _append_sentence(out, text, pos, m.end(), index)
+                pos = m.end()
+            _append_sentence(out, text, pos, section.end, index)
+        return out
+
+
+def _is_abbreviation(text: str, start: int, end: int) -> bool:
+    word = _WORD_BEFORE_RE.search(text, max(start, end - 12), end + 1)
+    if word is None:
+        return False
+    token = word.group(1).lower()
+    return len(token) == 1 or token in _ABBREVIATIONS or (len(token) > 1 and token[-2] == ".")
+
+
+def _append_sentence(out: List[Sentence], text: str, start: int, end: int, section: int) -> None:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    if start < end:
+        out.append(Sentence(start, end, section))
+
+
+# (start, section name, end of header) of one header line
+_Header = Tuple[int, str, int]
+
+
+def _find_headers(text: str, start: int, stop: int) -> List[_Header]:
+    """
+    Headers on the lines of text[start:stop]; start and stop are line
+    starts (or 0 / len(text)).
+    """
+    region = text[start:stop]
+    lower = region.lower()
+    if len(lower) != len(region):
+        lower = region  # a few code points lowercase to two chars; see preprocess._fold
+    out: List[_Header] = []
+    line = 0
+    # Headers start a line: try the header regex at line starts only
+    # rather than letting finditer() probe every offset.
+    while line >= 0:
+        m = _HEADER_RE.match(lower, line)
+        if m is not None:
+            out.append((start + m.start(), _ALIAS_TO_SECTION[m.group("alias")], start + m.end()))
+        line = lower.find("\n", line)
+        if line >= 0:
+            line += 1
+    return out
+
+
+def _section_end(text: str, header_end: int, stop: int) -> int:
+    line_end = text.find("\n", header_end, stop)
+    if line_end < 0:
+        return stop
+    if text[header_end:line_end].strip():
+        return line_end + 1
+    content = _SPACE_RE.match(text, line_end, stop).end()
+    blank = _BLANK_LINE_RE.search(text, content, stop)
+    return stop if blank is None else blank.start() + 1
+
+
+def _from_headers(text: str, headers: List[_Header]) -> Segmentation:
+    sections: List[Section] = []
+    pos = 0
+    for i, (start, name, header_end) in enumerate(headers):
+        if start > pos:
+            sections.append(Section(BODY, pos, start, pos))
+        stop = headers[i + 1][0] if i + 1 < len(headers) else len(text)
+        pos = _section_end(text, header_end, stop)
+        sections.append(Section(name, start, pos, header_end))
+    if pos < len(text) or not sections:
+        sections.append(Section(BODY, pos, len(text), pos))
+    return Segmentation(text, sections)
+
+
+def segment(text: str) -> Segmentation:
+    """
+    Splits a note into sections (see SECTION_ALIASES); header matching is
+    case-insensitive. Sentences are split on first access.
+    """
+    return _from_headers(text, _find_headers(text, 0, len(text)))
+
+
+def resegment(previous: Segmentation, text: str, start: int, old_end: int, new_end: int) -> Segmentation:
+    """
+    segment(text), where `text` is the previous text with [start, old_end)
+    replaced by text[start:new_end]: only the edited lines are read again,
+    headers elsewhere are reused (shifted when after the edit).
+    """
+    delta = new_end - old_end
+    first = text.rfind("\n", 0, start) + 1
+    stop = text.find("\n", new_end)
+    stop = len(text) if stop < 0 else stop + 1
+    headers = [(s.start, s.name, s.header_end) for s in previous.sections if s.name != BODY]
+    headers = (
+        [h for h in headers if h[0] < first]
+        + _find_headers(text, first, stop)
+        + [(h[0] + delta, h[1], h[2] + delta) for h in headers if h[0] + delta >= stop and h[0] >= old_end]
+    )
+    return _from_headers(text, headers)
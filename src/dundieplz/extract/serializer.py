@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import PydanticUndefined
+
+try:  # optional fast backend
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+# -----------------------------
+# Field tables (built once per class)
+# -----------------------------
+#
+# Models are encoded from their __dict__ (already in field order) and
+# records from their dataclass fields, so nothing is copied into an
+# intermediate dict tree as model_dump() does.
+
+_NO_DEFAULT = object()
+
+
+@lru_cache(maxsize=None)
+def _record_fields(cls: type) -> Tuple[str, ...]:
+    return tuple(f.name for f in dataclasses.fields(cls))
+
+
+def _static_default(default: Any, factory: Optional[Callable[[], Any]]) -> Any:
+    if factory is None:
+        return _NO_DEFAULT if default is dataclasses.MISSING else default
+    # Only class factories (list, nested models/records) have a fixed value;
+    # things like datetime.utcnow never count as "default".
+    return factory() if isinstance(factory, type) else _NO_DEFAULT
+
+
+@lru_cache(maxsize=None)
+def _defaults(cls: type) -> Dict[str, Any]:
+    if issubclass(cls, BaseModel):
+        items = ((n, f.default, f.default_factory) for n, f in cls.model_fields.items())
+    else:
+        items = ((f.name, f.default, f.default_factory) for f in dataclasses.fields(cls))
+    out: Dict[str, Any] = {}
+    for name, default, factory in items:
+        if default is PydanticUndefined:
+            default = dataclasses.MISSING
+        value = _static_default(default, None if factory is dataclasses.MISSING else factory)
+        if value is not _NO_DEFAULT:
+            out[name] = value
+    return out
+
+
+def _fields(obj: Any) -> Dict[str, Any]:
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    if dataclasses.is_dataclass(obj):
+        return {name: getattr(obj, name) for name in _record_fields(type(obj))}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _compact_fields(obj: Any) -> Dict[str, Any]:
+    """
+    Drops None, empty lists and values equal to the field default.
+    Defaults are restored when the JSON is validated back into the model.
+    """
+    defaults = _defaults(type(obj))
+    out: Dict[str, Any] = {}
+    for name, value in _fields(obj).items():
+        if value is None or (type(value) is list and not value):
+            continue
+        default = defaults.get(name, _NO_DEFAULT)
+        if default is not _NO_DEFAULT and value == default:
+            continue
+        out[name] = value
+    return out
+
+
+def _stdlib_default(compact: bool) -> Callable[[Any], Any]:
+    encode_fields = _compact_fields if compact else _fields
+
+    def default(obj: Any) -> Any:
+        if isinstance(obj, (datetime, date)):
+            return obj.isoformat()
+        return encode_fields(obj)
+
+    return default
+
+
+@lru_cache(maxsize=None)
+def _adapter(cls: type) -> TypeAdapter:
+    return TypeAdapter(cls)
+
+
+# -----------------------------
+# Serializer
+# -----------------------------
+
+BACKENDS = ("orjson", "pydantic", "json")
+
+
+class ResultSerializer:
+    """
+    Direct-to-bytes JSON encoder for ExtractionResult (and ResultRecord /
+    ExtractionFailure).
+
+    - backends: "orjson" (optional dependency), "pydantic" (pydantic-core's
+      compiled serializer, always available) and "json" (pure stdlib);
+      "auto" picks orjson for models when installed, else pydantic, and
+      always pydantic for ResultRecords (fastest for slotted dataclasses)
+    - every backend emits the same bytes; the default output is
+      byte-identical to model_dump_json()
+    - compact=True drops None, empty lists and default values
+    - indent=True pretty-prints with two spaces (GUI / debugging)
+    """
+
+    def __init__(self, compact: bool = False, indent: bool = False, backend: str = "auto") -> None:
+        records_via_pydantic = backend == "auto"
+        if backend == "auto":
+            backend = "orjson" if orjson is not None else "pydantic"
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown serializer backend {backend!r}; expected one of {BACKENDS}")
+        if backend == "orjson" and orjson is None:
+            raise ImportError("orjson backend requested but orjson is not installed")
+
+        self.backend = backend
+        self.compact = compact
+        self.indent = indent
+        self._records_via_pydantic = records_via_pydantic and backend != "pydantic"
+        self._dump_options = {
+            "indent": 2 if indent else None,
+            "exclude_defaults": compact,
+            "exclude_none": compact,
+        }
+
+        if backend == "orjson":
+            # Records go through the hook only when they need pruning;
+            # otherwise orjson's native dataclass support is faster.
+            self._option = (orjson.OPT_INDENT_2 if indent else 0) | (
+                orjson.OPT_PASSTHROUGH_DATACLASS if compact else 0
+            )
+            self._default = _compact_fields if compact else _fields
+        elif backend == "json":
+            self._encoder = json.JSONEncoder(
+                default=_stdlib_default(compact),
+                ensure_ascii=False,
+                indent=2 if indent else None,
+                separators=(",", ": ") if indent else (",", ":"),
+            )
+
+    def dumps(self, obj: Any) -> bytes:
+        if self._records_via_pydantic and dataclasses.is_dataclass(obj):
+            return _adapter(type(obj)).dump_json(obj, **self._dump_options)
+        if self.backend == "orjson":
+            return orjson.dumps(obj, default=self._default, option=self._option)
+        if self.backend == "pydantic":
+            return _adapter(type(obj)).dump_json(obj, **self._dump_options)
+        return self._encoder.encode(obj).encode("utf-8")
+
+    def dumps_line(self, obj: Any) -> bytes:
+        """
+        One JSONL line (newline-terminated).
+        """
+        return self.dumps(obj) + b"\n"
+
+
+@lru_cache(maxsize=8)
+def get_serializer(compact: bool = False, indent: bool = False, backend: str = "auto") -> ResultSerializer:
+    return ResultSerializer(compact=compact, indent=indent, backend=backend)
+
+
+def dumps_result(obj: Any, compact: bool = False) -> bytes:
+    """
+    Serializes a result to JSON bytes with the default backend.
+    """
+    return get_serializer(compact=compact).dumps(obj)
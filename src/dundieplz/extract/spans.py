@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Span:
+    text: str
+    start: int
+    end: int
+
+
+# -----------------------------
+# Containment dedup (sort and sweep)
+# -----------------------------
+
+def dedupe_contained(
+    items: Iterable[T],
+    bounds: Callable[[T], Tuple[int, int]],
+    tiebreak: Optional[Callable[[T], Any]] = None,
+) -> List[T]:
+    """
+    Drops every item whose [start, end) lies inside another kept item.
+
+    - O(n log n): one sort by (start, longest first, tiebreak), one sweep
+    - in that order every kept item starts at or before the current one,
+      so "contained in some kept item" is just "ends at or before the
+      furthest kept end"
+    - among items with identical bounds the first in tiebreak order wins
+    - result is ordered by (start, end)
+    """
+    def key(item: T) -> Tuple:
+        start, end = bounds(item)
+        return (start, start - end) if tiebreak is None else (start, start - end, tiebreak(item))
+
+    kept: List[T] = []
+    reach: Optional[int] = None
+    for item in sorted(items, key=key):
+        end = bounds(item)[1]
+        if reach is not None and end <= reach:
+            continue
+        kept.append(item)
+        reach = end
+    return kept
+
+
+def _span_bounds(span: Span) -> Tuple[int, int]:
+    return span.start, span.end
+
+
+def _span_text(span: Span) -> str:
+    return span.text.lower()
+
+
+def dedupe_spans(spans: Iterable[Span]) -> List[Span]:
+    """
+    Containment dedup for Span lists (RuleLLMClient semantics).
+    """
+    return dedupe_contained(spans, _span_bounds, _span_text)
+
+
+# -----------------------------
+# Evidence merging
+# -----------------------------
+
+def merge_evidence(*groups: Iterable[T]) -> List[T]:
+    """
+    Merges evidence lists from several producers (rules, cue matcher, LLM)
+    into one non-redundant list.
+
+    - items need .text/.start/.end (EvidenceSpan, SpanRecord, Span)
+    - located spans contained in another span are dropped; on identical
+      bounds the earlier group wins
+    - spans without offsets are kept once per text, after located spans
+    """
+    located: List[Tuple[int, T]] = []
+    unlocated: Dict[str, T] = {}
+    for rank, group in enumerate(groups):
+        for item in group:
+            if item.start is None or item.end is None:
+                unlocated.setdefault(item.text, item)
+            else:
+                located.append((rank, item))
+
+    merged = dedupe_contained(
+        located,
+        bounds=lambda pair: (pair[1].start, pair[1].end),
+        tiebreak=lambda pair: pair[0],
+    )
+    return [item for _, item in merged] + list(unlocated.values())
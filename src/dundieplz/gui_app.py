@@ -1,15 +1,15 @@
 from __future__ import annotations
 
-import json
-from typing import Literal, List
-from html import escape
+from typing import Literal
 
 import streamlit as st
 
 from dundieplz.extract.extractor import Extractor
 from dundieplz.extract.llm_client import DummyLLMClient
 from dundieplz.extract.rule_llm_client import RuleLLMClient
-from dundieplz.schemas.extractor_schema import EvidenceSpan
+from dundieplz.extract.serializer import get_serializer
+from dundieplz.schemas.extractor_schema import ExtractionResult
+from dundieplz.ui.highlight import legend_html, render_result
 
 
 # --------------------------------------------------
@@ -118,45 +118,34 @@ Cause of death: Cardiorespiratory arrest / Traumatic brain injury / Depression -
 # Helpers
 # --------------------------------------------------
 
+# Streamlit re-executes this script on every interaction. Backends (and
+# the pattern sets / cue automata they compile, see packs.py) live for the
+# life of the server; results are memoized per (text, backend), so toggling
+# an output option only re-renders.
+
+@st.cache_resource(show_spinner=False)
 def make_extractor(backend: BackendName) -> Extractor:
     if backend == "rules":
-        return Extractor(llm_client=RuleLLMClient())
-    return Extractor(llm_client=DummyLLMClient())
-
-
-def load_case(case_id: str) -> None:
-    st.session_state["input_text"] = SYNTHETIC_CASES[case_id]["text"]
-
+        extractor = Extractor(llm_client=RuleLLMClient())
+    else:
+        extractor = Extractor(llm_client=DummyLLMClient())
+    # Compile the matchers now rather than on the first click.
+    extractor.extract_record("warm-up")
+    return extractor
 
-def collect_all_evidence(result) -> List[EvidenceSpan]:
-    evidence: List[EvidenceSpan] = []
-    for value in result.signals.__dict__.values():
-        if hasattr(value, "evidence"):
-            evidence.extend(value.evidence)
-    return evidence
 
+@st.cache_data(max_entries=32, show_spinner="Extracting...")
+def run_extraction(text: str, backend: BackendName) -> ExtractionResult:
+    return make_extractor(backend).extract(text)
 
-def build_highlighted_html(text: str, evidence: List[EvidenceSpan]) -> str:
-    spans = sorted(
-        [e for e in evidence if e.start is not None and e.end is not None],
-        key=lambda e: e.start,
-    )
 
-    html = ""
-    cursor = 0
+@st.cache_data(max_entries=32, show_spinner=False)
+def render_highlights(text: str, backend: BackendName, include_cues: bool) -> str:
+    return render_result(run_extraction(text, backend), include_cues)
 
-    for ev in spans:
-        html += escape(text[cursor:ev.start])
-        tooltip = f"source={ev.source}"
-        html += (
-            f"<mark title='{tooltip}' "
-            f"style='background-color:#ffe066;'>"
-            f"{escape(text[ev.start:ev.end])}</mark>"
-        )
-        cursor = ev.end
 
-    html += escape(text[cursor:])
-    return html
+def load_case(case_id: str) -> None:
+    st.session_state["input_text"] = SYNTHETIC_CASES[case_id]["text"]
 
 
 # --------------------------------------------------
@@ -214,32 +203,40 @@ st.divider()
 if run_button:
     if not text.strip():
         st.warning("Please provide some input text.")
+        st.session_state.pop("last_run", None)
     else:
-        extractor = make_extractor(backend)
-        result = extractor.extract(text)
-
-        st.subheader("Evidence Highlighting")
-        evidence = collect_all_evidence(result)
-        highlighted_html = build_highlighted_html(text, evidence)
-        st.markdown(highlighted_html, unsafe_allow_html=True)
-
-        st.divider()
-
-        payload = result.model_dump(mode="json")
-        if not show_meta:
-            payload.pop("meta", None)
-        if not show_cue_hits:
-            payload.pop("cue_hits", None)
-
-        st.subheader("Output")
-        if pretty:
-            st.code(json.dumps(payload, indent=2), language="json")
-        else:
-            st.write(payload)
-
-        st.success("Extraction completed.")
-else:
-    if not ack:
-        st.info("Please acknowledge the disclaimer to enable inputs.")
+        st.session_state["last_run"] = (text, backend)
+
+# The last run stays on screen across reruns (option toggles); only the
+# "Run extraction" button picks up a new text or backend.
+last_run = st.session_state.get("last_run") if ack else None
+
+if last_run is not None:
+    run_text, run_backend = last_run
+    result = run_extraction(run_text, run_backend)
+
+    st.subheader("Evidence Highlighting")
+    st.caption(legend_html(), unsafe_allow_html=True)
+    st.markdown(render_highlights(run_text, run_backend, show_cue_hits), unsafe_allow_html=True)
+
+    st.divider()
+
+    # Serialized straight from the model (no model_dump + json.dumps pass)
+    payload = {"text": result.text, "signals": result.signals}
+    if show_cue_hits:
+        payload["cue_hits"] = result.cue_hits
+    if show_meta:
+        payload["meta"] = result.meta
+    payload_json = get_serializer(indent=pretty).dumps(payload).decode("utf-8")
+
+    st.subheader("Output")
+    if pretty:
+        st.code(payload_json, language="json")
     else:
-        st.info("Load a case or enter text, then run extraction.")
+        st.json(payload_json)
+
+    st.success("Extraction completed.")
+elif not ack:
+    st.info("Please acknowledge the disclaimer to enable inputs.")
+elif not run_button:
+    st.info("Load a case or enter text, then run extraction.")
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from dundieplz.ui.cli import app
+
+
+def main() -> None:
+    app()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+from dundieplz.schemas.core_signals import Presence, TemporalContext
+from dundieplz.schemas.cssrs import CSSRSInspiredOutput
+from dundieplz.schemas.extractor_schema import ExtractionResult, Presence as Extracted, Temporal
+
+from dundieplz.map.projection import Framework, Rule
+
+# --------------------------------------------------
+# Extraction -> C-SSRS-inspired fields (NO scoring)
+# --------------------------------------------------
+#
+# Conservative: a field is only present/absent when the extracted signals
+# say so; everything the extractor does not cover stays indeterminate and
+# is listed in missing_information.
+
+_SAME = {value.value: Presence(value.value) for value in Extracted}
+
+_TEMPORAL = {
+    Temporal.current: TemporalContext.current,
+    Temporal.recent: TemporalContext.recent,
+    Temporal.past: TemporalContext.past,
+}
+
+
+def _same(presence: Extracted) -> Presence:
+    return _SAME[presence.value]
+
+
+def passive_ideation(ideation: Extracted, intent: Extracted) -> Presence:
+    if ideation == Extracted.present and intent != Extracted.present:
+        return Presence.present
+    if ideation == Extracted.absent:
+        return Presence.absent
+    return Presence.indeterminate
+
+
+def active_ideation(ideation: Extracted, intent: Extracted) -> Presence:
+    if ideation == Extracted.present and intent != Extracted.indeterminate:
+        return _same(intent)
+    if ideation == Extracted.absent:
+        return Presence.absent
+    return Presence.indeterminate
+
+
+def method_specified(plan: Extracted) -> Presence:
+    # a plan signal does not say whether a method was named
+    return Presence.absent if plan == Extracted.absent else Presence.indeterminate
+
+
+def access_to_means() -> Presence:
+    return Presence.indeterminate
+
+
+def timeframe_specified(plan: Extracted, temporal: Temporal) -> Presence:
+    if plan == Extracted.present and temporal in (Temporal.current, Temporal.recent, Temporal.future):
+        return Presence.present
+    return Presence.indeterminate
+
+
+def preparatory_behaviors(contextual_cues: bool) -> Presence:
+    # contextual cues are preparatory acts (giving pets away, inheritance)
+    return Presence.present if contextual_cues else Presence.indeterminate
+
+
+def temporal_context(temporal: Temporal) -> TemporalContext:
+    return _TEMPORAL.get(temporal, TemporalContext.unknown)
+
+
+def missing_information(plan: Extracted, temporal: Temporal) -> Tuple[str, ...]:
+    missing = ["access_to_means_not_extracted"]
+    if plan == Extracted.present and timeframe_specified(plan, temporal) != Presence.present:
+        missing.append("plan_timeframe_not_specified")
+    return tuple(missing)
+
+
+def notes(temporal: Temporal) -> Optional[str]:
+    if temporal == Temporal.future:
+        return "Temporal context 'future' has no C-SSRS counterpart; reported as unknown."
+    return None
+
+
+CSSRS = Framework(
+    name="cssrs",
+    model=CSSRSInspiredOutput,
+    fields=(
+        Rule("passive_ideation", ("suicidal_ideation", "intent"), passive_ideation),
+        Rule("active_ideation", ("suicidal_ideation", "intent"), active_ideation),
+        Rule("intent", ("intent",), _same),
+        Rule("plan", ("plan",), _same),
+        Rule("method_specified", ("plan",), method_specified),
+        Rule("access_to_means", (), access_to_means),
+        Rule("timeframe_specified", ("plan", "temporal"), timeframe_specified),
+        Rule("past_suicidal_behavior", ("past_behavior",), _same),
+        Rule("preparatory_behaviors", ("contextual_cues",), preparatory_behaviors),
+        Rule("temporal", ("temporal",), temporal_context),
+    ),
+    evidence=("suicidal_ideation", "intent", "plan", "past_behavior", "contextual_cues"),
+    missing=Rule("missing_information", ("plan", "temporal"), missing_information),
+    notes=Rule("notes", ("temporal",), notes),
+)
+
+
+def map_cssrs(result: ExtractionResult) -> CSSRSInspiredOutput:
+    """
+    One result, through pydantic; use map.projection for batches.
+    """
+    return CSSRS.project_one(result)
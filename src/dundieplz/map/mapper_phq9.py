@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+from dundieplz.schemas.core_signals import Presence
+from dundieplz.schemas.extractor_schema import ExtractionResult, Presence as Extracted
+from dundieplz.schemas.phq9 import PHQ9Item9Output
+
+from dundieplz.map.projection import Framework, Rule
+
+# --------------------------------------------------
+# Extraction -> PHQ-9 item 9 (NO scoring)
+# --------------------------------------------------
+#
+# Item 9 asks about thoughts of death or of self-harm: present when either
+# signal is present, absent only when ideation is explicitly absent and
+# self-harm is not present.
+
+
+def item9_presence(ideation: Extracted, self_harm: Extracted) -> Presence:
+    if Extracted.present in (ideation, self_harm):
+        return Presence.present
+    if ideation == Extracted.absent:
+        return Presence.absent
+    return Presence.indeterminate
+
+
+def missing_information(ideation: Extracted, self_harm: Extracted) -> Tuple[str, ...]:
+    if item9_presence(ideation, self_harm) == Presence.indeterminate:
+        return ("thoughts_of_death_or_self_harm_not_documented",)
+    return ()
+
+
+def notes(ideation: Extracted, self_harm: Extracted) -> Optional[str]:
+    if ideation == Extracted.indeterminate and self_harm == Extracted.present:
+        return "Self-harm documented without explicit suicidal ideation."
+    return None
+
+
+PHQ9_ITEM9 = Framework(
+    name="phq9_item9",
+    model=PHQ9Item9Output,
+    fields=(Rule("item9_presence", ("suicidal_ideation", "self_harm"), item9_presence),),
+    evidence=("suicidal_ideation", "self_harm"),
+    missing=Rule("missing_information", ("suicidal_ideation", "self_harm"), missing_information),
+    notes=Rule("notes", ("suicidal_ideation", "self_harm"), notes),
+)
+
+
+def map_phq9_item9(result: ExtractionResult) -> PHQ9Item9Output:
+    """
+    One result, through pydantic; use map.projection for batches.
+    """
+    return PHQ9_ITEM9.project_one(result)
@@ -0,0 +1,394 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import product
+from operator import add
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel
+
+from dundieplz.schemas.core_signals import EvidenceSpan as CoreEvidenceSpan
+from dundieplz.schemas.extractor_schema import ExtractionResult, Presence, Temporal
+
+try:  # optional fast backend
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+# --------------------------------------------------
+# Columnar framework projection
+# --------------------------------------------------
+#
+# A batch of extraction results becomes a ProjectionBatch: one `bytes`
+# column of small integer codes per input (presence, temporal, flags),
+# plus pre-serialized evidence spans and missing_information items.
+#
+# A framework (mapper_cssrs.CSSRS, mapper_phq9.PHQ9_ITEM9) is a list of
+# Rules, each a plain function of a few input columns. A rule is compiled
+# once into a 256-byte lookup table over the joint code of its inputs;
+# projecting a batch is then, per rule, one joint-code computation and
+# one bytes.translate() over the whole column, both at C speed. Rows are
+# assembled from pre-rendered JSON fragments, so no pydantic model is
+# built; the output is byte-identical to Framework.project_one(...)
+# .model_dump_json(), the per-result reference path.
+
+SIGNAL_COLUMNS = ("suicidal_ideation", "self_harm", "intent", "plan", "past_behavior")
+
+DOMAINS: Dict[str, Tuple[Any, ...]] = {
+    **{name: tuple(Presence) for name in SIGNAL_COLUMNS},
+    "temporal": tuple(Temporal),
+    "contextual_cues": (False, True),
+}
+
+EVIDENCE_COLUMNS = SIGNAL_COLUMNS + ("contextual_cues",)
+
+# str enums hash like their values, so these accept members and raw strings
+_CODES: Dict[str, Dict[Any, int]] = {
+    name: {value: code for code, value in enumerate(domain)} for name, domain in DOMAINS.items()
+}
+_DEFAULT_CODES = {
+    **{name: _CODES[name][Presence.indeterminate] for name in SIGNAL_COLUMNS},
+    "temporal": _CODES["temporal"][Temporal.unknown],
+    "contextual_cues": 0,
+}
+
+_encode_str = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def _loads(raw: Any) -> Any:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _span_json(text: Any, start: Optional[int], end: Optional[int]) -> str:
+    return '{"text":%s,"start":%s,"end":%s}' % (
+        _encode_str(text),
+        "null" if start is None else int(start),
+        "null" if end is None else int(end),
+    )
+
+
+def _json_array(items: Iterable[str]) -> str:
+    return "[" + ",".join(items) + "]"
+
+
+# --------------------------------------------------
+# Rules / frameworks
+# --------------------------------------------------
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    One output field as a function of input columns (values of DOMAINS).
+    """
+
+    field: str
+    inputs: Tuple[str, ...]
+    fn: Callable[..., Any]
+
+    def __call__(self, values: Dict[str, Any]) -> Any:
+        return self.fn(*(values[name] for name in self.inputs))
+
+
+@dataclass(frozen=True)
+class Framework:
+    """
+    A target schema and the rules that fill it.
+
+    - fields: one Rule per scalar field, in model field order
+    - evidence: evidence columns copied into `evidence` (exact duplicates
+      dropped, first occurrence kept)
+    - missing: Rule returning extra missing_information items (a tuple),
+      appended to the note's own items
+    - notes: Rule returning the `notes` string or None
+    """
+
+    name: str
+    model: Type[BaseModel]
+    fields: Tuple[Rule, ...]
+    evidence: Tuple[str, ...]
+    missing: Rule
+    notes: Rule
+
+    def __post_init__(self) -> None:
+        expected = [rule.field for rule in self.fields] + ["evidence", "missing_information", "notes"]
+        if expected != list(self.model.model_fields):
+            raise ValueError(f"{self.name}: rules {expected} do not match {self.model.__name__} fields")
+        for rule in self.fields + (self.missing, self.notes):
+            unknown = [name for name in rule.inputs if name not in DOMAINS]
+            if unknown:
+                raise ValueError(f"{self.name}.{rule.field}: unknown input columns {unknown}")
+            size = 1
+            for name in rule.inputs:
+                size *= len(DOMAINS[name])
+            if size > 256:
+                raise ValueError(f"{self.name}.{rule.field}: {size} input combinations (max 256)")
+
+    def project_one(self, result: ExtractionResult) -> BaseModel:
+        """
+        Reference path: one result through the rules into the pydantic model.
+        """
+        signals = result.signals
+        values: Dict[str, Any] = {name: getattr(signals, name).presence for name in SIGNAL_COLUMNS}
+        values["temporal"] = signals.temporal
+        values["contextual_cues"] = bool(result.cue_hits.contextual)
+
+        evidence: Dict[Tuple, CoreEvidenceSpan] = {}
+        for name in self.evidence:
+            if name == "contextual_cues":
+                spans = [ev for hit in result.cue_hits.contextual for ev in hit.evidence]
+            else:
+                spans = getattr(signals, name).evidence
+            for ev in spans:
+                key = (ev.text, ev.start, ev.end)
+                if key not in evidence:
+                    evidence[key] = CoreEvidenceSpan(text=ev.text, start=ev.start, end=ev.end)
+
+        missing = list(dict.fromkeys(list(signals.missing_information) + list(self.missing(values))))
+        return self.model(
+            **{rule.field: rule(values) for rule in self.fields},
+            evidence=list(evidence.values()),
+            missing_information=missing,
+            notes=self.notes(values),
+        )
+
+
+@dataclass(frozen=True)
+class _CompiledRule:
+    inputs: Tuple[str, ...]
+    table: bytes  # joint input code -> index into outputs
+    outputs: Tuple[Any, ...]
+
+
+def _compile_rule(rule: Rule) -> _CompiledRule:
+    outputs: Dict[Any, int] = {}
+    table = bytearray(256)
+    domains = [DOMAINS[name] for name in rule.inputs]
+    sizes = [len(domain) for domain in domains]
+    # itertools.product varies the last input fastest; the joint code
+    # (see _joint) has the first input as the least significant digit
+    for combo in product(*(range(size) for size in sizes)):
+        joint = 0
+        for code, size in zip(reversed(combo), reversed(sizes)):
+            joint = joint * size + code
+        value = rule.fn(*(domain[code] for domain, code in zip(domains, combo)))
+        table[joint] = outputs.setdefault(value, len(outputs))
+    if len(outputs) > 256:
+        raise ValueError(f"{rule.field}: more than 256 distinct outputs")
+    return _CompiledRule(rule.inputs, bytes(table), tuple(outputs))
+
+
+@lru_cache(maxsize=256)
+def _scale_table(factor: int) -> bytes:
+    return bytes((i * factor) & 0xFF for i in range(256))
+
+
+def _joint(codes: Dict[str, bytes], inputs: Tuple[str, ...], rows: int) -> bytes:
+    # code(c1, c2, ..., ck) = c1 + n1 * (c2 + n2 * (...)); stays < 256
+    # because every rule has at most 256 input combinations.
+    if not inputs:
+        return bytes(rows)
+    acc = codes[inputs[-1]]
+    for name in reversed(inputs[:-1]):
+        acc = bytes(map(add, codes[name], acc.translate(_scale_table(len(DOMAINS[name])))))
+    return acc
+
+
+@dataclass(frozen=True)
+class _CompiledFramework:
+    fields: Tuple[_CompiledRule, ...]
+    names: Tuple[str, ...]
+    evidence: Tuple[str, ...]
+    missing: _CompiledRule
+    notes: _CompiledRule
+    note_json: Tuple[str, ...]
+
+
+@lru_cache(maxsize=32)
+def compile_framework(framework: Framework) -> _CompiledFramework:
+    notes = _compile_rule(framework.notes)
+    return _CompiledFramework(
+        fields=tuple(_compile_rule(rule) for rule in framework.fields),
+        names=tuple(rule.field for rule in framework.fields),
+        evidence=framework.evidence,
+        missing=_compile_rule(framework.missing),
+        notes=notes,
+        note_json=tuple("null" if note is None else _encode_str(note) for note in notes.outputs),
+    )
+
+
+# --------------------------------------------------
+# Columnar batch
+# --------------------------------------------------
+
+@dataclass
+class ProjectionBatch:
+    """
+    Columnar view of extraction results.
+
+    - ids: row identifiers (extracted_outputs.output_id, or positions)
+    - codes: column -> bytes, one code per row (index into DOMAINS[column])
+    - spans: evidence column -> per row, serialized spans
+    - missing: per row, serialized missing_information items
+    """
+
+    ids: List[int] = field(default_factory=list)
+    codes: Dict[str, bytes] = field(default_factory=dict)
+    spans: Dict[str, List[Tuple[str, ...]]] = field(default_factory=dict)
+    missing: List[Tuple[str, ...]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_results(cls, results: Sequence[ExtractionResult], ids: Optional[Sequence[int]] = None) -> "ProjectionBatch":
+        codes = {name: bytearray() for name in DOMAINS}
+        spans: Dict[str, List[Tuple[str, ...]]] = {name: [] for name in EVIDENCE_COLUMNS}
+        missing: List[Tuple[str, ...]] = []
+        for result in results:
+            signals = result.signals
+            for name in SIGNAL_COLUMNS:
+                signal = getattr(signals, name)
+                codes[name].append(_CODES[name][signal.presence])
+                spans[name].append(tuple(_span_json(ev.text, ev.start, ev.end) for ev in signal.evidence))
+            codes["temporal"].append(_CODES["temporal"][signals.temporal])
+            contextual = result.cue_hits.contextual
+            codes["contextual_cues"].append(1 if contextual else 0)
+            spans["contextual_cues"].append(
+                tuple(_span_json(ev.text, ev.start, ev.end) for hit in contextual for ev in hit.evidence)
+            )
+            missing.append(tuple(_encode_str(item) for item in signals.missing_information))
+        return cls(
+            ids=list(range(len(missing))) if ids is None else list(ids),
+            codes={name: bytes(column) for name, column in codes.items()},
+            spans=spans,
+            missing=missing,
+        )
+
+    @classmethod
+    def from_json(cls, rows: Iterable[Tuple[int, Any]]) -> "ProjectionBatch":
+        """
+        From (id, ExtractionResult JSON) pairs, e.g. extracted_outputs rows;
+        no models are built. Unknown enum values count as the defaults.
+        """
+        ids: List[int] = []
+        codes = {name: bytearray() for name in DOMAINS}
+        spans: Dict[str, List[Tuple[str, ...]]] = {name: [] for name in EVIDENCE_COLUMNS}
+        missing: List[Tuple[str, ...]] = []
+        for row_id, raw in rows:
+            obj = _loads(raw)
+            signals = obj.get("signals") or {}
+            ids.append(row_id)
+            for name in SIGNAL_COLUMNS:
+                signal = signals.get(name) or {}
+                codes[name].append(_CODES[name].get(signal.get("presence"), _DEFAULT_CODES[name]))
+                spans[name].append(
+                    tuple(_span_json(ev.get("text", ""), ev.get("start"), ev.get("end")) for ev in signal.get("evidence") or ())
+                )
+            codes["temporal"].append(_CODES["temporal"].get(signals.get("temporal"), _DEFAULT_CODES["temporal"]))
+            contextual = (obj.get("cue_hits") or {}).get("contextual") or ()
+            codes["contextual_cues"].append(1 if contextual else 0)
+            spans["contextual_cues"].append(
+                tuple(
+                    _span_json(ev.get("text", ""), ev.get("start"), ev.get("end"))
+                    for hit in contextual
+                    for ev in hit.get("evidence") or ()
+                )
+            )
+            missing.append(tuple(_encode_str(str(item)) for item in signals.get("missing_information") or ()))
+        return cls(
+            ids=ids,
+            codes={name: bytes(column) for name, column in codes.items()},
+            spans=spans,
+            missing=missing,
+        )
+
+
+# --------------------------------------------------
+# Projection
+# --------------------------------------------------
+
+def _apply(rule: _CompiledRule, batch: ProjectionBatch, joints: Dict[Tuple[str, ...], bytes]) -> bytes:
+    joint = joints.get(rule.inputs)
+    if joint is None:
+        joint = joints[rule.inputs] = _joint(batch.codes, rule.inputs, len(batch))
+    return joint.translate(rule.table)
+
+
+def project_columns(batch: ProjectionBatch, framework: Framework) -> Dict[str, List[Any]]:
+    """
+    Scalar fields of `framework` for every row, decoded ({field: values}).
+    """
+    compiled = compile_framework(framework)
+    joints: Dict[Tuple[str, ...], bytes] = {}
+    return {
+        name: [rule.outputs[i] for i in _apply(rule, batch, joints)]
+        for name, rule in zip(compiled.names, compiled.fields)
+    }
+
+
+def project(batch: ProjectionBatch, framework: Framework) -> List[str]:
+    """
+    JSON of framework.model for every row of `batch`, in row order.
+    """
+    compiled = compile_framework(framework)
+    joints: Dict[Tuple[str, ...], bytes] = {}
+    columns = [_apply(rule, batch, joints) for rule in compiled.fields]
+    missing_codes = _apply(compiled.missing, batch, joints)
+    note_codes = _apply(compiled.notes, batch, joints)
+
+    # rows with the same scalar outputs share one rendered prefix
+    prefixes: Dict[Tuple[int, ...], str] = {}
+
+    def prefix(key: Tuple[int, ...]) -> str:
+        text = prefixes.get(key)
+        if text is None:
+            parts = []
+            for name, rule, index in zip(compiled.names, compiled.fields, key):
+                value = rule.outputs[index]
+                parts.append(f'"{name}":{_encode_str(getattr(value, "value", value))}')
+            text = prefixes[key] = "{" + ",".join(parts)
+        return text
+
+    extra_missing = [tuple(_encode_str(item) for item in items) for items in compiled.missing.outputs]
+    evidence_columns = [batch.spans[name] for name in compiled.evidence]
+
+    out: List[str] = []
+    for row, key in enumerate(zip(*columns) if columns else ((),) * len(batch)):
+        evidence = dict.fromkeys(span for column in evidence_columns for span in column[row])
+        missing = dict.fromkeys(batch.missing[row] + extra_missing[missing_codes[row]])
+        out.append(
+            f'{prefix(key)},"evidence":{_json_array(evidence)},'
+            f'"missing_information":{_json_array(missing)},"notes":{compiled.note_json[note_codes[row]]}}}'
+        )
+    return out
+
+
+def projection_rows(batch: ProjectionBatch, frameworks: Sequence[Framework]) -> Iterator[Tuple[int, str, str]]:
+    """
+    (output_id, framework, projection_json) rows for framework_projections.
+    """
+    for framework in frameworks:
+        yield from zip(batch.ids, [framework.name] * len(batch), project(batch, framework))
+
+
+def project_repository(
+    repository: Any,
+    frameworks: Sequence[Framework],
+    run_id: Optional[int] = None,
+    batch_size: int = 10_000,
+) -> Dict[str, int]:
+    """
+    (Re-)projects stored extractions into framework_projections, in
+    batches; earlier projections of the same outputs and frameworks are
+    replaced. `repository` is a store.repository.ExtractionRepository.
+    Returns the number of rows written per framework.
+    """
+    written = {framework.name: 0 for framework in frameworks}
+    for rows in repository.iter_raw_outputs(run_id=run_id, batch_size=batch_size):
+        batch = ProjectionBatch.from_json(rows)
+        repository.replace_projections(projection_rows(batch, frameworks))
+        for framework in frameworks:
+            written[framework.name] += len(batch)
+    return written
@@ -4,7 +4,7 @@ from datetime import datetime
 from enum import Enum
 from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Presence(str, Enum):
@@ -19,14 +19,20 @@ class EvidenceSource(str, Enum):
     rule = "rule"
 
 
-class EvidenceSpan(BaseModel):
+class _Model(BaseModel):
+    # Validators are built on first use, not at import: the CLI and the
+    # record-based extraction path never validate most of these models.
+    model_config = ConfigDict(defer_build=True)
+
+
+class EvidenceSpan(_Model):
     text: str
     start: Optional[int] = None
     end: Optional[int] = None
     source: EvidenceSource = EvidenceSource.llm
 
 
-class Signal(BaseModel):
+class Signal(_Model):
     presence: Presence = Presence.indeterminate
     evidence: List[EvidenceSpan] = Field(default_factory=list)
 
@@ -39,7 +45,7 @@ class Temporal(str, Enum):
     unknown = "unknown"
 
 
-class Signals(BaseModel):
+class Signals(_Model):
     suicidal_ideation: Signal = Field(default_factory=Signal)
     self_harm: Signal = Field(default_factory=Signal)
     intent: Signal = Field(default_factory=Signal)
@@ -51,27 +57,39 @@ class Signals(BaseModel):
     missing_information: List[str] = Field(default_factory=list)
 
 
-class CueHit(BaseModel):
+class CueHit(_Model):
     cue: str
     evidence: List[EvidenceSpan] = Field(default_factory=list)
 
 
-class CueHits(BaseModel):
+class CueHits(_Model):
     contextual: List[CueHit] = Field(default_factory=list)
     subjective: List[CueHit] = Field(default_factory=list)
     ambiguous: List[CueHit] = Field(default_factory=list)
 
 
-class ExtractorMeta(BaseModel):
+class ExtractorMeta(_Model):
     extractor_name: str = "dundieplz-extractor"
     extractor_version: str = "0.2"
     llm_backend: str = "dummy"
     language: str = "unknown"
+    language_confidence: float = 0.0
+    cue_packs: List[str] = Field(default_factory=list)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
-class ExtractionResult(BaseModel):
+class ExtractionResult(_Model):
     text: str
     signals: Signals = Field(default_factory=Signals)
     cue_hits: CueHits = Field(default_factory=CueHits)
     meta: ExtractorMeta = Field(default_factory=ExtractorMeta)
+
+
+class ExtractionFailure(_Model):
+    """
+    Error entry returned in place of a result by batch extraction.
+    """
+
+    index: int
+    error_type: str
+    message: str = ""
@@ -0,0 +1,440 @@
+from __future__ import annotations
+
+import json
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from dundieplz.schemas.extractor_schema import EvidenceSource, Presence, Temporal
+
+try:  # optional: Arrow IPC files instead of the packed format
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+    pa_ipc = None
+
+
+# --------------------------------------------------
+# Columnar export
+# --------------------------------------------------
+#
+# export_results() writes a directory with two tables:
+#
+#   results.<ext>   one row per result
+#     suicidal_ideation, self_harm, intent, plan, past_behavior, temporal,
+#     language, llm_backend   dictionary-encoded (small integer codes)
+#     language_confidence     float64
+#     text                    utf-8 strings (include_text=True)
+#   evidence.<ext>  one row per evidence span (signals and cue hits)
+#     row (index into results), field, source, cue, start, end
+#     (start/end = -1 when the span has no offsets)
+#
+# <ext> is "arrow" (Arrow IPC file) when pyarrow is installed, else "dpz",
+# a stdlib packed format:
+#
+#   MAGIC | column blobs (8-byte aligned) | footer JSON | u64 footer size | MAGIC
+#
+# open_columnar() memory-maps either format; a column is read by slicing
+# the map, nothing else in the file is touched or decoded.
+
+MAGIC = b"DPZCOL1\n"
+PACKED_FORMAT = 1
+FORMATS = ("arrow", "packed")
+EXTENSIONS = {"arrow": ".arrow", "packed": ".dpz"}
+
+SIGNAL_FIELDS = ("suicidal_ideation", "self_harm", "intent", "plan", "past_behavior")
+CUE_FIELDS = ("contextual", "subjective", "ambiguous")
+
+# Fixed dictionaries keep codes stable across files.
+PRESENCE_VALUES = tuple(p.value for p in Presence)
+TEMPORAL_VALUES = tuple(t.value for t in Temporal)
+SOURCE_VALUES = tuple(s.value for s in EvidenceSource)
+EVIDENCE_FIELDS = SIGNAL_FIELDS + tuple(f"cue_hits.{category}" for category in CUE_FIELDS)
+
+# Dictionary codes use signed types (Arrow IPC dictionary indices).
+_ARROW_TYPES = {"b": "int8", "h": "int16", "i": "int32", "I": "uint32", "q": "int64", "d": "float64"}
+
+
+class _Column:
+    """
+    Column under construction: array of codes / values (+ dictionary) or
+    a string column (offsets + utf-8 bytes spooled to a temp file).
+    """
+
+    def __init__(self, kind: str, typecode: str, dictionary: Sequence[str] = ()) -> None:
+        self.kind = kind
+        self.values = array(typecode)
+        self.dictionary: Dict[str, int] = {value: code for code, value in enumerate(dictionary)}
+        self.data: Optional[tempfile.SpooledTemporaryFile] = None
+        if kind == "string":
+            self.values.append(0)
+            self.data = tempfile.SpooledTemporaryFile(max_size=64 << 20)
+
+    def add(self, value: Any) -> None:
+        if self.kind == "dictionary":
+            code = self.dictionary.get(value)
+            if code is None:
+                code = self.dictionary[value] = len(self.dictionary)
+            self.values.append(code)
+        elif self.kind == "string":
+            raw = value.encode("utf-8", "surrogatepass")
+            self.data.write(raw)
+            self.values.append(self.values[-1] + len(raw))
+        else:
+            self.values.append(value)
+
+
+class _Table:
+    def __init__(self, columns: Dict[str, _Column]) -> None:
+        self.columns = columns
+        self.rows = 0
+
+
+def _results_table(include_text: bool) -> _Table:
+    columns = {name: _Column("dictionary", "b", PRESENCE_VALUES) for name in SIGNAL_FIELDS}
+    columns["temporal"] = _Column("dictionary", "b", TEMPORAL_VALUES)
+    columns["language"] = _Column("dictionary", "h")
+    columns["llm_backend"] = _Column("dictionary", "h")
+    columns["language_confidence"] = _Column("numeric", "d")
+    if include_text:
+        columns["text"] = _Column("string", "q")
+    return _Table(columns)
+
+
+def _evidence_table() -> _Table:
+    return _Table(
+        {
+            "row": _Column("numeric", "I"),
+            "field": _Column("dictionary", "b", EVIDENCE_FIELDS),
+            "source": _Column("dictionary", "b", SOURCE_VALUES),
+            "cue": _Column("dictionary", "i", ("",)),
+            "start": _Column("numeric", "q"),
+            "end": _Column("numeric", "q"),
+        }
+    )
+
+
+def _add_spans(table: _Table, row: int, field: str, spans: Iterable[Any], cue: str = "") -> None:
+    cols = table.columns
+    for span in spans:
+        cols["row"].add(row)
+        cols["field"].add(field)
+        cols["source"].add(getattr(span.source, "value", span.source))
+        cols["cue"].add(cue)
+        cols["start"].add(-1 if span.start is None else span.start)
+        cols["end"].add(-1 if span.end is None else span.end)
+        table.rows += 1
+
+
+def _add_result(results: _Table, evidence: _Table, result: Any) -> None:
+    # ExtractionResult and ResultRecord have the same attribute tree
+    row = results.rows
+    cols = results.columns
+    signals = result.signals
+    for name in SIGNAL_FIELDS:
+        signal = getattr(signals, name)
+        cols[name].add(signal.presence.value)
+        _add_spans(evidence, row, name, signal.evidence)
+    cols["temporal"].add(signals.temporal.value)
+    cols["language"].add(result.meta.language)
+    cols["llm_backend"].add(result.meta.llm_backend)
+    cols["language_confidence"].add(float(result.meta.language_confidence))
+    if "text" in cols:
+        cols["text"].add(result.text)
+    for category in CUE_FIELDS:
+        for hit in getattr(result.cue_hits, category):
+            _add_spans(evidence, row, f"cue_hits.{category}", hit.evidence, hit.cue)
+    results.rows += 1
+
+
+def export_results(
+    results: Iterable[Any],
+    directory: Union[str, Path],
+    format: str = "auto",
+    include_text: bool = True,
+) -> Dict[str, Path]:
+    """
+    Writes ExtractionResults (or ResultRecords) as two columnar tables in
+    `directory`; returns {"results": path, "evidence": path}.
+
+    - format: "arrow" (needs pyarrow), "packed" (stdlib) or "auto"
+    - results are consumed as an iterator; columns are built as compact
+      typed arrays, note text is spooled to a temp file
+    """
+    if format == "auto":
+        format = "arrow" if pa is not None else "packed"
+    if format not in FORMATS:
+        raise ValueError(f"unknown columnar format {format!r}; expected one of {FORMATS}")
+    if format == "arrow" and pa is None:
+        raise ImportError("arrow format requested but pyarrow is not installed")
+
+    results_table = _results_table(include_text)
+    evidence_table = _evidence_table()
+    for result in results:
+        _add_result(results_table, evidence_table, result)
+
+    out = Path(directory)
+    out.mkdir(parents=True, exist_ok=True)
+    write = _write_arrow if format == "arrow" else _write_packed
+    paths = {}
+    for name, table in (("results", results_table), ("evidence", evidence_table)):
+        paths[name] = out / f"{name}{EXTENSIONS[format]}"
+        write(paths[name], table)
+    return paths
+
+
+# --------------------------------------------------
+# Writers
+# --------------------------------------------------
+
+def _pad(fh: Any) -> int:
+    pos = fh.tell()
+    if pos % 8:
+        fh.write(b"\0" * (8 - pos % 8))
+    return fh.tell()
+
+
+def _write_packed(path: Path, table: _Table) -> None:
+    meta: List[Dict[str, Any]] = []
+    with open(path, "wb") as fh:
+        fh.write(MAGIC)
+        for name, column in table.columns.items():
+            entry: Dict[str, Any] = {"name": name, "kind": column.kind, "type": column.values.typecode}
+            entry["offset"] = _pad(fh)
+            column.values.tofile(fh)
+            entry["length"] = fh.tell() - entry["offset"]
+            if column.kind == "dictionary":
+                entry["dictionary"] = list(column.dictionary)
+            elif column.kind == "string":
+                entry["data_offset"] = _pad(fh)
+                column.data.seek(0)
+                shutil.copyfileobj(column.data, fh)
+                column.data.close()
+                entry["data_length"] = fh.tell() - entry["data_offset"]
+            meta.append(entry)
+        footer = json.dumps(
+            {"format": PACKED_FORMAT, "byteorder": sys.byteorder, "rows": table.rows, "columns": meta},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        fh.write(footer)
+        fh.write(struct.pack("<Q", len(footer)))
+        fh.write(MAGIC)
+
+
+def _write_arrow(path: Path, table: _Table) -> None:
+    arrays = {}
+    for name, column in table.columns.items():
+        arrow_type = getattr(pa, _ARROW_TYPES[column.values.typecode])()
+        values = pa.Array.from_buffers(arrow_type, len(column.values), [None, pa.py_buffer(column.values.tobytes())])
+        if column.kind == "dictionary":
+            arrays[name] = pa.DictionaryArray.from_arrays(values, pa.array(list(column.dictionary), type=pa.string()))
+        elif column.kind == "string":
+            column.data.seek(0)
+            data = pa.py_buffer(column.data.read())
+            column.data.close()
+            offsets = pa.py_buffer(column.values.tobytes())
+            arrays[name] = pa.Array.from_buffers(pa.large_string(), table.rows, [None, offsets, data])
+        else:
+            arrays[name] = values
+    arrow_table = pa.table(arrays)
+    with pa.OSFile(str(path), "wb") as sink:
+        with pa_ipc.new_file(sink, arrow_table.schema) as writer:
+            writer.write_table(arrow_table)
+
+
+# --------------------------------------------------
+# Memory-mapped reader
+# --------------------------------------------------
+
+class ColumnView:
+    """
+    One column of a mapped table.
+
+    - values: the raw numbers (dictionary codes for dictionary columns),
+      a memoryview into the map when the file's byte order matches
+    - dictionary: code -> value for dictionary columns, else None
+    - col[i] / list(col): decoded values (strings for dictionary and
+      text columns)
+    """
+
+    def __init__(
+        self,
+        values: Sequence[Any],
+        dictionary: Optional[List[str]] = None,
+        data: Optional[Any] = None,
+    ) -> None:
+        self.values = values
+        self.dictionary = dictionary
+        self._data = data  # utf-8 bytes of a string column; values = offsets
+
+    def __len__(self) -> int:
+        return len(self.values) - 1 if self._data is not None else len(self.values)
+
+    def __getitem__(self, index: int) -> Any:
+        if self._data is not None:
+            if index < 0:
+                index += len(self)
+            return bytes(self._data[self.values[index] : self.values[index + 1]]).decode("utf-8", "surrogatepass")
+        value = self.values[index]
+        return self.dictionary[value] if self.dictionary is not None else value
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._data is not None:
+            return (self[i] for i in range(len(self)))
+        if self.dictionary is not None:
+            dictionary = self.dictionary
+            return (dictionary[code] for code in self.values)
+        return iter(self.values)
+
+    def to_list(self) -> List[Any]:
+        return list(self)
+
+    def counts(self) -> Dict[Any, int]:
+        """
+        Value -> number of rows; for dictionary columns counted on the codes.
+        """
+        if self.dictionary is None or self._data is not None:
+            out: Dict[Any, int] = {}
+            for value in self:
+                out[value] = out.get(value, 0) + 1
+            return out
+        tally = [0] * len(self.dictionary)
+        for code in self.values:
+            tally[code] += 1
+        return {value: n for value, n in zip(self.dictionary, tally) if n}
+
+
+class _PackedTable:
+    def __init__(self, path: Path) -> None:
+        self._fh = open(path, "rb")
+        self._map = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self._views: List[memoryview] = []
+        size = len(self._map)
+        if size < 2 * len(MAGIC) + 8 or self._map[: len(MAGIC)] != MAGIC or self._map[-len(MAGIC) :] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a packed columnar file")
+        (footer_size,) = struct.unpack("<Q", self._map[size - len(MAGIC) - 8 : size - len(MAGIC)])
+        footer_end = size - len(MAGIC) - 8
+        footer = json.loads(self._map[footer_end - footer_size : footer_end].decode("utf-8"))
+        if footer.get("format") != PACKED_FORMAT:
+            self.close()
+            raise ValueError(f"{path}: unsupported packed format {footer.get('format')!r}")
+        self.num_rows: int = footer["rows"]
+        self._swap = footer["byteorder"] != sys.byteorder
+        self._columns = {entry["name"]: entry for entry in footer["columns"]}
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self._columns)
+
+    def _slice(self, offset: int, length: int) -> memoryview:
+        view = self._view[offset : offset + length]
+        self._views.append(view)
+        return view
+
+    def column(self, name: str) -> ColumnView:
+        entry = self._columns[name]
+        raw = self._slice(entry["offset"], entry["length"])
+        if self._swap:
+            values: Sequence[Any] = array(entry["type"], raw)
+            values.byteswap()
+        else:
+            values = raw.cast(entry["type"])
+            self._views.append(values)
+        data = self._slice(entry["data_offset"], entry["data_length"]) if entry["kind"] == "string" else None
+        return ColumnView(values, entry.get("dictionary"), data)
+
+    def close(self) -> None:
+        # exported views must be released before the map can close
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._view.release()
+        self._map.close()
+        self._fh.close()
+
+
+class _ArrowTable:
+    def __init__(self, path: Path) -> None:
+        if pa is None:
+            raise ImportError(f"{path} is an Arrow file and pyarrow is not installed")
+        self._source = pa.memory_map(str(path), "r")
+        self._table = pa_ipc.open_file(self._source).read_all()  # zero-copy over the map
+        self.num_rows: int = self._table.num_rows
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self._table.column_names)
+
+    def column(self, name: str) -> ColumnView:
+        arr = self._table.column(name).combine_chunks()
+        if pa.types.is_dictionary(arr.type):
+            return ColumnView(_arrow_values(arr.indices), arr.dictionary.to_pylist())
+        if pa.types.is_large_string(arr.type):
+            offsets = memoryview(arr.buffers()[1]).cast("q")[arr.offset : arr.offset + len(arr) + 1]
+            return ColumnView(offsets, None, memoryview(arr.buffers()[2]))
+        return ColumnView(_arrow_values(arr))
+
+    def close(self) -> None:
+        self._table = None
+        self._source.close()
+
+
+def _arrow_values(arr: Any) -> Sequence[Any]:
+    typecode = {v: k for k, v in _ARROW_TYPES.items()}[str(arr.type)]
+    return memoryview(arr.buffers()[1]).cast(typecode)[arr.offset : arr.offset + len(arr)]
+
+
+class ColumnarTable:
+    """
+    A memory-mapped results or evidence table (either format).
+
+    Views handed out by column() point into the map and become invalid
+    once the table is closed.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as fh:
+            head = fh.read(len(MAGIC))
+        self._impl = _PackedTable(self.path) if head == MAGIC else _ArrowTable(self.path)
+
+    @property
+    def num_rows(self) -> int:
+        return self._impl.num_rows
+
+    @property
+    def column_names(self) -> List[str]:
+        return self._impl.column_names
+
+    def column(self, name: str) -> ColumnView:
+        if name not in self.column_names:
+            raise KeyError(f"{self.path.name} has no column {name!r}")
+        return self._impl.column(name)
+
+    def close(self) -> None:
+        self._impl.close()
+
+    def __enter__(self) -> "ColumnarTable":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_columnar(directory: Union[str, Path]) -> Tuple[ColumnarTable, ColumnarTable]:
+    """
+    (results, evidence) tables of an export_results() directory.
+    """
+    root = Path(directory)
+    for ext in EXTENSIONS.values():
+        if (root / f"results{ext}").exists():
+            return ColumnarTable(root / f"results{ext}"), ColumnarTable(root / f"evidence{ext}")
+    raise FileNotFoundError(f"no columnar export in {root}")
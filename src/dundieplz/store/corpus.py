@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import mmap
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+# --------------------------------------------------
+# Memory-mapped corpus store
+# --------------------------------------------------
+#
+# Notes are appended, UTF-8 encoded, to one data file; `<data>.idx` holds
+# one fixed-size record per note:
+#
+#   MAGIC | (doc_id, byte offset, byte length, char length) int64 LE ...
+#
+# Readers memory-map the data file: view() is a zero-copy slice, get()
+# decodes one note, span() cuts evidence offsets (character offsets) out
+# of a note without decoding it when the note is ASCII. Any number of
+# processes may read while one appends; refresh() picks up new notes.
+#
+# A note is only indexed after its bytes are on disk (flush() writes the
+# data file first), so readers never see a record pointing past the end.
+
+INDEX_MAGIC = b"DPZIDX1\n"
+_FIELDS = 4
+_RECORD = 8 * _FIELDS
+
+
+class CorpusStore:
+    """
+    Append-only note store with an array-backed offset index.
+
+    - writable=False opens an existing store read-only (workers, GUI)
+    - doc_ids are assigned in append order unless given explicitly; they
+      must be unique
+    - pickles as a read-only handle to the same files, so a store can be
+      handed to worker processes
+    """
+
+    def __init__(self, path: Union[str, Path], writable: bool = False) -> None:
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + ".idx")
+        self.writable = writable
+
+        self._ids = array("q")
+        self._offsets = array("q")
+        self._lengths = array("q")
+        self._chars = array("q")
+        self._positions: Optional[Dict[int, int]] = None  # None while doc_id == position
+        self._next_id = 0
+        self._index_bytes = len(INDEX_MAGIC)
+        self._map: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        self._mapped = 0
+
+        self._data = None
+        self._index = None
+        self._pending = bytearray()
+        if writable:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._data = open(self.path, "ab")
+            self._index = open(self.index_path, "ab")
+            if self._index.tell() == 0:
+                self._index.write(INDEX_MAGIC)
+                self._index.flush()
+        self._data_size = self.path.stat().st_size if self.path.exists() else 0
+        self.refresh()
+
+    # ------------------------------
+    # Index
+    # ------------------------------
+
+    def refresh(self) -> int:
+        """
+        Loads index records appended since the last call (by this or another
+        process); returns how many were new.
+        """
+        with open(self.index_path, "rb") as fh:
+            if self._index_bytes == len(INDEX_MAGIC) and fh.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise ValueError(f"{self.index_path} is not a corpus index")
+            fh.seek(self._index_bytes)
+            raw = fh.read()
+        raw = raw[: len(raw) - len(raw) % _RECORD]  # a record being written
+        if not raw:
+            return 0
+        records = array("q")
+        records.frombytes(raw)
+        if sys.byteorder != "little":
+            records.byteswap()
+        self._index_bytes += len(raw)
+        start = len(self._ids)
+        self._ids.extend(records[0::_FIELDS])
+        self._offsets.extend(records[1::_FIELDS])
+        self._lengths.extend(records[2::_FIELDS])
+        self._chars.extend(records[3::_FIELDS])
+        for position in range(start, len(self._ids)):
+            self._track(self._ids[position], position)
+        return len(self._ids) - start
+
+    def _track(self, doc_id: int, position: int) -> None:
+        self._next_id = max(self._next_id, doc_id + 1)
+        if self._positions is None:
+            if doc_id == position:
+                return
+            self._positions = {d: p for p, d in enumerate(self._ids[:position])}
+        if doc_id in self._positions:
+            raise ValueError(f"duplicate doc_id {doc_id} in {self.index_path}")
+        self._positions[doc_id] = position
+
+    def _position(self, doc_id: int) -> int:
+        if self._positions is None:
+            if 0 <= doc_id < len(self._ids):
+                return doc_id
+        elif doc_id in self._positions:
+            return self._positions[doc_id]
+        if not self.writable and self.refresh():
+            return self._position(doc_id)
+        raise KeyError(doc_id)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, doc_id: int) -> bool:
+        if self._positions is None:
+            return 0 <= doc_id < len(self._ids)
+        return doc_id in self._positions
+
+    def ids(self) -> Iterator[int]:
+        return iter(self._ids)
+
+    # ------------------------------
+    # Reading
+    # ------------------------------
+
+    def _remap(self, needed: int) -> None:
+        if self._data is not None and self._pending:
+            self.flush()
+        size = self.path.stat().st_size
+        if size < needed:
+            raise ValueError(f"{self.path} is shorter than its index")
+        if self._map is not None:
+            # views handed out keep the old map alive until they are dropped
+            self._view = None
+            self._map = None
+        with open(self.path, "rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), size, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self._mapped = size
+
+    def view(self, doc_id: int) -> memoryview:
+        """
+        UTF-8 bytes of a note, zero-copy (valid while the store is open).
+        """
+        position = self._position(doc_id)
+        offset, length = self._offsets[position], self._lengths[position]
+        if offset + length > self._mapped:
+            self._remap(offset + length)
+        if length == 0:
+            return memoryview(b"")
+        return self._view[offset : offset + length]
+
+    def get(self, doc_id: int) -> str:
+        return str(self.view(doc_id), "utf-8", "surrogatepass")
+
+    def span(self, doc_id: int, start: int, end: int) -> str:
+        """
+        note[start:end] for character offsets (EvidenceSpan.start/end).
+        """
+        position = self._position(doc_id)
+        if self._chars[position] == self._lengths[position]:  # ASCII: bytes == chars
+            view = self.view(doc_id)
+            return str(view[max(0, start) : max(0, end)], "ascii")
+        return self.get(doc_id)[start:end]
+
+    def __getitem__(self, doc_id: int) -> str:
+        return self.get(doc_id)
+
+    # ------------------------------
+    # Writing
+    # ------------------------------
+
+    def append(self, text: str, doc_id: Optional[int] = None) -> int:
+        """
+        Appends a note; returns its doc_id. Readable after flush().
+        """
+        if self._data is None:
+            raise ValueError("corpus store is read-only")
+        if doc_id is None:
+            doc_id = self._next_id
+        elif doc_id in self:
+            raise ValueError(f"duplicate doc_id {doc_id}")
+        raw = text.encode("utf-8", "surrogatepass")
+        record = array("q", (doc_id, self._data_size, len(raw), len(text)))
+        if sys.byteorder != "little":
+            record.byteswap()
+        self._data.write(raw)
+        self._pending += record.tobytes()
+
+        position = len(self._ids)
+        self._ids.append(doc_id)
+        self._offsets.append(self._data_size)
+        self._lengths.append(len(raw))
+        self._chars.append(len(text))
+        self._track(doc_id, position)
+        self._data_size += len(raw)
+        return doc_id
+
+    def extend(self, texts: Iterable[str]) -> List[int]:
+        ids = [self.append(text) for text in texts]
+        self.flush()
+        return ids
+
+    def flush(self) -> None:
+        """
+        Data first, then the index records that point into it.
+        """
+        if self._data is None or not self._pending:
+            return
+        self._data.flush()
+        self._index.write(self._pending)
+        self._index.flush()
+        self._index_bytes += len(self._pending)
+        self._pending.clear()
+
+    # ------------------------------
+    # Lifecycle
+    # ------------------------------
+
+    def close(self) -> None:
+        self.flush()
+        if self._data is not None:
+            self._data.close()
+            self._index.close()
+            self._data = self._index = None
+        self._view = None
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:  # views still referenced; closed when they go
+                pass
+            self._map = None
+        self._mapped = 0
+
+    def __enter__(self) -> "CorpusStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        self.flush()
+        return {"path": str(self.path)}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state["path"])
+
+
+class CorpusLoader:
+    """
+    Picklable doc_id -> text loader for Extractor.iter_extract: workers
+    receive ids only and read the notes from their own mapping.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = str(path)
+        self._store: Optional[CorpusStore] = None
+
+    def __call__(self, doc_id: int) -> str:
+        if self._store is None:
+            self._store = CorpusStore(self.path)
+        return self._store.get(doc_id)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"path": self.path}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.path = state["path"]
+        self._store = None
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from pydantic import TypeAdapter
+
+from dundieplz.schemas.extractor_schema import EvidenceSpan, ExtractionResult, ExtractorMeta
+
+
+# --------------------------------------------------
+# Schema (single source for scripts/create_db.py)
+# --------------------------------------------------
+
+SCHEMA_STATEMENTS: List[str] = [
+    """
+CREATE TABLE IF NOT EXISTS synthetic_cases (
+    case_id TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    language TEXT DEFAULT 'pt',
+    notes TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+""",
+    """
+CREATE TABLE IF NOT EXISTS extraction_runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    model_name TEXT NOT NULL,
+    extractor_version TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+""",
+    """
+CREATE TABLE IF NOT EXISTS extracted_outputs (
+    output_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL,
+    case_id TEXT NOT NULL,
+    suicidal_ideation_presence TEXT,
+    evidence_json TEXT,
+    uncertainty_cues_json TEXT,
+    missing_information_json TEXT,
+    raw_output_json TEXT,
+    FOREIGN KEY (run_id) REFERENCES extraction_runs(run_id),
+    FOREIGN KEY (case_id) REFERENCES synthetic_cases(case_id)
+);
+""",
+    """
+CREATE TABLE IF NOT EXISTS framework_projections (
+    projection_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    output_id INTEGER NOT NULL,
+    framework TEXT NOT NULL,
+    projection_json TEXT NOT NULL,
+    FOREIGN KEY (output_id) REFERENCES extracted_outputs(output_id)
+);
+""",
+]
+
+INDEX_STATEMENTS: List[str] = [
+    "CREATE INDEX IF NOT EXISTS idx_outputs_run_case ON extracted_outputs (run_id, case_id);",
+    "CREATE INDEX IF NOT EXISTS idx_outputs_si_presence ON extracted_outputs (suicidal_ideation_presence);",
+    "CREATE INDEX IF NOT EXISTS idx_projections_output ON framework_projections (output_id, framework);",
+]
+
+# Bulk-load friendly settings. foreign_keys stays off (SQLite default):
+# backfill case_ids are not rows of synthetic_cases.
+PRAGMAS: List[str] = [
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA cache_size=-65536;",
+    "PRAGMA busy_timeout=30000;",
+]
+
+_INSERT_OUTPUT = """
+INSERT INTO extracted_outputs (
+    run_id, case_id, suicidal_ideation_presence, evidence_json,
+    uncertainty_cues_json, missing_information_json, raw_output_json
+) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SIGNAL_NAMES = ("suicidal_ideation", "self_harm", "intent", "plan", "past_behavior")
+
+_INSERT_PROJECTION = """
+INSERT INTO framework_projections (output_id, framework, projection_json) VALUES (?, ?, ?)
+"""
+
+OutputRow = Tuple[int, str, str, str, str, str, str]
+ProjectionRow = Tuple[int, str, str]
+
+# Serialized in one pydantic-core call each (no per-span model_dump).
+_EVIDENCE_JSON = TypeAdapter(Dict[str, List[EvidenceSpan]])
+_STRINGS_JSON = TypeAdapter(List[str])
+
+
+def output_row(run_id: int, case_id: str, result: ExtractionResult) -> OutputRow:
+    """
+    Flattens one ExtractionResult into an extracted_outputs row.
+    """
+    signals = result.signals
+    evidence = {name: getattr(signals, name).evidence for name in _SIGNAL_NAMES}
+    return (
+        run_id,
+        case_id,
+        signals.suicidal_ideation.presence.value,
+        _EVIDENCE_JSON.dump_json(evidence).decode("utf-8"),
+        _STRINGS_JSON.dump_json(signals.uncertainty_cues).decode("utf-8"),
+        _STRINGS_JSON.dump_json(signals.missing_information).decode("utf-8"),
+        result.model_dump_json(),
+    )
+
+
+# --------------------------------------------------
+# Repository
+# --------------------------------------------------
+
+class ExtractionRepository:
+    """
+    SQLite persistence for extraction runs.
+
+    - WAL mode + bulk-friendly pragmas
+    - results are bulk-inserted with executemany, one transaction per batch
+    - one connection per repository; use ResultWriter to feed it from
+      parallel extractors
+    """
+
+    def __init__(self, path: Union[str, Path], batch_size: int = 1000) -> None:
+        self.path = Path(path)
+        self.batch_size = max(1, batch_size)
+        # Autocommit mode; transactions are opened explicitly per batch.
+        self.conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        for pragma in PRAGMAS:
+            self.conn.execute(pragma)
+        self.ensure_schema()
+
+    def ensure_schema(self) -> None:
+        for stmt in SCHEMA_STATEMENTS + INDEX_STATEMENTS:
+            self.conn.execute(stmt)
+
+    def start_run(self, model_name: str, extractor_version: Optional[str] = None) -> int:
+        if extractor_version is None:
+            extractor_version = ExtractorMeta.model_fields["extractor_version"].default
+        cur = self.conn.execute(
+            "INSERT INTO extraction_runs (model_name, extractor_version) VALUES (?, ?)",
+            (model_name, extractor_version),
+        )
+        return int(cur.lastrowid)
+
+    def insert_results(self, run_id: int, results: Iterable[Tuple[str, ExtractionResult]]) -> int:
+        """
+        Bulk-inserts (case_id, result) pairs; returns the number of rows written.
+        """
+        return self.insert_rows(output_row(run_id, case_id, result) for case_id, result in results)
+
+    def insert_rows(self, rows: Iterable[OutputRow]) -> int:
+        written = 0
+        batch: List[OutputRow] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                written += self._write_batch(batch)
+                batch = []
+        if batch:
+            written += self._write_batch(batch)
+        return written
+
+    def _write_batch(self, batch: Sequence[OutputRow]) -> int:
+        self.conn.execute("BEGIN")
+        try:
+            self.conn.executemany(_INSERT_OUTPUT, batch)
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+        return len(batch)
+
+    def iter_raw_outputs(
+        self, run_id: Optional[int] = None, batch_size: Optional[int] = None
+    ) -> Iterator[List[Tuple[int, str]]]:
+        """
+        (output_id, raw_output_json) rows in output_id order, in lists of
+        `batch_size`; keyset-paginated, so no cursor stays open between
+        batches and the caller may write in between.
+        """
+        size = batch_size or self.batch_size
+        where = "output_id > ?" if run_id is None else "output_id > ? AND run_id = ?"
+        sql = f"SELECT output_id, raw_output_json FROM extracted_outputs WHERE {where} ORDER BY output_id LIMIT ?"
+        last = -1
+        while True:
+            params = (last, size) if run_id is None else (last, run_id, size)
+            rows = self.conn.execute(sql, params).fetchall()
+            if not rows:
+                return
+            yield rows
+            last = rows[-1][0]
+
+    def replace_projections(self, rows: Iterable[ProjectionRow]) -> int:
+        """
+        Writes framework_projections rows in one transaction, first dropping
+        earlier projections of the same (output_id, framework).
+        """
+        batch = list(rows)
+        self.conn.execute("BEGIN")
+        try:
+            self.conn.executemany(
+                "DELETE FROM framework_projections WHERE output_id = ? AND framework = ?",
+                [(output_id, framework) for output_id, framework, _ in batch],
+            )
+            self.conn.executemany(_INSERT_PROJECTION, batch)
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+        return len(batch)
+
+    def count_projections(self, framework: str) -> int:
+        row = self.conn.execute(
+            "SELECT COUNT(*) FROM framework_projections WHERE framework = ?", (framework,)
+        ).fetchone()
+        return int(row[0])
+
+    def count_outputs(self, run_id: int) -> int:
+        row = self.conn.execute(
+            "SELECT COUNT(*) FROM extracted_outputs WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        return int(row[0])
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "ExtractionRepository":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# --------------------------------------------------
+# Dedicated writer thread
+# --------------------------------------------------
+
+_STOP = object()
+
+
+class ResultWriter:
+    """
+    Background writer for one run.
+
+    - submit() only enqueues; row flattening and SQLite work happen on the
+      writer thread, so extraction threads never wait on the database
+    - the queue is bounded: when the database falls behind, submit()
+      blocks instead of letting memory grow
+    - batches are whatever is queued (up to batch_size) when the writer
+      wakes, so latency stays low under light load
+    """
+
+    def __init__(
+        self,
+        repository: ExtractionRepository,
+        run_id: int,
+        max_queue: int = 10_000,
+    ) -> None:
+        self.repository = repository
+        self.run_id = run_id
+        self.written = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_queue))
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="dundieplz-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, case_id: str, result: ExtractionResult) -> None:
+        if self._error is not None:
+            raise RuntimeError("result writer failed") from self._error
+        self._queue.put((case_id, result))
+
+    def close(self) -> None:
+        """
+        Flushes everything queued and stops the thread; re-raises writer errors.
+        """
+        self._queue.put(_STOP)
+        self._thread.join()
+        if self._error is not None:
+            raise RuntimeError("result writer failed") from self._error
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        batch_size = self.repository.batch_size
+        stopping = False
+        while not stopping:
+            items = [self._queue.get()]
+            while len(items) < batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if items[-1] is _STOP:
+                items.pop()
+                stopping = True
+            if not items or self._error is not None:
+                continue
+            try:
+                rows = [output_row(self.run_id, case_id, result) for case_id, result in items]
+                self.written += self.repository.insert_rows(rows)
+            except BaseException as exc:  # surfaced on submit()/close()
+                self._error = exc
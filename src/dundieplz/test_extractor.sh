@@ -6,6 +6,7 @@ CASES_PATH="${1:-../data/synthetic_cases.jsonl}"
 echo "Running synthetic cases from: $CASES_PATH"
 
 python - "$CASES_PATH" << 'EOF'
+import os
 import sys
 import json
 from pathlib import Path
@@ -14,7 +15,7 @@ from dundieplz.extract.extractor import Extractor
 from dundieplz.extract.rule_llm_client import RuleLLMClient
 
 cases_path = Path(sys.argv[1])
-lines = [ln for ln in cases_path.read_text(encoding="utf-8").splitlines() if ln.strip()]
+debug = os.environ.get("DUNDIEPLZ_DEBUG") == "1"
 
 rule_client = RuleLLMClient()
 extractor = Extractor(llm_client=rule_client)
@@ -29,14 +30,14 @@ def got_dict(result):
         "temporal": s.temporal.value,
     }
 
-for ln in lines:
+# Stream the file line by line instead of loading it whole
+cases_file = cases_path.open(encoding="utf-8")
+for ln in cases_file:
+    if not ln.strip():
+        continue
     case = json.loads(ln)
     text = case["text"]
 
-    # --- DEBUG 1: call RuleLLMClient directly (bypasses Extractor) ---
-    direct = rule_client.generate_json(text)
-
-    # --- DEBUG 2: call Extractor (should internally call the client) ---
     result = extractor.extract(text)
 
     expected = case.get("expected", {})
@@ -46,8 +47,11 @@ for ln in lines:
     print("CASE:", case.get("case_id"))
     print("Expected:", expected)
 
-    print("\n[DEBUG] RuleLLMClient.generate_json(text) returned:")
-    print({k: direct.get(k) for k in ["suicidal_ideation","intent","plan","past_behavior","temporal"]})
+    # --- DEBUG (DUNDIEPLZ_DEBUG=1): call RuleLLMClient directly (bypasses Extractor) ---
+    if debug:
+        direct = rule_client.generate_json(text)
+        print("\n[DEBUG] RuleLLMClient.generate_json(text) returned:")
+        print({k: direct.get(k) for k in ["suicidal_ideation","intent","plan","past_behavior","temporal"]})
 
     print("\nGot (Extractor output):", got)
 
@@ -58,5 +62,6 @@ for ln in lines:
         elif k in expected:
             print(f"  PASS {k}: {expected[k]}")
 
+cases_file.close()
 print("\nTest completed.")
 EOF
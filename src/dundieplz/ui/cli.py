@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import json
+import sys
+from collections import deque
+from contextlib import contextmanager
+from enum import Enum
+from functools import partial
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Union
+
+import typer
+
+if TYPE_CHECKING:
+    from dundieplz.extract.chunking import ChunkingConfig
+    from dundieplz.extract.extractor import Extractor
+
+# Only typer and the stdlib are imported here: `--help`, argument errors
+# and shell completion never load pydantic or the extraction stack. Each
+# command imports what it needs (tests/test_startup.py keeps it that way).
+
+app = typer.Typer(
+    help="DundiePlz command line (research prototype, non-clinical).",
+    no_args_is_help=True,
+    # plain click help/usage errors: rich formatting costs ~100 ms of imports
+    rich_markup_mode=None,
+)
+
+
+class Backend(str, Enum):
+    rules = "rules"
+    dummy = "dummy"
+
+
+# --------------------------------------------------
+# Helpers
+# --------------------------------------------------
+
+def make_extractor(backend: Backend, chunking: Optional[ChunkingConfig] = None) -> Extractor:
+    from dundieplz.extract.extractor import Extractor
+
+    if backend == Backend.rules:
+        from dundieplz.extract.rule_llm_client import RuleLLMClient
+
+        return Extractor(llm_client=RuleLLMClient(), chunking=chunking)
+
+    from dundieplz.extract.llm_client import DummyLLMClient
+
+    return Extractor(llm_client=DummyLLMClient(), chunking=chunking)
+
+
+def load_jsonl_text(line: str, text_field: str = "text") -> str:
+    """
+    Pulls the note text out of one JSONL record (runs inside workers).
+    """
+    record = json.loads(line)
+    if not isinstance(record, dict) or not isinstance(record.get(text_field), str):
+        raise ValueError(f"record has no string field {text_field!r}")
+    return record[text_field]
+
+
+def load_corpus_item(
+    item: Union[int, str],
+    loader: Callable[[int], str],
+    text_field: str = "text",
+) -> str:
+    """
+    Worker-side loader for `extract --corpus`: doc_ids are read from the
+    store; lines the parent could not parse are re-parsed here so they fail
+    with their own error.
+    """
+    if isinstance(item, str):
+        return load_jsonl_text(item, text_field)
+    return loader(item)
+
+
+def restore_text(record: Dict[str, Any], store: Any) -> Dict[str, Any]:
+    """
+    Puts the note back into a result written by `extract --corpus`; such
+    results have no text of their own, so they need the store.
+    """
+    doc_id = record.pop("doc_id", None)
+    if doc_id is None:
+        return record
+    if store is None:
+        raise typer.BadParameter(
+            f"result references doc_id {doc_id} but no corpus store was given", param_hint="--corpus"
+        )
+    record["text"] = store.get(doc_id)
+    return record
+
+
+def open_corpus(path: Optional[str]) -> Any:
+    if path is None:
+        return None
+    from dundieplz.store.corpus import CorpusStore
+
+    try:
+        return CorpusStore(path)
+    except (OSError, ValueError) as exc:
+        raise typer.BadParameter(str(exc), param_hint="--corpus") from exc
+
+
+def iter_records(stream: IO[str]) -> Iterator[str]:
+    """
+    Lazily yields non-blank lines; the file is never read as a whole.
+    """
+    for line in stream:
+        if line.strip():
+            yield line
+
+
+@contextmanager
+def open_stream(path: str, mode: str) -> Iterator[IO]:
+    binary = "b" in mode
+    if path == "-":
+        stream = sys.stdin if "r" in mode else sys.stdout
+        yield stream.buffer if binary else stream
+        return
+    with open(path, mode, encoding=None if binary else "utf-8") as fh:
+        yield fh
+
+
+# --------------------------------------------------
+# Commands
+# --------------------------------------------------
+
+@app.callback()
+def main() -> None:
+    """
+    DundiePlz command line (research prototype, non-clinical).
+    """
+
+
+@app.command()
+def extract(
+    input_path: str = typer.Option("-", "--input", "-i", help="JSONL input ('-' for stdin)."),
+    output_path: str = typer.Option("-", "--output", "-o", help="JSONL output ('-' for stdout)."),
+    backend: Backend = typer.Option(Backend.rules, "--backend", "-b", help="Extraction backend."),
+    workers: int = typer.Option(1, "--workers", "-w", min=1, help="Worker processes."),
+    chunksize: int = typer.Option(64, "--chunksize", min=1, help="Records per worker task."),
+    max_pending: int = typer.Option(0, "--max-pending", min=0, help="Chunks in flight (0 = 2 per worker)."),
+    text_field: str = typer.Option("text", "--text-field", help="JSON field holding the note text."),
+    compact: bool = typer.Option(False, "--compact", help="Drop empty lists and default values."),
+    window: int = typer.Option(0, "--window", min=0, help="Chunk notes longer than this many chars (0 = off)."),
+    overlap: int = typer.Option(400, "--overlap", min=0, help="Chars shared by consecutive chunks."),
+    corpus: Optional[str] = typer.Option(
+        None, "--corpus", help="Append notes to this corpus store; results carry doc_id instead of text."
+    ),
+) -> None:
+    """
+    Streams JSONL notes through the extractor and writes one ExtractionResult
+    (or ExtractionFailure) JSON line per input record, in input order.
+
+    With --corpus, workers read notes from the memory-mapped store by doc_id
+    and results are written with an empty text and a "doc_id" key
+    (`report`/`export --corpus` put the text back).
+    """
+    from dundieplz.extract.chunking import ChunkingConfig
+    from dundieplz.extract.serializer import ResultSerializer
+    from dundieplz.schemas.extractor_schema import ExtractionFailure
+
+    chunking = None
+    if window:
+        try:
+            chunking = ChunkingConfig(window=window, overlap=min(overlap, max(0, window // 2 - 1)))
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc), param_hint="--window") from exc
+    extractor = make_extractor(backend, chunking)
+    serializer = ResultSerializer(compact=compact)
+    failures = 0
+
+    store = None
+    doc_ids: deque = deque()
+    loader = partial(load_jsonl_text, text_field=text_field)
+    if corpus is not None:
+        from dundieplz.store.corpus import CorpusLoader, CorpusStore
+
+        store = CorpusStore(corpus, writable=True)
+        loader = partial(load_corpus_item, loader=CorpusLoader(corpus), text_field=text_field)
+
+    def items(stream: IO[str]) -> Iterator[Union[int, str]]:
+        for line in iter_records(stream):
+            if store is None:
+                yield line
+                continue
+            try:
+                doc_id = store.append(load_jsonl_text(line, text_field))
+            except ValueError:
+                doc_ids.append(None)
+                yield line
+                continue
+            # flushed before the id is handed to a worker
+            store.flush()
+            doc_ids.append(doc_id)
+            yield doc_id
+
+    with open_stream(input_path, "r") as src, open_stream(output_path, "wb") as dst:
+        results = extractor.iter_extract(
+            items(src),
+            workers=workers,
+            chunksize=chunksize,
+            max_pending=max_pending or None,
+            loader=loader,
+            as_records=True,
+            keep_text=store is None,
+        )
+        try:
+            for result in results:
+                line = serializer.dumps_line(result)
+                doc_id = doc_ids.popleft() if store is not None else None
+                if isinstance(result, ExtractionFailure):
+                    failures += 1
+                elif doc_id is not None:
+                    line = b'{"doc_id":%d,%s' % (doc_id, line[1:])
+                # Blocking writes are the back-pressure: no new input is read
+                # until the sink has taken this line.
+                dst.write(line)
+            dst.flush()
+        finally:
+            if store is not None:
+                store.close()
+
+    if failures:
+        typer.echo(f"{failures} record(s) failed; see error entries in the output.", err=True)
+
+
+@app.command()
+def report(
+    input_path: str = typer.Option("-", "--input", "-i", help="JSONL results of `extract` ('-' for stdin)."),
+    output_path: str = typer.Option("-", "--output", "-o", help="HTML output ('-' for stdout)."),
+    title: str = typer.Option("DundiePlz evidence review", "--title", help="Page title."),
+    cues: bool = typer.Option(True, "--cues/--no-cues", help="Highlight cue-matcher evidence too."),
+    corpus: Optional[str] = typer.Option(None, "--corpus", help="Corpus store the results reference."),
+) -> None:
+    """
+    Renders extraction results as one static HTML page with highlighted
+    evidence. Error entries are skipped.
+    """
+    from dundieplz.schemas.extractor_schema import ExtractionResult
+    from dundieplz.ui.highlight import iter_report
+
+    skipped = 0
+    store = open_corpus(corpus)
+
+    def results(stream: IO[str]) -> Iterator[ExtractionResult]:
+        nonlocal skipped
+        for line in iter_records(stream):
+            record = json.loads(line)
+            if "error_type" in record:
+                skipped += 1
+                continue
+            yield ExtractionResult.model_validate(restore_text(record, store))
+
+    with open_stream(input_path, "r") as src, open_stream(output_path, "w") as dst:
+        for piece in iter_report(results(src), title=title, include_cues=cues):
+            dst.write(piece)
+        dst.flush()
+
+    if skipped:
+        typer.echo(f"{skipped} error entr{'y' if skipped == 1 else 'ies'} skipped.", err=True)
+
+
+class ColumnarFormat(str, Enum):
+    auto = "auto"
+    arrow = "arrow"
+    packed = "packed"
+
+
+@app.command()
+def export(
+    input_path: str = typer.Option("-", "--input", "-i", help="JSONL results of `extract` ('-' for stdin)."),
+    output_dir: str = typer.Option(..., "--output", "-o", help="Directory for the columnar tables."),
+    fmt: ColumnarFormat = typer.Option(ColumnarFormat.auto, "--format", help="arrow needs pyarrow."),
+    text: bool = typer.Option(True, "--text/--no-text", help="Include the note text column."),
+    corpus: Optional[str] = typer.Option(None, "--corpus", help="Corpus store the results reference."),
+) -> None:
+    """
+    Converts extraction results to columnar tables (results + evidence
+    offsets). Error entries are skipped.
+    """
+    from dundieplz.schemas.extractor_schema import ExtractionResult
+    from dundieplz.store.columnar import export_results
+
+    skipped = 0
+    store = open_corpus(corpus)
+
+    def results(stream: IO[str]) -> Iterator[ExtractionResult]:
+        nonlocal skipped
+        for line in iter_records(stream):
+            record = json.loads(line)
+            if "error_type" in record:
+                skipped += 1
+                continue
+            yield ExtractionResult.model_validate(restore_text(record, store))
+
+    try:
+        with open_stream(input_path, "r") as src:
+            paths = export_results(results(src), output_dir, format=fmt.value, include_text=text)
+    except ImportError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--format") from exc
+
+    for path in paths.values():
+        typer.echo(str(path), err=True)
+    if skipped:
+        typer.echo(f"{skipped} error entr{'y' if skipped == 1 else 'ies'} skipped.", err=True)
+
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host", help="Interface to bind (keep it local)."),
+    port: int = typer.Option(8765, "--port", "-p", min=0, help="TCP port."),
+    unix_socket: Optional[str] = typer.Option(None, "--unix", help="Serve on this Unix socket instead of TCP."),
+    backends: List[Backend] = typer.Option([Backend.rules], "--backend", "-b", help="Backends to keep warm (repeatable)."),
+    workers: int = typer.Option(0, "--workers", "-w", min=0, help="Worker processes (0 = request threads)."),
+    max_pending: int = typer.Option(256, "--max-pending", min=1, help="Notes in flight before answering 503."),
+    max_batch: int = typer.Option(1000, "--max-batch", min=1, help="Notes per batch request."),
+    chunksize: int = typer.Option(16, "--chunksize", min=1, help="Batch notes per worker task."),
+    timeout: float = typer.Option(0, "--timeout", min=0, help="Seconds before a request gets 504 (0 = none; needs --workers)."),
+    compact: bool = typer.Option(False, "--compact", help="Drop empty lists and default values."),
+) -> None:
+    """
+    Runs a resident extraction server with warm extractors: POST
+    /extract and /extract/batch, GET /healthz and /metrics.
+    """
+    from dundieplz.ui.server import ExtractionService, serve as run_server
+
+    if timeout and not workers:
+        raise typer.BadParameter("needs --workers > 0 (request threads cannot be interrupted)", param_hint="--timeout")
+    service = ExtractionService(
+        backends=[backend.value for backend in dict.fromkeys(backends)],
+        workers=workers,
+        max_pending=max_pending,
+        max_batch=max_batch,
+        chunksize=chunksize,
+        timeout=timeout or None,
+        compact=compact,
+    )
+    where = unix_socket or f"http://{host}:{port}"
+    typer.echo(f"starting {', '.join(service.backends)} on {where} (Ctrl+C to stop)", err=True)
+    run_server(service, host=host, port=port, unix_socket=unix_socket)
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from html import escape
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dundieplz.schemas.extractor_schema import ExtractionResult
+
+# --------------------------------------------------
+# Evidence highlighting (HTML)
+# --------------------------------------------------
+#
+# Every evidence span of a result (signals and cue hits) becomes a
+# Highlight; render_highlights() cuts the text at every span boundary and
+# emits one flat <mark> per covered segment, so overlapping and nested
+# spans never repeat text or move backwards. A segment covered by several
+# sources carries all of them (class + title) and is colored by the first
+# in SOURCE_COLORS order; the title also lists the labels (signal names,
+# "<category>: <cue>") of every span covering it. One sort of the
+# boundaries, one pass, one join.
+#
+# No Streamlit here: the GUI, the CLI `report` command and scripts that
+# export static review pages all share this module.
+
+SOURCE_COLORS: Dict[str, str] = {
+    "rule": "#ffe066",
+    "llm": "#a5d8ff",
+    "cue_matcher": "#b2f2bb",
+}
+FALLBACK_COLOR = "#dee2e6"
+
+REPORT_CSS = """
+body { font-family: sans-serif; margin: 2em; }
+.note { white-space: pre-wrap; line-height: 1.5; border: 1px solid #ddd; padding: 1em; }
+.legend mark { margin-right: 1em; }
+mark.multi { box-shadow: 0 2px 0 #495057; }
+"""
+
+
+@dataclass(frozen=True)
+class Highlight:
+    start: int
+    end: int
+    source: str
+    label: str = ""
+
+
+def evidence_highlights(result: ExtractionResult, include_cues: bool = True) -> List[Highlight]:
+    """
+    Located evidence of `result`: signal evidence labelled with the signal
+    name, cue evidence with "<category>: <cue>". Spans without offsets are
+    skipped (there is nothing to mark).
+    """
+    out: List[Highlight] = []
+    for name, value in result.signals.__dict__.items():
+        for ev in getattr(value, "evidence", ()):
+            if ev.start is not None and ev.end is not None:
+                out.append(Highlight(ev.start, ev.end, ev.source.value, name))
+    if include_cues:
+        for category in ("contextual", "subjective", "ambiguous"):
+            for hit in getattr(result.cue_hits, category):
+                for ev in hit.evidence:
+                    if ev.start is not None and ev.end is not None:
+                        out.append(Highlight(ev.start, ev.end, ev.source.value, f"{category}: {hit.cue}"))
+    return out
+
+
+def _source_order(highlights: Iterable[Highlight], colors: Dict[str, str]) -> Dict[str, int]:
+    order = {source: rank for rank, source in enumerate(colors)}
+    for h in highlights:
+        order.setdefault(h.source, len(order))
+    return order
+
+
+def render_highlights(
+    text: str,
+    highlights: Iterable[Highlight],
+    colors: Optional[Dict[str, str]] = None,
+) -> str:
+    """
+    `text`, HTML-escaped, with every highlighted segment wrapped in <mark>.
+
+    - spans are clipped to the text; empty spans are ignored
+    - O(n log n) in the number of spans (one sort), linear in the text
+    """
+    colors = SOURCE_COLORS if colors is None else colors
+    n = len(text)
+
+    opens: Dict[int, List[Highlight]] = {}
+    closes: Dict[int, List[Highlight]] = {}
+    spans: List[Highlight] = []
+    for h in highlights:
+        start, end = max(0, h.start), min(n, h.end)
+        if start >= end:
+            continue
+        spans.append(h)
+        opens.setdefault(start, []).append(h)
+        closes.setdefault(end, []).append(h)
+
+    order = _source_order(spans, colors)
+    depth: List[int] = [0] * len(order)
+    labels: Dict[str, int] = {}  # active labels, first opened first
+    tags: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], str] = {}
+
+    parts: List[str] = []
+    cursor = 0
+    for pos in sorted(opens.keys() | closes.keys()):
+        if pos > cursor:
+            segment = escape(text[cursor:pos])
+            active = tuple(source for source, rank in order.items() if depth[rank])
+            if active:
+                key = (active, tuple(labels))
+                tag = tags.get(key)
+                if tag is None:
+                    tag = tags[key] = _open_tag(active, key[1], colors)
+                parts.append(f"{tag}{segment}</mark>")
+            else:
+                parts.append(segment)
+            cursor = pos
+        for h in closes.get(pos, ()):
+            depth[order[h.source]] -= 1
+            if h.label:
+                labels[h.label] -= 1
+                if not labels[h.label]:
+                    del labels[h.label]
+        for h in opens.get(pos, ()):
+            depth[order[h.source]] += 1
+            if h.label:
+                labels[h.label] = labels.get(h.label, 0) + 1
+    parts.append(escape(text[cursor:]))
+    return "".join(parts)
+
+
+def _open_tag(sources: Tuple[str, ...], labels: Tuple[str, ...], colors: Dict[str, str]) -> str:
+    color = colors.get(sources[0], FALLBACK_COLOR)
+    classes = " ".join(f"ev-{source}" for source in sources)
+    if len(sources) > 1:
+        classes += " multi"
+    title = f"source={'+'.join(sources)}"
+    if labels:
+        title += " | " + "; ".join(labels)
+    return f"<mark class='{classes}' title='{escape(title)}' style='background-color:{color};'>"
+
+
+def legend_html(colors: Optional[Dict[str, str]] = None) -> str:
+    colors = SOURCE_COLORS if colors is None else colors
+    return "".join(
+        f"<mark class='ev-{source}' style='background-color:{color};'>{escape(source)}</mark>"
+        for source, color in colors.items()
+    )
+
+
+def render_result(result: ExtractionResult, include_cues: bool = True) -> str:
+    return render_highlights(result.text, evidence_highlights(result, include_cues))
+
+
+# --------------------------------------------------
+# Static review reports
+# --------------------------------------------------
+
+def iter_report(
+    results: Iterable[ExtractionResult],
+    title: str = "DundiePlz evidence review",
+    include_cues: bool = True,
+) -> Iterator[str]:
+    """
+    A standalone HTML page, in pieces: one section per result, rendered
+    as the results are consumed (write the pieces to a file as they come).
+    """
+    yield (
+        f"<!DOCTYPE html>\n<html><head><meta charset='utf-8'><title>{escape(title)}</title>"
+        f"<style>{REPORT_CSS}</style></head><body>\n"
+        f"<h1>{escape(title)}</h1>\n<p class='legend'>{legend_html()}</p>\n"
+    )
+    for index, result in enumerate(results):
+        meta = result.meta
+        signals = ", ".join(
+            f"{name}={value.presence.value}"
+            for name, value in result.signals.__dict__.items()
+            if hasattr(value, "presence")
+        )
+        yield (
+            f"<section><h2>#{index}</h2>"
+            f"<p>backend={escape(meta.llm_backend)} language={escape(meta.language)} "
+            f"temporal={result.signals.temporal.value} {escape(signals)}</p>"
+            f"<div class='note'>{render_result(result, include_cues)}</div></section>\n"
+        )
+    yield "</body></html>\n"
+
+
+def render_report(
+    results: Iterable[ExtractionResult],
+    title: str = "DundiePlz evidence review",
+    include_cues: bool = True,
+) -> str:
+    return "".join(iter_report(results, title, include_cues))
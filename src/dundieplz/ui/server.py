@@ -0,0 +1,551 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import signal
+import socketserver
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.instrument import ExtractionMetrics, Instrumentation, PrometheusTextfileSink
+from dundieplz.extract.serializer import ResultSerializer
+from dundieplz.schemas.extractor_schema import ExtractionFailure
+from dundieplz.ui.cli import Backend, make_extractor
+
+logger = logging.getLogger("dundieplz.server")
+
+# --------------------------------------------------
+# Resident extraction server
+# --------------------------------------------------
+#
+# Keeps one warm Extractor per backend (packs, patterns, langid model and
+# the result TypeAdapter built once) and serves notes over localhost HTTP
+# or HTTP on a Unix socket:
+#
+#   POST /extract        {"text": "...", "backend": "rules"} -> result JSON
+#   POST /extract/batch  {"texts": [...], "backend": ...}    -> {"results": [...]}
+#   GET  /healthz        liveness + load
+#   GET  /metrics        Prometheus text (server + extraction stages)
+#
+# workers=0 extracts in the request threads; workers>0 sends chunks to a
+# process pool whose workers hold their own warm extractors and send back
+# serialized lines plus ExtractionMetrics, so all metrics are aggregated
+# here. Admission is bounded: at most `max_pending` notes in flight, more
+# is answered 503 (Retry-After) instead of queueing without limit.
+# Results are serialized like `dundieplz extract` output lines; a note
+# that fails becomes an ExtractionFailure entry, not a failed batch.
+# A worker that dies (OOM kill, segfault) breaks the whole pool: the
+# requests that were using it get 503, the pool is replaced, and
+# /healthz answers 503 "degraded" until the new workers are warm.
+
+
+class ServiceUnavailable(RuntimeError):
+    pass
+
+
+class ServiceOverloaded(ServiceUnavailable):
+    pass
+
+
+class RequestTooLarge(ValueError):
+    pass
+
+
+class _Collector:
+    """
+    Instrumentation sink of a worker process: holds the metrics of the
+    current chunk until they are returned to the server.
+    """
+
+    def __init__(self) -> None:
+        self.items: List[ExtractionMetrics] = []
+
+    def __call__(self, metrics: ExtractionMetrics) -> None:
+        self.items.append(metrics)
+
+
+def _warm(backend: str, instrumentation: Instrumentation, serializer: ResultSerializer) -> Extractor:
+    extractor = make_extractor(Backend(backend))
+    serializer.dumps(extractor.extract_record("warm-up"))
+    extractor.instrumentation = instrumentation
+    return extractor
+
+
+def _extract_lines(
+    extractor: Extractor,
+    serializer: ResultSerializer,
+    texts: Sequence[str],
+    offset: int = 0,
+) -> List[bytes]:
+    out = []
+    for index, text in enumerate(texts, offset):
+        try:
+            result: Any = extractor.extract_record(text)
+        except Exception as exc:
+            result = ExtractionFailure(index=index, error_type=type(exc).__name__, message=str(exc))
+        out.append(serializer.dumps(result))
+    return out
+
+
+# ------------------------------
+# Worker processes
+# ------------------------------
+
+_worker_state: Optional[Tuple[Dict[str, Extractor], ResultSerializer, _Collector]] = None
+
+
+def _init_worker(backends: Sequence[str], compact: bool) -> None:
+    global _worker_state
+    serializer = ResultSerializer(compact=compact)
+    collector = _Collector()
+    instrumentation = Instrumentation(sinks=[collector])
+    extractors = {name: _warm(name, instrumentation, serializer) for name in backends}
+    _worker_state = (extractors, serializer, collector)
+
+
+def _extract_in_worker(
+    backend: str,
+    texts: Sequence[str],
+    offset: int = 0,
+) -> Tuple[List[bytes], List[ExtractionMetrics]]:
+    extractors, serializer, collector = _worker_state
+    collector.items = []
+    lines = _extract_lines(extractors[backend], serializer, texts, offset)
+    return lines, collector.items
+
+
+# ------------------------------
+# Service
+# ------------------------------
+
+class ExtractionService:
+    """
+    Warm extractors + bounded admission + metrics, independent of the
+    transport (the HTTP handler below is one client of it).
+
+    - backends: names of cli.Backend to keep warm; the first is the default
+    - workers: process pool size (0 = extract in the calling thread)
+    - max_pending: notes admitted at once across all requests
+    - max_batch: notes per request
+    - chunksize: notes per worker task for batches
+    - timeout: seconds a request may wait for its results (None = no
+      limit); needs workers > 0, a request thread cannot be interrupted.
+      Notes of a timed-out request still running in a worker keep their
+      admission slots until they finish
+    """
+
+    def __init__(
+        self,
+        backends: Sequence[str] = ("rules",),
+        workers: int = 0,
+        max_pending: int = 256,
+        max_batch: int = 1000,
+        chunksize: int = 16,
+        timeout: Optional[float] = None,
+        compact: bool = False,
+    ) -> None:
+        if not backends:
+            raise ValueError("at least one backend is required")
+        if timeout is not None and workers <= 0:
+            raise ValueError("timeout needs workers > 0")
+        self.backends = [Backend(name).value for name in backends]
+        self.workers = max(0, workers)
+        self.max_pending = max(1, max_pending)
+        self.max_batch = max(1, max_batch)
+        self.chunksize = max(1, chunksize)
+        self.timeout = timeout
+        self.compact = compact
+
+        self.stages = PrometheusTextfileSink(None)
+        self._serializer = ResultSerializer(compact=compact)
+        self._extractors: Dict[str, Extractor] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_ready = False
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._started = time.monotonic()
+        self._requests: Dict[Tuple[str, int], int] = {}
+        self._request_seconds: Dict[str, float] = {}
+        self._documents: Dict[str, int] = {}
+        self._rejected = 0
+
+    def start(self) -> "ExtractionService":
+        """
+        Builds and warms the extractors (or the worker pool); returns self.
+        """
+        if self.workers:
+            self._pool = self._new_pool()
+            # start and warm the workers before the first request arrives
+            for future in self._warm_pool(self._pool):
+                future.result()
+            self._pool_ready = True
+        else:
+            instrumentation = Instrumentation(sinks=[self.stages])
+            self._extractors = {name: _warm(name, instrumentation, self._serializer) for name in self.backends}
+        self._started = time.monotonic()
+        return self
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.backends, self.compact),
+        )
+
+    def _warm_pool(self, pool: ProcessPoolExecutor) -> List[Future]:
+        # One empty task per worker; the pool counts as ready once all of
+        # them came back.
+        futures = [pool.submit(_extract_in_worker, self.backends[0], []) for _ in range(self.workers)]
+        pending = [len(futures)]
+
+        def done(future: Future) -> None:
+            if future.cancelled() or future.exception() is not None:
+                return
+            with self._lock:
+                pending[0] -= 1
+                if not pending[0] and self._pool is pool:
+                    self._pool_ready = True
+
+        for future in futures:
+            future.add_done_callback(done)
+        return futures
+
+    def _restart_pool(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._pool is not broken:  # closed, or already replaced by another request
+                return
+            self._pool = self._new_pool()
+            self._pool_ready = False
+            pool = self._pool
+        logger.warning("worker pool broken, restarting %d workers", self.workers)
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._warm_pool(pool)
+
+    def __enter__(self) -> "ExtractionService":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------
+    # Admission
+    # ------------------------------
+
+    @contextmanager
+    def admit(self, count: int) -> Iterator[None]:
+        """
+        Reserves `count` in-flight notes or raises ServiceOverloaded.
+        """
+        with self._lock:
+            if self._in_flight + count > self.max_pending:
+                self._rejected += 1
+                raise ServiceOverloaded(f"{self._in_flight} notes in flight (max_pending={self.max_pending})")
+            self._in_flight += count
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= count
+
+    def _hold(self, future: Future, count: int) -> None:
+        # Keeps `count` slots past the request that admitted them, until
+        # `future` is done.
+        def release(_: Future) -> None:
+            with self._lock:
+                self._in_flight -= count
+
+        with self._lock:
+            self._in_flight += count
+        future.add_done_callback(release)
+
+    # ------------------------------
+    # Extraction
+    # ------------------------------
+
+    def extract(self, texts: Sequence[str], backend: Optional[str] = None) -> List[bytes]:
+        """
+        One serialized result (or ExtractionFailure) per note, in order.
+        ValueError for a bad request (RequestTooLarge over max_batch),
+        ServiceUnavailable when full (ServiceOverloaded) or when a worker
+        died during the request.
+        """
+        backend = backend or self.backends[0]
+        if backend not in self.backends:
+            raise ValueError(f"backend {backend!r} is not served (have {self.backends})")
+        if len(texts) > self.max_batch:
+            raise RequestTooLarge(f"batch of {len(texts)} notes exceeds max_batch={self.max_batch}")
+
+        with self.admit(len(texts)):
+            if self._pool is None:
+                lines = _extract_lines(self._extractors[backend], self._serializer, texts)
+            else:
+                lines = self._extract_pooled(texts, backend)
+        with self._lock:
+            self._documents[backend] = self._documents.get(backend, 0) + len(texts)
+        return lines
+
+    def _extract_pooled(self, texts: Sequence[str], backend: str) -> List[bytes]:
+        pool = self._pool
+        futures: List[Future] = []
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        lines: List[bytes] = []
+        try:
+            for i in range(0, len(texts), self.chunksize):
+                futures.append(pool.submit(_extract_in_worker, backend, texts[i : i + self.chunksize], i))
+            for future in futures:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                chunk, metrics = future.result(timeout=remaining)
+                for metric in metrics:
+                    self.stages(metric)
+                lines.extend(chunk)
+        except FutureTimeout:
+            for index, future in enumerate(futures):
+                if not future.cancel() and not future.done():
+                    self._hold(future, len(texts[index * self.chunksize : (index + 1) * self.chunksize]))
+            raise
+        except BrokenProcessPool as exc:
+            for future in futures:
+                future.cancel()
+            self._restart_pool(pool)
+            raise ServiceUnavailable("a worker process died; the pool is restarting") from exc
+        return lines
+
+    # ------------------------------
+    # Health / metrics
+    # ------------------------------
+
+    def record_request(self, endpoint: str, status: int, seconds: float) -> None:
+        with self._lock:
+            self._requests[(endpoint, status)] = self._requests.get((endpoint, status), 0) + 1
+            self._request_seconds[endpoint] = self._request_seconds.get(endpoint, 0.0) + seconds
+
+    def health(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = self._in_flight
+            degraded = self.workers > 0 and not self._pool_ready
+        return {
+            "status": "degraded" if degraded else "ok",
+            "backends": self.backends,
+            "workers": self.workers,
+            "in_flight": in_flight,
+            "max_pending": self.max_pending,
+            "uptime_seconds": round(time.monotonic() - self._started, 3),
+            "pid": os.getpid(),
+        }
+
+    def metrics(self) -> str:
+        p = "dundieplz_server"
+        with self._lock:
+            lines = [
+                f"# HELP {p}_requests_total HTTP requests by endpoint and status.",
+                f"# TYPE {p}_requests_total counter",
+            ]
+            lines += [
+                f'{p}_requests_total{{endpoint="{endpoint}",code="{status}"}} {value}'
+                for (endpoint, status), value in sorted(self._requests.items())
+            ]
+            lines += [f"# TYPE {p}_request_seconds_total counter"]
+            lines += [
+                f'{p}_request_seconds_total{{endpoint="{endpoint}"}} {seconds:.9f}'
+                for endpoint, seconds in sorted(self._request_seconds.items())
+            ]
+            lines += [f"# TYPE {p}_documents_total counter"]
+            lines += [f'{p}_documents_total{{backend="{name}"}} {value}' for name, value in sorted(self._documents.items())]
+            lines += [
+                f"# TYPE {p}_rejected_total counter",
+                f"{p}_rejected_total {self._rejected}",
+                f"# TYPE {p}_in_flight gauge",
+                f"{p}_in_flight {self._in_flight}",
+                f"# TYPE {p}_max_pending gauge",
+                f"{p}_max_pending {self.max_pending}",
+                f"# TYPE {p}_uptime_seconds gauge",
+                f"{p}_uptime_seconds {time.monotonic() - self._started:.3f}",
+            ]
+        return "\n".join(lines) + "\n" + self.stages.render()
+
+
+# ------------------------------
+# HTTP transport
+# ------------------------------
+
+# A request rejected before (or while) its body was read may leave body
+# bytes in the stream; the connection is closed rather than parsing them
+# as the next request. send_header() sets close_connection for this header.
+_CLOSE = {"Connection": "close"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive: no connection setup per note
+    server_version = "dundieplz"
+    max_body = 64 * 1024 * 1024
+
+    @property
+    def service(self) -> ExtractionService:
+        return self.server.service
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s %s", self.address_string(), format % args)
+
+    def do_GET(self) -> None:
+        start = time.perf_counter()
+        path = self.path.split("?", 1)[0]
+        if path == "/healthz":
+            health = self.service.health()
+            status = self._send(200 if health["status"] == "ok" else 503, json.dumps(health).encode("utf-8"))
+        elif path == "/metrics":
+            status = self._send(200, self.service.metrics().encode("utf-8"), "text/plain; version=0.0.4")
+        else:
+            status = self._error(404, f"no such endpoint: {path}")
+        self.service.record_request(path if status != 404 else "other", status, time.perf_counter() - start)
+
+    def do_POST(self) -> None:
+        start = time.perf_counter()
+        path = self.path.split("?", 1)[0]
+        if path not in ("/extract", "/extract/batch"):
+            status = self._error(404, f"no such endpoint: {path}", _CLOSE)
+            self.service.record_request("other", status, time.perf_counter() - start)
+            return
+        try:
+            body = self._read_json()
+            batch = path == "/extract/batch"
+            texts = body.get("texts") if batch else [body.get("text")]
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise ValueError('expected {"texts": [str, ...]}' if batch else 'expected {"text": str}')
+            lines = self.service.extract(texts, body.get("backend"))
+        except ServiceUnavailable as exc:
+            status = self._error(503, str(exc), {"Retry-After": "1"})
+        except FutureTimeout:
+            status = self._error(504, "extraction timed out")
+        except RequestTooLarge as exc:
+            status = self._error(413, str(exc), _CLOSE)
+        except ValueError as exc:  # includes malformed JSON
+            status = self._error(400, str(exc), _CLOSE)
+        except Exception as exc:
+            logger.exception("request failed")
+            status = self._error(500, f"{type(exc).__name__}: {exc}")
+        else:
+            payload = b'{"results":[' + b",".join(lines) + b"]}" if batch else lines[0]
+            status = self._send(200, payload)
+        self.service.record_request(path, status, time.perf_counter() - start)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length < 0:
+            raise ValueError(f"invalid Content-Length: {length}")
+        if length > self.max_body:
+            raise RequestTooLarge(f"body of {length} bytes exceeds {self.max_body}")
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not isinstance(body, dict):
+            raise ValueError("expected a JSON object")
+        return body
+
+    def _send(
+        self,
+        status: int,
+        payload: bytes,
+        content_type: str = "application/json",
+        headers: Optional[Dict[str, str]] = None,
+    ) -> int:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        return status
+
+    def _error(self, status: int, message: str, headers: Optional[Dict[str, str]] = None) -> int:
+        return self._send(status, json.dumps({"error": message}).encode("utf-8"), headers=headers)
+
+
+class _TCPHandler(_Handler):
+    # headers and body go out as two writes; without TCP_NODELAY the
+    # second one waits for the client's delayed ACK (~40 ms per request)
+    disable_nagle_algorithm = True
+
+
+class _TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: ExtractionService) -> None:
+        self.service = service
+        super().__init__(address, _TCPHandler)
+
+
+class _UnixServer(socketserver.ThreadingMixIn, getattr(socketserver, "UnixStreamServer", socketserver.TCPServer)):
+    daemon_threads = True
+
+    def __init__(self, path: str, service: ExtractionService) -> None:
+        self.service = service
+        super().__init__(path, _Handler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        Path(self.server_address).unlink(missing_ok=True)
+
+
+def make_server(
+    service: ExtractionService,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    unix_socket: Optional[Union[str, Path]] = None,
+) -> socketserver.BaseServer:
+    """
+    An HTTP server bound to host:port, or to `unix_socket` when given
+    (a stale socket file is replaced). Call serve_forever() to run it.
+    """
+    if unix_socket is not None:
+        if not hasattr(socketserver, "UnixStreamServer"):
+            raise ValueError("Unix sockets are not available on this platform")
+        path = Path(unix_socket)
+        path.unlink(missing_ok=True)
+        return _UnixServer(str(path), service)
+    return _TCPServer((host, port), service)
+
+
+def serve(
+    service: ExtractionService,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    unix_socket: Optional[Union[str, Path]] = None,
+) -> None:
+    """
+    Starts `service` and serves until SIGINT/SIGTERM.
+    """
+    with service:
+        server = make_server(service, host, port, unix_socket)
+
+        def stop(signum: int, frame: Any) -> None:
+            # shutdown() waits for serve_forever(), so not from its thread
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        main_thread = threading.current_thread() is threading.main_thread()
+        previous = signal.signal(signal.SIGTERM, stop) if main_thread else None
+        logger.info("serving %s on %s", ",".join(service.backends), server.server_address)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if main_thread:
+                signal.signal(signal.SIGTERM, previous)
+            server.server_close()
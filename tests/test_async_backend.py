@@ -0,0 +1,139 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from dundieplz.extract.async_backend import HTTPLLMClient, ResilientLLMClient
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.llm_client import DummyLLMClient, LLMBackendError
+from dundieplz.schemas.extractor_schema import ExtractionFailure, ExtractionResult
+
+
+class StubBackend(ThreadingHTTPServer):
+    """
+    Local stand-in for an LLM endpoint: answers like DummyLLMClient after
+    `latency` seconds; the first `fail_first` requests per prompt get `fail_status`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, fail_first=0, fail_status=503):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.latency = latency
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.requests = Counter()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/generate"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        prompt = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["prompt"]
+        with self.server.lock:
+            self.server.requests[prompt] += 1
+            seen = self.server.requests[prompt]
+        time.sleep(self.server.latency)
+
+        if seen <= self.server.fail_first:
+            self.send_response(self.server.fail_status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = json.dumps(DummyLLMClient().generate_json(prompt)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(**kwargs):
+        server = StubBackend(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _resilient(server, **kwargs):
+    kwargs.setdefault("backoff_base", 0.01)
+    return ResilientLLMClient(HTTPLLMClient(server.url, timeout=5), rng=random.Random(0), **kwargs)
+
+
+def test_aextract_many_runs_calls_concurrently(stub):
+    server = stub(latency=0.1)
+    extractor = Extractor(llm_client=_resilient(server, max_concurrency=20))
+    texts = [f"note {i}: I want to die" for i in range(20)]
+
+    started = time.perf_counter()
+    results = asyncio.run(extractor.aextract_many(texts, concurrency=20))
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.5  # 20 x 0.1 s = 2 s serially
+    assert [r.text for r in results] == texts
+    assert all(r.signals.suicidal_ideation.presence.value == "present" for r in results)
+
+
+def test_retries_transient_errors(stub):
+    server = stub(fail_first=2, fail_status=429)
+    client = _resilient(server, max_retries=3)
+    result = asyncio.run(Extractor(llm_client=client).aextract("I want to die"))
+
+    assert isinstance(result, ExtractionResult)
+    assert server.requests["I want to die"] == 3
+    assert client.retries == 2
+
+
+def test_client_errors_are_not_retried(stub):
+    server = stub(fail_first=5, fail_status=400)
+    client = _resilient(server, max_retries=3)
+    with pytest.raises(LLMBackendError) as info:
+        asyncio.run(client.agenerate_json("x"))
+    assert info.value.status_code == 400
+    assert server.requests["x"] == 1
+
+
+def test_identical_inflight_prompts_are_coalesced(stub):
+    server = stub(latency=0.1)
+    client = _resilient(server)
+    results = asyncio.run(Extractor(llm_client=client).aextract_many(["same note"] * 5))
+
+    assert len(results) == 5
+    assert server.requests["same note"] == 1
+    assert client.coalesced == 4
+
+
+def test_timeouts_become_failure_entries(stub):
+    server = stub(latency=0.5)
+    client = _resilient(server, timeout=0.05, max_retries=0)
+    results = asyncio.run(Extractor(llm_client=client).aextract_many(["slow", "slower"]))
+
+    assert [type(r) for r in results] == [ExtractionFailure, ExtractionFailure]
+    assert results[1].index == 1
+    assert results[0].error_type == "TimeoutError"
+
+
+def test_aextract_falls_back_to_sync_backends():
+    result = asyncio.run(Extractor(llm_client=DummyLLMClient()).aextract("I want to die"))
+    assert result.meta.llm_backend == "dummy"
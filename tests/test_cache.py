@@ -0,0 +1,92 @@
+import json
+import shutil
+
+from dundieplz.extract import llm_client, packs
+from dundieplz.extract.cache import ExtractionCache
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.llm_client import DummyLLMClient
+from dundieplz.extract.rule_llm_client import RuleLLMClient
+from dundieplz.schemas.extractor_schema import ExtractorMeta
+
+
+class CountingClient(RuleLLMClient):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def generate_json(self, prompt):
+        self.calls += 1
+        return super().generate_json(prompt)
+
+
+def test_memory_tier_hits_and_returns_fresh_copies():
+    client = CountingClient()
+    extractor = Extractor(llm_client=client, cache=ExtractionCache())
+
+    first = extractor.extract("I want to die")
+    second = extractor.extract("I want to die")
+
+    assert client.calls == 1
+    assert second == first and second is not first
+    assert extractor.cache.stats.as_dict() == {
+        "hits": 1, "misses": 1, "evictions": 0, "disk_hits": 0, "disk_writes": 0,
+    }
+
+
+def test_lru_evicts_by_entries_and_bytes():
+    cache = ExtractionCache(max_entries=2)
+    extractor = Extractor(llm_client=DummyLLMClient(), cache=cache)
+    for text in ("a", "b", "a", "c"):
+        extractor.extract(text)
+    assert len(cache) == 2 and cache.stats.evictions == 1
+    extractor.extract("a")
+    assert cache.stats.hits == 2  # "a" survived, "b" was least recently used
+
+    small = ExtractionCache(max_bytes=1)
+    Extractor(llm_client=DummyLLMClient(), cache=small).extract("x")
+    assert len(small) == 0 and small.stats.evictions == 1
+
+
+def test_disk_tier_persists_across_instances(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    Extractor(llm_client=RuleLLMClient(), cache=ExtractionCache(path=path)).extract("Denies SI")
+
+    client = CountingClient()
+    cache = ExtractionCache(path=path)
+    result = Extractor(llm_client=client, cache=cache).extract("Denies SI")
+
+    assert client.calls == 0
+    assert cache.stats.disk_hits == 1
+    assert result.signals.intent.presence.value == "absent"
+
+
+def test_versions_and_patterns_invalidate_keys(monkeypatch, tmp_path):
+    extractor = Extractor(llm_client=RuleLLMClient())
+    key = extractor.cache_key("note")
+
+    assert Extractor(llm_client=DummyLLMClient()).cache_key("note") != key
+
+    monkeypatch.setattr(ExtractorMeta.model_fields["extractor_version"], "default", "9.9")
+    assert extractor.cache_key("note") != key
+    monkeypatch.undo()
+
+    # Editing a cue pack changes the key
+    pack_dir = tmp_path / "packs"
+    shutil.copytree(packs.PACK_DIR, pack_dir)
+    en = json.loads((pack_dir / "en.json").read_text(encoding="utf-8"))
+    en["cues"]["subjective"].append("new cue")
+    (pack_dir / "en.json").write_text(json.dumps(en), encoding="utf-8")
+    monkeypatch.setattr(packs, "PACK_DIR", pack_dir)
+    packs.reload_packs()
+    try:
+        assert "new cue" in llm_client.SUBJECTIVE_CUES
+        assert extractor.cache_key("note") != key
+    finally:
+        monkeypatch.undo()
+        packs.reload_packs()
+    assert extractor.cache_key("note") == key
+
+    # Backend pattern lists are fingerprinted when the client is built
+    assert RuleLLMClient().pattern_version == extractor.llm_client.pattern_version
+    extractor.llm_client.pattern_version = "edited"
+    assert extractor.cache_key("note") != key
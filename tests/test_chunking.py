@@ -0,0 +1,224 @@
+import asyncio
+import random
+import threading
+
+import pytest
+
+from dundieplz.extract import chunking
+from dundieplz.extract.chunking import ChunkingConfig, merge_window_signals, plan_windows
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.preprocess import prepare
+from dundieplz.extract.records import SignalRecord, SignalsRecord, SpanRecord
+from dundieplz.extract.rule_llm_client import RuleLLMClient
+from dundieplz.schemas.extractor_schema import Presence, Temporal
+
+FILLER = "Patient is calm and cooperative during the interview. "
+
+
+class RecordingClient(RuleLLMClient):
+    def __init__(self):
+        super().__init__()
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def _record(self, prompt):
+        with self.lock:
+            self.prompts.append(prompt)
+
+    def generate_json(self, prompt):
+        self._record(prompt)
+        return super().generate_json(prompt)
+
+    def scan_window(self, text):
+        self._record(text)
+        return super().scan_window(text)
+
+
+class AsyncRecordingClient(RecordingClient):
+    async def agenerate_json(self, prompt):
+        await asyncio.sleep(0)
+        return self.generate_json(prompt)
+
+
+def _long_note():
+    return FILLER * 40 + "Suicide attempt by overdose today. " + FILLER * 40 + "Denies SI now. " + FILLER * 10
+
+
+def test_windows_cover_the_note_with_overlap():
+    rng = random.Random(15)
+    words = ["calm", "Plan:", "now.", "denies SI.", "\n", "x" * 30]
+    for _ in range(200):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(0, 400)))
+        window = rng.randint(40, 400)
+        overlap = rng.randint(0, window // 2 - 1)
+        windows = plan_windows(prepare(text), window, overlap)
+        assert windows[0][0] == 0 and windows[-1][1] == len(text)
+        assert all(0 < end - start <= window for start, end in windows if text)
+        for (s1, e1), (s2, e2) in zip(windows, windows[1:]):
+            assert s1 < s2 and e1 - s2 >= overlap
+
+
+def test_chunked_extraction_maps_evidence_back():
+    text = _long_note()
+    client = RecordingClient()
+    config = ChunkingConfig(window=1000, overlap=100, workers=3)
+    result = Extractor(llm_client=client, chunking=config).extract(text)
+
+    assert len(client.prompts) > 3
+    assert max(len(p) for p in client.prompts) <= config.window
+
+    whole = Extractor(llm_client=RuleLLMClient()).extract(text)
+    # present beats the windows that only saw "denies SI"
+    assert result.signals.past_behavior.presence == Presence.present
+    assert result.signals.intent.presence == Presence.present
+    assert result.signals.temporal == Temporal.current
+    for evidence in result.signals.past_behavior.evidence:
+        assert text[evidence.start : evidence.end] == evidence.text
+    assert [e.model_dump() for e in result.signals.past_behavior.evidence] == [
+        e.model_dump() for e in whole.signals.past_behavior.evidence
+    ]
+
+
+def test_overlap_spans_are_deduped():
+    # "Suicide attempt" lands in the overlap of the first two windows
+    text = FILLER * 5 + "Suicide attempt today. " + FILLER * 10
+    config = ChunkingConfig(window=400, overlap=150, workers=1)
+    windows = plan_windows(prepare(text), config.window, config.overlap)
+    start = text.index("Suicide attempt")
+    assert sum(s <= start and start + 15 <= e for s, e in windows) == 2
+
+    result = Extractor(llm_client=RuleLLMClient(), chunking=config).extract(text)
+    spans = [(e.start, e.end) for e in result.signals.past_behavior.evidence]
+    assert spans == sorted(set(spans))
+    assert (start, start + len("Suicide attempt")) in spans
+
+
+def test_presence_precedence():
+    def part(presence, start, name="intent", evidence=True):
+        signals = SignalsRecord(temporal=Temporal.past if start else Temporal.unknown)
+        setattr(signals, name, SignalRecord(presence, [SpanRecord("x", start, start + 1)] if evidence else []))
+        signals.uncertainty_cues = [f"cue{start}"]
+        signals.missing_information = [f"missing{start}"]
+        return signals
+
+    merged = merge_window_signals(
+        [part(Presence.indeterminate, 0, evidence=False), part(Presence.absent, 5), part(Presence.absent, 9)]
+    )
+    assert merged.intent.presence == Presence.absent
+    assert [(e.start, e.end) for e in merged.intent.evidence] == [(5, 6), (9, 10)]
+    assert merged.temporal == Temporal.past
+
+    merged = merge_window_signals([part(Presence.absent, 5), part(Presence.present, 7)])
+    assert merged.intent.presence == Presence.present
+    assert [(e.start, e.end) for e in merged.intent.evidence] == [(7, 8)]
+
+    # a window that saw both sides beats "present" elsewhere
+    merged = merge_window_signals([part(Presence.present, 3), part(Presence.indeterminate, 7)])
+    assert merged.intent.presence == Presence.indeterminate
+    assert [(e.start, e.end) for e in merged.intent.evidence] == [(7, 8)]
+
+    # cues follow the ideation decision, missing information ideation + plan,
+    # whatever the windows reported for other signals
+    merged = merge_window_signals([
+        part(Presence.indeterminate, 0, "suicidal_ideation", evidence=False),
+        part(Presence.indeterminate, 4, "suicidal_ideation"),
+        part(Presence.present, 6, "suicidal_ideation"),
+        part(Presence.present, 8, "plan"),
+    ])
+    assert merged.suicidal_ideation.presence == Presence.indeterminate
+    assert merged.uncertainty_cues == ["cue4"] and merged.missing_information == []
+    merged = merge_window_signals([
+        part(Presence.indeterminate, 0, "suicidal_ideation", evidence=False),
+        part(Presence.present, 6, "suicidal_ideation"),
+        part(Presence.absent, 9, "intent"),
+    ])
+    assert merged.uncertainty_cues == ["cue6"] and merged.missing_information == ["missing6"]
+
+
+def test_chunked_matches_full_note_across_section_headers():
+    notes = [
+        "Chief complaint: I want to die.\nFamily history:\n" + FILLER * 40 + "Mother had a suicide attempt.",
+        "Family history:\n" + FILLER * 30 + "Brother attempted suicide.\nHistory:\n" + FILLER * 30
+        + "Suicide attempt by overdose today.",
+        "HPI: " + FILLER * 30 + "Suicide attempt by overdose.\nPlan:\n" + FILLER * 30 + "Return today for review.",
+        "Chief complaint: I want to die.\nHistory:\n" + FILLER * 40 + "Suicide attempt by overdose last week.",
+        "Chief complaint: anxiety.\nFamily history:\n" + FILLER * 40 + "Father died by suicide.",
+        # a long one-line entry, and a header block closed by a blank line
+        "FH: " + FILLER * 40 + "Mother attempted suicide.\nPatient says I want to die.",
+        "Family history:\n" + FILLER * 20 + "Father died by suicide.\n\n" + FILLER * 20 + "Suicide attempt today.",
+    ]
+    config = ChunkingConfig(window=1000, overlap=200, workers=2)
+    chunked = Extractor(llm_client=RuleLLMClient(), chunking=config)
+    whole = Extractor(llm_client=RuleLLMClient())
+    for note in notes:
+        assert len(plan_windows(prepare(note), config.window, config.overlap)) > 1
+        assert chunked.extract(note).signals == whole.extract(note).signals, note[:40]
+
+
+def test_chunked_matches_full_note_when_denial_and_ideation_are_apart():
+    notes = [
+        "Patient denies SI. Maybe passive thoughts. " + FILLER * 40 + "Suicide attempt by overdose last year.",
+        "Patient denies SI. " + FILLER * 40 + "He says I want to die.",
+        "He says I want to die. " + FILLER * 40 + "Patient denies SI. " + FILLER * 40 + "Denies plan.",
+        "Patient denies SI. " + FILLER * 40 + "Suicide attempt by overdose today.",
+    ]
+    config = ChunkingConfig(window=1000, overlap=200)
+    whole = Extractor(llm_client=RuleLLMClient())
+    for note in notes:
+        expected = whole.extract(note).signals
+        assert len(plan_windows(prepare(note), config.window, config.overlap)) > 1
+        assert Extractor(llm_client=RuleLLMClient(), chunking=config).extract(note).signals == expected, note[:40]
+        got = asyncio.run(Extractor(llm_client=AsyncRecordingClient(), chunking=config).aextract(note))
+        assert got.signals == expected
+    assert whole.extract(notes[0]).signals.uncertainty_cues == ["explicit_denial_with_ideation_language"]
+
+
+def test_async_chunked_slices_windows_only_when_a_worker_is_free(monkeypatch):
+    live, peak = [0], [0]
+    window_texts = chunking._window_texts
+
+    def counted(doc, windows):
+        for window in window_texts(doc, windows):
+            live[0] += 1
+            peak[0] = max(peak[0], live[0])
+            yield window
+
+    class Client(RecordingClient):
+        async def agenerate_json(self, prompt):
+            await asyncio.sleep(0)
+            out = self.generate_json(prompt)
+            live[0] -= 1
+            return out
+
+        scan_window = None  # exercise the per-window merge
+
+    monkeypatch.setattr(chunking, "_window_texts", counted)
+    text = FILLER * 200
+    config = ChunkingConfig(window=1000, overlap=100, workers=3)
+    asyncio.run(Extractor(llm_client=Client(), chunking=config).aextract(text))
+    assert len(plan_windows(prepare(text), config.window, config.overlap)) > 6
+    assert peak[0] <= config.workers
+
+
+def test_async_chunked_extraction_and_cache_key():
+    text = _long_note()
+    config = ChunkingConfig(window=1000, overlap=100, workers=2)
+    sync_result = Extractor(llm_client=RuleLLMClient(), chunking=config).extract(text)
+    client = AsyncRecordingClient()
+    async_result = asyncio.run(Extractor(llm_client=client, chunking=config).aextract(text))
+    assert max(len(p) for p in client.prompts) <= config.window
+    assert async_result.signals == sync_result.signals
+
+    # short notes skip chunking, and chunked results are cached separately
+    chunked = Extractor(llm_client=RuleLLMClient(), chunking=config)
+    assert chunked.cache_key(text) != Extractor(llm_client=RuleLLMClient()).cache_key(text)
+    client = RecordingClient()
+    Extractor(llm_client=client, chunking=config).extract("I want to die.")
+    assert client.prompts == ["I want to die."]
+
+
+def test_config_validation():
+    with pytest.raises(ValueError):
+        ChunkingConfig(window=100, overlap=50)
+    with pytest.raises(ValueError):
+        ChunkingConfig(workers=0)
@@ -0,0 +1,59 @@
+import json
+
+from typer.testing import CliRunner
+
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.llm_client import DummyLLMClient
+from dundieplz.ui.cli import app
+
+
+def test_extract_streams_jsonl_in_order(tmp_path):
+    src = tmp_path / "in.jsonl"
+    dst = tmp_path / "out.jsonl"
+    src.write_text(
+        "\n".join(
+            [
+                json.dumps({"case_id": "a", "text": "I want to die."}),
+                "",
+                "not json",
+                json.dumps({"case_id": "b", "note": "wrong field"}),
+                json.dumps({"case_id": "c", "text": "Denies suicidal ideation."}),
+            ]
+        ),
+        encoding="utf-8",
+    )
+
+    result = CliRunner().invoke(app, ["extract", "-i", str(src), "-o", str(dst), "-b", "rules"])
+    assert result.exit_code == 0, result.output
+
+    rows = [json.loads(line) for line in dst.read_text(encoding="utf-8").splitlines()]
+    assert len(rows) == 4
+    assert rows[0]["text"] == "I want to die."
+    assert rows[0]["meta"]["llm_backend"] == "rules"
+    assert rows[1]["index"] == 1 and rows[1]["error_type"] == "JSONDecodeError"
+    assert rows[2]["index"] == 2 and rows[2]["error_type"] == "ValueError"
+    assert rows[3]["signals"]["intent"]["presence"] == "absent"
+
+
+def test_iter_extract_reads_input_lazily():
+    consumed = []
+
+    def texts():
+        for i in range(1000):
+            consumed.append(i)
+            yield f"note {i}"
+
+    results = Extractor(llm_client=DummyLLMClient()).iter_extract(texts(), workers=1, chunksize=10)
+    first = next(results)
+    assert first.text == "note 0"
+    assert len(consumed) == 10
+
+
+def test_extract_compact_to_stdout():
+    result = CliRunner().invoke(app, ["extract", "--compact"], input=json.dumps({"text": "nothing here"}) + "\n")
+    assert result.exit_code == 0, result.output
+    row = json.loads(result.output)
+    assert row["text"] == "nothing here"
+    assert "cue_hits" not in row
+    assert set(row["meta"]) == {"llm_backend", "language", "language_confidence", "cue_packs", "created_at"}
+    assert row["meta"]["language"] == "en"
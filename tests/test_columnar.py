@@ -0,0 +1,123 @@
+import random
+
+import pytest
+
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.llm_client import DummyLLMClient
+from dundieplz.extract.rule_llm_client import RuleLLMClient
+from dundieplz.store.columnar import ColumnarTable, export_results, open_columnar
+
+PHRASES = [
+    "I want to die", "denies SI", "Suicide attempt by overdose", "firearm", "I gave my dog away",
+    "now", "three months ago", "I am a burden", "Paciente nega ideação suicida", "calm",
+]
+
+
+def _results(seed, count):
+    rng = random.Random(seed)
+    extractors = [Extractor(llm_client=RuleLLMClient()), Extractor(llm_client=DummyLLMClient())]
+    texts = [". ".join(rng.choice(PHRASES) for _ in range(rng.randint(0, 8))) for _ in range(count)]
+    return [rng.choice(extractors).extract(t) for t in texts]
+
+
+def test_packed_roundtrip(tmp_path):
+    results = _results(22, 200)
+    paths = export_results(iter(results), tmp_path / "export", format="packed")
+    assert paths["results"].suffix == ".dpz"
+
+    table, evidence = open_columnar(tmp_path / "export")
+    with table, evidence:
+        assert table.num_rows == len(results)
+        for name in ("suicidal_ideation", "intent", "past_behavior"):
+            column = table.column(name)
+            assert column.to_list() == [getattr(r.signals, name).presence.value for r in results]
+        assert table.column("temporal").to_list() == [r.signals.temporal.value for r in results]
+        assert table.column("language").to_list() == [r.meta.language for r in results]
+        assert list(table.column("language_confidence")) == [r.meta.language_confidence for r in results]
+        assert table.column("text")[7] == results[7].text and table.column("text")[-1] == results[-1].text
+
+        # codes are a zero-copy view; counts never decode row by row
+        intent = table.column("intent")
+        assert isinstance(intent.values, memoryview)
+        expected = {}
+        for r in results:
+            expected[r.signals.intent.presence.value] = expected.get(r.signals.intent.presence.value, 0) + 1
+        assert intent.counts() == expected
+
+        spans = list(
+            zip(
+                evidence.column("row"),
+                evidence.column("field"),
+                evidence.column("source"),
+                evidence.column("cue"),
+                evidence.column("start"),
+                evidence.column("end"),
+            )
+        )
+    expected_spans = []
+    for row, r in enumerate(results):
+        for name in ("suicidal_ideation", "self_harm", "intent", "plan", "past_behavior"):
+            for ev in getattr(r.signals, name).evidence:
+                expected_spans.append((row, name, ev.source.value, "", ev.start, ev.end))
+        for category in ("contextual", "subjective", "ambiguous"):
+            for hit in getattr(r.cue_hits, category):
+                for ev in hit.evidence:
+                    expected_spans.append((row, f"cue_hits.{category}", ev.source.value, hit.cue, ev.start, ev.end))
+    assert spans == expected_spans and spans
+
+
+def test_arrow_roundtrip_matches_packed(tmp_path):
+    pytest.importorskip("pyarrow")
+    results = _results(23, 200)
+    arrow = export_results(iter(results), tmp_path / "arrow", format="arrow")
+    packed = export_results(iter(results), tmp_path / "packed", format="packed")
+    assert arrow["results"].suffix == ".arrow" and arrow["evidence"].suffix == ".arrow"
+
+    for name in ("results", "evidence"):
+        with ColumnarTable(arrow[name]) as a, ColumnarTable(packed[name]) as b:
+            assert a.num_rows == b.num_rows and a.column_names == b.column_names
+            for column in a.column_names:
+                # dictionary codes, int/float values and large_string offsets
+                assert a.column(column).to_list() == b.column(column).to_list(), (name, column)
+                assert list(a.column(column).values) == list(b.column(column).values), (name, column)
+            if name == "results":
+                text = a.column("text")
+                assert [text[i] for i in range(len(text))] == [r.text for r in results]
+                assert a.column("intent").counts() == b.column("intent").counts()
+            else:
+                assert a.num_rows > 0
+
+    # the empty table, and no text column
+    paths = export_results([], tmp_path / "empty", format="arrow", include_text=False)
+    with ColumnarTable(paths["results"]) as table:
+        assert table.num_rows == 0 and "text" not in table.column_names
+        assert table.column("plan").to_list() == []
+
+
+def test_empty_export_and_errors(tmp_path):
+    paths = export_results([], tmp_path, format="packed", include_text=False)
+    with ColumnarTable(paths["results"]) as table:
+        assert table.num_rows == 0 and "text" not in table.column_names
+        assert table.column("plan").to_list() == []
+        with pytest.raises(KeyError):
+            table.column("text")
+    with pytest.raises(ValueError):
+        export_results([], tmp_path, format="csv")
+    (tmp_path / "bogus.dpz").write_bytes(b"DPZCOL1\nnot really")
+    with pytest.raises(ValueError):
+        ColumnarTable(tmp_path / "bogus.dpz")
+
+
+def test_cli_export(tmp_path):
+    from typer.testing import CliRunner
+
+    from dundieplz.ui.cli import app
+
+    results = _results(220, 5)
+    src = tmp_path / "results.jsonl"
+    src.write_text("".join(r.model_dump_json() + "\n" for r in results) + '{"index": 9, "error_type": "X"}\n')
+    run = CliRunner().invoke(app, ["export", "-i", str(src), "-o", str(tmp_path / "out"), "--format", "packed"])
+    assert run.exit_code == 0, run.output
+    table, evidence = open_columnar(tmp_path / "out")
+    with table, evidence:
+        assert table.column("plan").to_list() == [r.signals.plan.presence.value for r in results]
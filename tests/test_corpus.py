@@ -0,0 +1,99 @@
+import json
+import pickle
+import random
+
+import pytest
+from typer.testing import CliRunner
+
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.rule_llm_client import RuleLLMClient
+from dundieplz.store.corpus import CorpusLoader, CorpusStore
+from dundieplz.ui.cli import app
+
+
+def test_round_trip_views_and_spans(tmp_path):
+    rng = random.Random(23)
+    alphabet = "abc XYZ.\n" + "éß中😀"
+    texts = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 80))) for _ in range(200)]
+    texts += ["plain ascii note", ""]
+
+    with CorpusStore(tmp_path / "notes.txt", writable=True) as store:
+        assert store.extend(texts) == list(range(len(texts)))
+
+    store = CorpusStore(tmp_path / "notes.txt")
+    assert len(store) == len(texts) and list(store.ids()) == list(range(len(texts)))
+    for doc_id, text in enumerate(texts):
+        assert store.get(doc_id) == text
+        assert bytes(store.view(doc_id)) == text.encode("utf-8")
+        for _ in range(5):
+            start, end = sorted(rng.randint(0, len(text) + 2) for _ in range(2))
+            assert store.span(doc_id, start, end) == text[start:end]
+    with pytest.raises(KeyError):
+        store.get(len(texts))
+    with pytest.raises(ValueError):
+        store.append("read-only")
+    store.close()
+
+
+def test_explicit_ids_and_reader_refresh(tmp_path):
+    path = tmp_path / "notes.txt"
+    writer = CorpusStore(path, writable=True)
+    writer.append("first", doc_id=10)
+    writer.flush()
+    reader = CorpusStore(path)
+    assert reader.get(10) == "first" and 0 not in reader
+
+    with pytest.raises(ValueError):
+        writer.append("again", doc_id=10)
+    assert writer.append("second") == 11
+    writer.append("third", doc_id=3)
+    writer.flush()
+    # the reader picks the new records up on a miss
+    assert reader.get(3) == "third" and reader.get(11) == "second"
+
+    clone = pickle.loads(pickle.dumps(reader))
+    assert not clone.writable and clone.get(10) == "first"
+    writer.close()
+    reader.close()
+
+    with CorpusStore(path, writable=True) as reopened:
+        assert reopened.append("fourth") == 12
+
+
+def test_workers_read_notes_by_doc_id(tmp_path):
+    notes = [
+        "Patient denies SI.",
+        "Suicide attempt by overdose today, I want to die.",
+        "I am a burden.",
+    ] * 4
+    path = tmp_path / "notes.txt"
+    with CorpusStore(path, writable=True) as store:
+        ids = store.extend(notes)
+
+    extractor = Extractor(llm_client=RuleLLMClient())
+    expected = [extractor.extract_record(note) for note in notes]
+    results = list(
+        extractor.iter_extract(ids, workers=2, chunksize=2, loader=CorpusLoader(path), as_records=True, keep_text=False)
+    )
+    for result, reference in zip(results, expected):
+        assert result.text == ""
+        assert result.signals == reference.signals and result.cue_hits == reference.cue_hits
+
+    src = tmp_path / "in.jsonl"
+    src.write_text("\n".join(json.dumps({"text": n}) for n in notes[:3]) + "\n{}\n", encoding="utf-8")
+    out = tmp_path / "out.jsonl"
+    corpus = tmp_path / "cli" / "notes.txt"
+    run = CliRunner().invoke(app, ["extract", "-i", str(src), "-o", str(out), "--corpus", str(corpus)])
+    assert run.exit_code == 0, run.output
+    lines = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [line.get("doc_id") for line in lines] == [0, 1, 2, None]
+    assert lines[0]["text"] == "" and "error_type" in lines[3]
+
+    html = tmp_path / "report.html"
+    run = CliRunner().invoke(app, ["report", "-i", str(out), "-o", str(html), "--corpus", str(corpus)])
+    assert run.exit_code == 0, run.output
+    page = html.read_text(encoding="utf-8")
+    assert page.count("<section>") == 3 and "<div class='note'>Patient " in page
+
+    run = CliRunner().invoke(app, ["report", "-i", str(out), "-o", str(html)])
+    assert run.exit_code != 0 and "--corpus" in run.output
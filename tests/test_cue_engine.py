@@ -0,0 +1,44 @@
+import random
+
+from dundieplz.extract.cue_engine import CueAutomaton, compile_cue_sets, find_all
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.llm_client import DummyLLMClient
+
+
+def _loop_scan(lower, cue_sets):
+    out = {}
+    for category, cues in cue_sets.items():
+        out[category] = [(c, find_all(lower, c.lower())) for c in cues if find_all(lower, c.lower())]
+    return out
+
+
+def test_automaton_matches_find_loop_with_overlaps_and_duplicates():
+    cue_sets = {
+        "a": ["aa", "aab", "b", "", "AA"],
+        "b": ["ab", "bab", "aa"],
+    }
+    rng = random.Random(0)
+    automaton = CueAutomaton(cue_sets, min_automaton_needles=0)
+    small = CueAutomaton(cue_sets)
+    assert automaton.uses_automaton and not small.uses_automaton
+
+    for _ in range(200):
+        lower = "".join(rng.choice("ab c") for _ in range(rng.randint(0, 40)))
+        expected = _loop_scan(lower, cue_sets)
+        assert automaton.scan(lower) == expected
+        assert small.scan(lower) == expected
+
+
+def test_compile_cue_sets_is_cached_per_content():
+    cues = ["I am done"]
+    first = compile_cue_sets({"subjective": cues})
+    assert compile_cue_sets({"subjective": list(cues)}) is first
+    assert compile_cue_sets({"subjective": cues + ["I am exhausted"]}) is not first
+
+
+def test_match_cues_offsets():
+    text = "He said: I AM DONE. I am done, I am exhausted."
+    result = Extractor(llm_client=DummyLLMClient()).extract(text)
+    hits = {h.cue: [(e.start, e.end, e.text) for e in h.evidence] for h in result.cue_hits.subjective}
+    assert hits["I am done"] == [(9, 18, "I AM DONE"), (20, 29, "I am done")]
+    assert hits["I am exhausted"] == [(31, 45, "I am exhausted")]
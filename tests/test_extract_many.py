@@ -0,0 +1,48 @@
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.rule_llm_client import RuleLLMClient
+from dundieplz.schemas.extractor_schema import ExtractionFailure, ExtractionResult
+
+
+class FlakyClient(RuleLLMClient):
+    def generate_json(self, prompt):
+        if "BOOM" in prompt:
+            raise ValueError("bad document")
+        return super().generate_json(prompt)
+
+
+TEXTS = [
+    "Patient denies SI.",
+    "I want to die. Suicide attempt today.",
+    "BOOM",
+    "Farewell messages were found.",
+    "",
+]
+
+
+def _summary(results):
+    return [
+        r.model_dump(mode="json", exclude={"meta": {"created_at"}}) if isinstance(r, ExtractionResult) else r.model_dump()
+        for r in results
+    ]
+
+
+def test_extract_many_serial_keeps_order_and_isolates_failures():
+    extractor = Extractor(llm_client=FlakyClient())
+    results = extractor.extract_many(TEXTS, workers=1)
+
+    assert [type(r) for r in results] == [
+        ExtractionResult,
+        ExtractionResult,
+        ExtractionFailure,
+        ExtractionResult,
+        ExtractionResult,
+    ]
+    assert results[2] == ExtractionFailure(index=2, error_type="ValueError", message="bad document")
+    assert [r.text for r in results if isinstance(r, ExtractionResult)] == [t for t in TEXTS if t != "BOOM"]
+
+
+def test_extract_many_pool_matches_serial():
+    extractor = Extractor(llm_client=FlakyClient())
+    texts = TEXTS * 10
+    pooled = extractor.extract_many(texts, workers=2, chunksize=3)
+    assert _summary(pooled) == _summary(extractor.extract_many(texts, workers=1))
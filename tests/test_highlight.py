@@ -0,0 +1,80 @@
+import json
+import random
+import re
+import time
+from html import unescape
+
+from typer.testing import CliRunner
+
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.rule_llm_client import RuleLLMClient
+from dundieplz.ui.cli import app
+from dundieplz.ui.highlight import Highlight, evidence_highlights, render_highlights, render_report
+
+SEGMENT_RE = re.compile(r"<mark class='([^']*)'[^>]*>(.*?)</mark>|([^<]+)", re.S)
+
+
+def _segments(html):
+    # [(sources, text)] in document order; sources == () outside marks
+    out = []
+    for m in SEGMENT_RE.finditer(html):
+        if m.group(3) is not None:
+            out.append(((), unescape(m.group(3))))
+        else:
+            sources = tuple(c[3:] for c in m.group(1).split() if c.startswith("ev-"))
+            out.append((sources, unescape(m.group(2))))
+    return out
+
+
+def test_segments_cover_the_text_once_with_their_sources():
+    rng = random.Random(20)
+    sources = ["rule", "cue_matcher", "llm", "other"]
+    for _ in range(300):
+        text = "".join(rng.choice("ab <&>'\"\n") for _ in range(rng.randint(0, 60)))
+        spans = [
+            Highlight(rng.randint(-3, len(text) + 3), rng.randint(-3, len(text) + 3), rng.choice(sources))
+            for _ in range(rng.randint(0, 12))
+        ]
+        segments = _segments(render_highlights(text, spans))
+        assert "".join(chunk for _, chunk in segments) == text
+
+        pos = 0
+        for active, chunk in segments:
+            for i in range(pos, pos + len(chunk)):
+                expected = {h.source for h in spans if max(0, h.start) <= i < min(len(text), h.end)}
+                assert set(active) == expected
+            pos += len(chunk)
+
+
+def test_many_overlapping_spans_render_in_linear_time():
+    text = "Patient denies SI. " * 20000
+    spans = [Highlight(i, i + 40, "rule" if i % 2 else "cue_matcher") for i in range(0, len(text) - 40, 19)]
+    start = time.perf_counter()
+    html = render_highlights(text, spans)
+    assert time.perf_counter() - start < 2.0
+    assert "".join(chunk for _, chunk in _segments(html)) == text
+
+
+def test_result_evidence_and_report(tmp_path):
+    extractor = Extractor(llm_client=RuleLLMClient())
+    result = extractor.extract("I am a burden. Suicide attempt by overdose today, I want to die.")
+    highlights = evidence_highlights(result)
+    assert {h.source for h in highlights} == {"rule", "cue_matcher"}
+    assert not any(h.source == "cue_matcher" for h in evidence_highlights(result, include_cues=False))
+
+    marked = render_highlights(result.text, highlights)
+    assert "title='source=cue_matcher | subjective: I am a burden'" in marked
+    assert "source=rule | suicidal_ideation" in marked
+
+    html = render_report([result, result], title="<review>")
+    assert html.count("<section>") == 2 and "&lt;review&gt;" in html
+
+    src = tmp_path / "results.jsonl"
+    src.write_text(
+        result.model_dump_json() + "\n" + json.dumps({"index": 1, "error_type": "ValueError", "message": ""}) + "\n",
+        encoding="utf-8",
+    )
+    out = tmp_path / "report.html"
+    run = CliRunner().invoke(app, ["report", "-i", str(src), "-o", str(out)])
+    assert run.exit_code == 0, run.output
+    assert out.read_text(encoding="utf-8").count("<section>") == 1
@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from dundieplz.extract import rule_llm_client
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.incremental import diff_texts
+from dundieplz.extract.llm_client import DummyLLMClient
+from dundieplz.extract.rule_llm_client import RuleLLMClient
+from dundieplz.extract.segment import resegment, segment
+
+PHRASES = [
+    "Suicide attempt", "denies SI", "I want to die", "now", "today", "three months ago", "firearm",
+    "left a note", "I am exhausted", "I gave my dog away", "next week", "samu", "patient", "calm",
+    "\nFamily history: ", "\nPlan: ", "\nChief complaint: ", "chega eu nao aguento mais", "\n\nFH:\n",
+]
+
+
+def _note(rng, words):
+    return "".join(rng.choice(PHRASES) + rng.choice([" ", ". ", ", ", "\n"]) for _ in range(words))
+
+
+def _edit(rng, text):
+    start = rng.randint(0, len(text))
+    end = min(len(text), start + rng.choice([0, 0, 1, 5, 40]))
+    insert = _note(rng, rng.randint(0, 3)) if rng.random() < 0.8 else ""
+    if rng.random() < 0.3:
+        start = end = len(text)  # addendum
+    return text[:start] + insert + text[end:]
+
+
+def _dump(result):
+    return result.model_dump(mode="json", exclude={"meta": {"created_at"}})
+
+
+def test_diff_texts_finds_the_replaced_region():
+    rng = random.Random(16)
+    for _ in range(500):
+        old = "".join(rng.choice("ab \n") for _ in range(rng.choice([0, 3, 50, 9000])))
+        new = _edit(rng, old) if rng.random() < 0.9 else old
+        edit = diff_texts(old, new)
+        if old == new:
+            assert edit is None
+            continue
+        assert old[: edit.start] + new[edit.start : edit.new_end] + old[edit.old_end :] == new
+        assert edit.start <= edit.old_end and edit.start <= edit.new_end
+
+
+def test_resegment_matches_segment():
+    rng = random.Random(160)
+    for _ in range(300):
+        old = _note(rng, rng.randint(0, 30))
+        new = _edit(rng, old)
+        edit = diff_texts(old, new)
+        if edit is None:
+            continue
+        got = resegment(segment(old), new, edit.start, edit.old_end, edit.new_end)
+        assert got.sections == segment(new).sections
+
+
+@pytest.mark.parametrize("client_type", [RuleLLMClient, DummyLLMClient])
+def test_reextract_equals_full_extraction(client_type):
+    rng = random.Random(1600)
+    extractor = Extractor(llm_client=client_type())
+    for _ in range(150):
+        text = _note(rng, rng.randint(1, 40))
+        result = extractor.extract(text)
+        for _ in range(3):
+            text = _edit(rng, text)
+            result = extractor.reextract(result, text)
+            assert _dump(result) == _dump(Extractor(llm_client=client_type()).extract(text))
+
+
+def test_reextract_scans_only_the_edit(monkeypatch):
+    scanned = []
+    original_scan = rule_llm_client.PatternFamilies.scan
+
+    def recording_scan(self, text, ranges=None):
+        scanned.append(sum(e - s for s, e in ranges) if ranges is not None else len(text))
+        return original_scan(self, text, ranges)
+
+    text = "Patient is calm and cooperative, denies SI. " * 2000
+    extractor = Extractor(llm_client=RuleLLMClient())
+    result = extractor.extract(text)
+    monkeypatch.setattr(rule_llm_client.PatternFamilies, "scan", recording_scan)
+
+    margin = rule_llm_client.UNBOUNDED_MATCH + 1
+    for addendum in ("Addendum: suicide attempt today.", " Family called, patient now calm."):
+        # the first call also rebuilds the scan state of the untouched note
+        scanned.clear()
+        text += addendum
+        result = extractor.reextract(result, text)
+    assert sum(scanned) <= len(addendum) + 3 * margin
+    assert result.signals.intent.presence.value == "present"
+    assert result.cue_hits == Extractor(llm_client=RuleLLMClient()).extract(text).cue_hits
@@ -0,0 +1,110 @@
+import logging
+import pickle
+
+import pytest
+
+from dundieplz.extract.cache import ExtractionCache
+from dundieplz.extract.chunking import ChunkingConfig
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.instrument import Instrumentation, LoggingSink, PrometheusTextfileSink
+from dundieplz.extract.llm_client import DummyLLMClient
+from dundieplz.extract.rule_llm_client import RuleLLMClient
+
+NOTES = [
+    "Patient reports suicidal thoughts and a suicide attempt today. Denies plan.",
+    "Paciente relata ideação suicida, chega, eu não aguento mais.",
+    "",
+    "Calm and cooperative. " * 200,
+]
+
+
+def _dump(result):
+    return result.model_dump(mode="json", exclude={"meta": {"created_at"}})
+
+
+@pytest.mark.parametrize("client_type", [RuleLLMClient, DummyLLMClient])
+def test_instrumented_results_are_unchanged(client_type):
+    seen = []
+    plain = Extractor(llm_client=client_type())
+    observed = Extractor(llm_client=client_type(), instrumentation=Instrumentation(sinks=[seen.append]))
+    for text in NOTES:
+        assert _dump(observed.extract(text)) == _dump(plain.extract(text))
+        assert _dump(observed.extract_record(text).to_model()) == _dump(plain.extract_record(text).to_model())
+    assert len(seen) == 2 * len(NOTES)
+
+    metrics = seen[0]
+    assert list(metrics.stages) == ["preprocess", "language", "backend", "signals", "cue_matcher", "record", "validation"]
+    assert all(seconds >= 0 for seconds in metrics.stages.values())
+    assert metrics.counters["chars"] == len(NOTES[0])
+    result = plain.extract(NOTES[0])
+    hits = result.cue_hits.contextual + result.cue_hits.subjective + result.cue_hits.ambiguous
+    assert metrics.counters["cue_hits"] == len(hits)
+    assert metrics.counters["spans"] == sum(
+        len(getattr(result.signals, name).evidence)
+        for name in ("suicidal_ideation", "self_harm", "intent", "plan", "past_behavior")
+    )
+    assert "validation" not in seen[1].stages
+
+
+def test_cache_and_chunking_stages():
+    seen = []
+    extractor = Extractor(
+        llm_client=RuleLLMClient(),
+        cache=ExtractionCache(),
+        chunking=ChunkingConfig(window=1000, overlap=100),
+        instrumentation=Instrumentation(sinks=[seen.append]),
+    )
+    extractor.extract(NOTES[3])
+    extractor.extract(NOTES[3])
+    assert "signals" not in seen[0].stages
+    assert seen[0].stages.keys() >= {"cache_lookup", "backend", "cache_store"}
+    assert seen[1].cached and list(seen[1].stages) == ["cache_lookup"]
+
+
+@pytest.mark.parametrize("mode", ["cprofile", "tracemalloc"])
+def test_sampled_profiles(mode):
+    seen = []
+    instrumentation = Instrumentation(sinks=[seen.append], profile=mode, sample_every=2)
+    extractor = Extractor(llm_client=RuleLLMClient(), instrumentation=instrumentation)
+    for text in NOTES:
+        extractor.extract(text)
+    assert [m.profile is not None for m in seen] == [False, True, False, True]
+    assert seen[1].profile["kind"] == mode
+    if mode == "cprofile":
+        assert "generate_json" in seen[1].profile["report"]
+    else:
+        assert seen[1].profile["peak_bytes"] > 0
+
+    with pytest.raises(ValueError):
+        Instrumentation(profile="perf")
+
+
+def test_sinks(tmp_path, caplog):
+    path = tmp_path / "extract.prom"
+    prometheus = PrometheusTextfileSink(path, write_every=2)
+
+    def broken(metrics):
+        raise RuntimeError("sink down")
+
+    instrumentation = Instrumentation(sinks=[broken, LoggingSink(), prometheus])
+    extractor = Extractor(llm_client=DummyLLMClient(), instrumentation=instrumentation)
+    with caplog.at_level(logging.INFO, logger="dundieplz.extract"):
+        for text in NOTES[:3]:
+            extractor.extract(text)
+    assert sum("sink down" in r.getMessage() or r.exc_info is not None for r in caplog.records) == 3
+    logged = [r for r in caplog.records if r.getMessage().startswith("extract backend=dummy")]
+    assert len(logged) == 3 and logged[0].metrics["counters"]["chars"] == len(NOTES[0])
+
+    # written after two notes, the third only on flush
+    assert 'dundieplz_extract_documents_total{backend="dummy",cached="false"} 2' in path.read_text()
+    prometheus.flush()
+    exposition = path.read_text()
+    assert 'dundieplz_extract_documents_total{backend="dummy",cached="false"} 3' in exposition
+    assert 'dundieplz_extract_stage_calls_total{stage="backend"} 3' in exposition
+    assert f"dundieplz_extract_chars_total {len(NOTES[0]) + len(NOTES[1])}" in exposition
+
+    # workers receive a pickled copy
+    extractor.instrumentation.sinks.remove(broken)
+    copy = pickle.loads(pickle.dumps(extractor))
+    assert copy.instrumentation.sinks[1].path == path
+    copy.extract(NOTES[0])
@@ -0,0 +1,89 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.langid import (
+    CHUNK_CHARS,
+    MODEL_PATH,
+    UNKNOWN,
+    get_model,
+    identify,
+    read_model,
+    write_model,
+)
+from dundieplz.extract.llm_client import DummyLLMClient
+from dundieplz.extract.preprocess import prepare
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+SAMPLES = {
+    "en": "The patient was seen in the clinic today and reports feeling better.",
+    "pt-BR": "O paciente nega ideação suicida e refere melhora do humor.",
+    "es": "El paciente niega ideación suicida y refiere mejoría del ánimo.",
+    "fr": "Le patient nie toute idée suicidaire et rapporte une amélioration de l'humeur.",
+}
+
+
+def test_identifies_supported_languages():
+    assert set(get_model().languages) == set(SAMPLES)
+    for label, text in SAMPLES.items():
+        guess = identify(text)
+        assert guess.language == label, (label, guess)
+        assert guess.confidence > 0.9
+    # typed without accents
+    assert identify("eu queria nao acordar amanha").language == "pt-BR"
+
+
+def test_nothing_to_score_is_unknown():
+    for text in ("", "123 456", "!!! ..."):
+        guess = identify(text)
+        assert (guess.language, guess.best, guess.confidence) == (UNKNOWN, UNKNOWN, 0.0)
+    # too little evidence: a best guess, but below the minimum confidence
+    guess = identify("I")
+    assert guess.language == UNKNOWN and guess.best != UNKNOWN and 0.0 < guess.confidence < 0.5
+
+
+def test_stops_early_once_confident():
+    text = " ".join([SAMPLES["fr"]] * 50)
+    guess = identify(text)
+    assert guess.language == "fr"
+    assert guess.chars < 2 * CHUNK_CHARS + 1 < len(text)
+
+    # a threshold that is never reached reads up to max_chars only
+    guess = identify(text, threshold=1.01, max_chars=1000)
+    assert guess.chars == 1000
+
+
+def test_secondary_languages_from_decisive_tokens():
+    assert identify(SAMPLES["en"]).secondary == ()
+    mixed = "I feel sorry for my children, chega eu nao aguento mais, I am exhausted"
+    guess = identify(mixed)
+    assert {guess.best, *guess.secondary} == {"en", "pt-BR"}
+
+
+def test_model_file_round_trip(tmp_path):
+    path = tmp_path / "model.bin"
+    write_model(path, ["a", "b", "c"], {" ab": [0, 3, 255], "ab ": [7, 0, 300]}, 16.0, 4.0)
+    model = read_model(path)
+    assert model.languages == ("a", "b", "c")
+    assert [model.lanes(model.packed[g]) for g in (" ab", "ab ")] == [[0, 3, 255], [7, 0, 255]]
+
+
+def test_shipped_model_matches_build_script(tmp_path):
+    out = tmp_path / "langid.bin"
+    subprocess.run(
+        [sys.executable, str(PROJECT_ROOT / "scripts" / "build_langid_model.py"), "--out", str(out)],
+        check=True,
+        capture_output=True,
+    )
+    assert out.read_bytes() == MODEL_PATH.read_bytes()
+
+
+def test_document_and_meta_carry_language():
+    text = "Ya no aguanto más, quisiera no despertar mañana."
+    doc = prepare(text)
+    assert doc.langid is doc.langid
+    meta = Extractor(llm_client=DummyLLMClient()).extract(text).meta
+    assert meta.language == "es"
+    assert meta.language_confidence == round(doc.langid.confidence, 4)
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from dundieplz.extract import llm_client, packs
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.langid import LanguageGuess
+from dundieplz.extract.llm_client import DummyLLMClient
+from dundieplz.extract.preprocess import prepare
+from dundieplz.extract.rule_llm_client import RuleLLMClient
+
+
+def _guess(language, confidence=0.99, secondary=()):
+    return LanguageGuess(language=language, best=language, confidence=confidence, chars=0, secondary=secondary)
+
+
+def test_shipped_packs_load_and_merge_in_language_order():
+    assert packs.available_languages() == ("en", "pt-BR")
+    en, pt = packs.load_pack("en"), packs.load_pack("pt-BR")
+    merged = packs.all_packs()
+    assert merged.tags == (en.tag, pt.tag)
+    assert merged.cues["direct"] == en.cues["direct"] + pt.cues["direct"]
+    # shared patterns are listed once
+    assert merged.patterns["attempt"].count(r"\boverdose\b") == 1
+    with pytest.raises(KeyError):
+        packs.load_pack("xx")
+
+
+def test_legacy_cue_constants_come_from_the_packs():
+    assert llm_client.CONTEXTUAL_CUES[0] == "I gave my dog away"
+    assert "chega eu nao aguento mais" in llm_client.AMBIGUOUS_CUES
+    assert llm_client.DIRECT_SUICIDAL_CUES == list(packs.all_packs().cues["direct"])
+    with pytest.raises(AttributeError):
+        llm_client.NOT_A_CUE_LIST
+
+
+def test_routing_by_language_guess():
+    assert packs.select_languages(_guess("en")) == ("en",)
+    assert packs.select_languages(_guess("pt-BR")) == ("pt-BR",)
+    assert packs.select_languages(_guess("en", secondary=("pt-BR", "fr"))) == ("en", "pt-BR")
+    # low confidence, or no pack for the language: every pack
+    assert packs.select_languages(_guess("en", confidence=0.6)) == ("en", "pt-BR")
+    assert packs.select_languages(_guess("es")) == ("en", "pt-BR")
+
+
+def test_only_the_notes_pack_runs():
+    en_note = "The patient says I am exhausted and I am a burden to my family since her husband died."
+    pt_note = "Paciente refere que chega eu nao aguento mais, diz que não vê saída e que sente muita tristeza."
+    assert packs.packs_for(prepare(pt_note)).languages == ("pt-BR",)
+
+    extractor = Extractor(llm_client=RuleLLMClient())
+    result = extractor.extract(pt_note)
+    assert [hit.cue for hit in result.cue_hits.ambiguous] == ["chega eu nao aguento mais"]
+    assert result.meta.cue_packs == [packs.load_pack("pt-BR").tag]
+
+    result = Extractor(llm_client=DummyLLMClient()).extract(en_note)
+    assert result.meta.cue_packs == [packs.load_pack("en").tag]
+    assert [hit.cue for hit in result.cue_hits.subjective] == ["I am exhausted", "I am a burden"]
+    assert not result.cue_hits.ambiguous
+
+    # code-switched note: both packs
+    mixed = en_note + " Ela disse: eu queria nao acordar amanha, chega eu nao aguento mais."
+    result = Extractor(llm_client=DummyLLMClient()).extract(mixed)
+    assert len(result.meta.cue_packs) == 2
+    assert [e.text for e in result.signals.suicidal_ideation.evidence] == ["eu queria nao acordar amanha"]
+
+
+def test_matchers_compiled_once_per_pack_set():
+    pack_set = packs.pack_set(("en",))
+    built = []
+    first = pack_set.matcher("probe", lambda p: built.append(p) or object())
+    assert pack_set.matcher("probe", lambda p: built.append(p) or object()) is first
+    assert len(built) == 1
+
+
+def test_invalid_packs_are_rejected(tmp_path):
+    def write(name, data):
+        path = tmp_path / f"{name}.json"
+        path.write_text(json.dumps(data), encoding="utf-8")
+        return path
+
+    base = {"format": 1, "language": "xx", "version": "1", "cues": {}, "patterns": {}}
+    assert packs.read_pack(write("xx", base)).tag.startswith("xx@1:")
+    for bad in (
+        {**base, "format": 2},
+        {**base, "language": "yy"},
+        {**base, "cues": {"unknown_category": ["a"]}},
+        {**base, "patterns": {"denial": "not a list"}},
+    ):
+        with pytest.raises(ValueError):
+            packs.read_pack(write("xx", bad))
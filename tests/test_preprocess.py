@@ -0,0 +1,58 @@
+import unicodedata
+
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.llm_client import DummyLLMClient
+from dundieplz.extract.preprocess import prepare, strip_accents
+from dundieplz.extract.rule_llm_client import RuleLLMClient
+
+
+def test_ascii_document_shares_folded_and_plain():
+    doc = prepare("I Want To Die, now.")
+    assert doc.folded == "i want to die, now."
+    assert doc.plain is doc.folded
+    assert doc.to_original(2, 6) == (2, 6)
+    assert [doc.text[s:e] for s, e in doc.tokens] == ["I", "Want", "To", "Die", "now"]
+
+
+def test_accents_stripped_with_offsets_back_to_original():
+    precomposed = "Ela disse: EU QUERIA NÃO ACORDAR AMANHÃ."
+    decomposed = unicodedata.normalize("NFD", precomposed)
+    for text in (precomposed, decomposed):
+        doc = prepare(text)
+        start = doc.plain.index("eu queria nao acordar amanha")
+        s, e = doc.to_original(start, start + len("eu queria nao acordar amanha"))
+        assert unicodedata.normalize("NFC", text[s:e]) == "EU QUERIA NÃO ACORDAR AMANHÃ"
+    assert strip_accents("ação") == "acao"
+
+
+def test_folded_keeps_offsets_for_length_changing_lowercase():
+    text = "İstanbul: I am done"
+    doc = prepare(text)
+    assert len(doc.folded) == len(text)
+    assert doc.folded.endswith("i am done")
+
+
+def test_prepare_memoizes_last_document():
+    text = "Denies SI today."
+    assert prepare(text) is prepare(text)
+    assert prepare("other") is not prepare(text)
+
+
+def test_cue_matcher_and_dummy_backend_match_accented_input():
+    text = "Paciente: “Eu queria não acordar amanhã”."
+    result = Extractor(llm_client=DummyLLMClient()).extract(text)
+
+    hit = result.cue_hits.ambiguous[0]
+    assert hit.cue == "eu queria nao acordar amanha"
+    assert hit.evidence[0].text == "Eu queria não acordar amanhã"
+
+    evidence = result.signals.suicidal_ideation.evidence[0]
+    assert result.signals.suicidal_ideation.presence.value == "present"
+    assert text[evidence.start : evidence.end] == "Eu queria não acordar amanhã"
+
+
+def test_rule_backend_offsets_refer_to_original_text():
+    text = unicodedata.normalize("NFD", "Após a avaliação: attempted suicide, agora.")
+    out = RuleLLMClient().generate_json(text)
+    ev = out["past_behavior"]["evidence"][0]
+    assert text[ev["start"] : ev["end"]] == ev["text"] == "attempted suicide"
@@ -0,0 +1,83 @@
+import json
+import random
+
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.llm_client import DummyLLMClient
+from dundieplz.extract.rule_llm_client import RuleLLMClient
+from dundieplz.map.mapper_cssrs import CSSRS, map_cssrs
+from dundieplz.map.mapper_phq9 import PHQ9_ITEM9, map_phq9_item9
+from dundieplz.map.projection import ProjectionBatch, project, project_columns, project_repository
+from dundieplz.schemas.cssrs import CSSRSInspiredOutput
+from dundieplz.schemas.extractor_schema import ExtractionResult, Presence, Temporal
+from dundieplz.store.repository import ExtractionRepository
+
+PHRASES = [
+    "I want to die", "denies SI", "Suicide attempt by overdose", "firearm", "I gave my dog away",
+    "now", "three months ago", "next week", "left a note", "calm", "I am a burden", "Família: ",
+]
+
+
+def _random_results(rng, count):
+    extractors = [Extractor(llm_client=RuleLLMClient()), Extractor(llm_client=DummyLLMClient())]
+    results = []
+    for _ in range(count):
+        text = ". ".join(rng.choice(PHRASES) for _ in range(rng.randint(0, 6)))
+        result = rng.choice(extractors).extract(text)
+        # every enum combination, not only what the backends produce
+        for name in ("suicidal_ideation", "self_harm", "intent", "plan", "past_behavior"):
+            if rng.random() < 0.3:
+                getattr(result.signals, name).presence = rng.choice(list(Presence))
+        if rng.random() < 0.3:
+            result.signals.temporal = rng.choice(list(Temporal))
+        if rng.random() < 0.2:
+            result.signals.missing_information.append('quote " and ção')
+        results.append(result)
+    return results
+
+
+def test_batch_projection_matches_reference_path():
+    results = _random_results(random.Random(21), 300)
+    for framework, reference in ((CSSRS, map_cssrs), (PHQ9_ITEM9, map_phq9_item9)):
+        expected = [reference(r).model_dump_json() for r in results]
+        assert project(ProjectionBatch.from_results(results), framework) == expected
+        stored = ProjectionBatch.from_json((i, r.model_dump_json()) for i, r in enumerate(results))
+        assert project(stored, framework) == expected
+
+    columns = project_columns(ProjectionBatch.from_results(results), CSSRS)
+    assert columns["intent"][0].value == results[0].signals.intent.presence.value
+    assert project(ProjectionBatch.from_results([]), CSSRS) == []
+
+
+def test_mapping_rules():
+    result = Extractor(llm_client=RuleLLMClient()).extract("I gave my dog away. Suicide attempt by overdose today.")
+    cssrs = map_cssrs(result)
+    assert cssrs.past_suicidal_behavior.value == "present"
+    assert cssrs.preparatory_behaviors.value == "present"
+    assert "access_to_means_not_extracted" in cssrs.missing_information
+    assert any(ev.text == "I gave my dog away" for ev in cssrs.evidence)
+
+    denied = Extractor(llm_client=RuleLLMClient()).extract("Denies suicidal ideation.")
+    denied.signals.suicidal_ideation.presence = Presence.absent
+    assert map_phq9_item9(denied).item9_presence.value == "absent"
+    assert map_cssrs(denied).active_ideation.value == "absent"
+
+
+def test_project_repository_replaces_stale_rows(tmp_path):
+    results = _random_results(random.Random(210), 25)
+    with ExtractionRepository(tmp_path / "runs.db", batch_size=7) as repo:
+        run_id = repo.start_run("rules")
+        repo.insert_results(run_id, [(f"case-{i}", r) for i, r in enumerate(results)])
+
+        for _ in range(2):  # re-projection replaces, it does not append
+            written = project_repository(repo, [CSSRS, PHQ9_ITEM9], run_id=run_id, batch_size=10)
+        assert written == {"cssrs": 25, "phq9_item9": 25}
+        assert repo.count_projections("cssrs") == 25 and repo.count_projections("phq9_item9") == 25
+
+        rows = repo.conn.execute(
+            "SELECT o.raw_output_json, p.projection_json FROM framework_projections p "
+            "JOIN extracted_outputs o USING (output_id) WHERE p.framework = 'cssrs' ORDER BY output_id"
+        ).fetchall()
+    for raw, projection in rows:
+        expected = map_cssrs(ExtractionResult.model_validate_json(raw))
+        assert CSSRSInspiredOutput.model_validate_json(projection) == expected
+        assert json.loads(projection)["temporal"] in ("current", "recent", "past", "unknown")
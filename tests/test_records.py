@@ -0,0 +1,52 @@
+import pickle
+
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.llm_client import DummyLLMClient
+from dundieplz.extract.records import ResultRecord, signals_from_dict
+from dundieplz.extract.rule_llm_client import RuleLLMClient
+from dundieplz.schemas.extractor_schema import EvidenceSource, Presence, Temporal
+
+
+TEXTS = [
+    "",
+    "I want to die. Denies SI. I am done, maybe tonight.",
+    "Attempted suicide yesterday at triage; overdose, left a note.",
+    "Não queria mais viver, acho que sim.",
+]
+
+
+def test_record_json_matches_model_json():
+    for client in (RuleLLMClient(), DummyLLMClient()):
+        extractor = Extractor(llm_client=client)
+        for text in TEXTS:
+            record = extractor.extract_record(text)
+            model = record.to_model()
+            assert record.to_json() == model.model_dump_json().encode("utf-8")
+
+            expected = extractor.extract(text).model_dump(exclude={"meta": {"created_at"}})
+            assert model.model_dump(exclude={"meta": {"created_at"}}) == expected
+
+
+def test_signals_from_dict_sanitizes_backend_output():
+    signals = signals_from_dict(
+        {
+            "suicidal_ideation": {"presence": "maybe", "evidence": [{"text": 7, "start": "3", "end": 5.0}]},
+            "plan": {"presence": "absent"},
+            "temporal": ["bad"],
+            "uncertainty_cues": [1, "x"],
+        },
+        EvidenceSource.llm,
+    )
+    assert signals.suicidal_ideation.presence is Presence.indeterminate
+    span = signals.suicidal_ideation.evidence[0]
+    assert (span.text, span.start, span.end) == ("7", 3, 5)
+    assert signals.plan.presence is Presence.absent
+    assert signals.temporal is Temporal.unknown
+    assert signals.uncertainty_cues == ["1", "x"]
+
+
+def test_iter_extract_as_records():
+    extractor = Extractor(llm_client=RuleLLMClient())
+    out = list(extractor.iter_extract(TEXTS, workers=1, as_records=True))
+    assert all(isinstance(r, ResultRecord) for r in out)
+    assert pickle.loads(pickle.dumps(out[1])) == out[1]
@@ -0,0 +1,62 @@
+import json
+import threading
+
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.rule_llm_client import RuleLLMClient
+from dundieplz.store.repository import ExtractionRepository, ResultWriter
+
+
+TEXTS = ["I want to die", "Denies suicidal ideation.", "I took pills last year", "Feeling okay today."]
+
+
+def _results():
+    extractor = Extractor(llm_client=RuleLLMClient())
+    return [extractor.extract(t) for t in TEXTS]
+
+
+def test_bulk_insert_in_batches(tmp_path):
+    results = _results()
+    with ExtractionRepository(tmp_path / "runs.db", batch_size=3) as repo:
+        run_id = repo.start_run("rules")
+        pairs = [(f"case-{i}", results[i % len(results)]) for i in range(10)]
+        assert repo.insert_results(run_id, pairs) == 10
+        assert repo.count_outputs(run_id) == 10
+
+        mode = repo.conn.execute("PRAGMA journal_mode").fetchone()[0]
+        indexes = {r[1] for r in repo.conn.execute("PRAGMA index_list(extracted_outputs)")}
+        row = repo.conn.execute(
+            "SELECT suicidal_ideation_presence, evidence_json, raw_output_json "
+            "FROM extracted_outputs WHERE case_id = 'case-0'"
+        ).fetchone()
+
+    assert mode == "wal"
+    assert {"idx_outputs_run_case", "idx_outputs_si_presence"} <= indexes
+    assert row[0] == results[0].signals.suicidal_ideation.presence.value
+    assert json.loads(row[1])["suicidal_ideation"] == [
+        ev.model_dump(mode="json") for ev in results[0].signals.suicidal_ideation.evidence
+    ]
+    assert row[2] == results[0].model_dump_json()
+
+
+def test_writer_thread_accepts_parallel_producers(tmp_path):
+    results = _results()
+    with ExtractionRepository(tmp_path / "runs.db", batch_size=50) as repo:
+        run_id = repo.start_run("rules", extractor_version="test")
+
+        with ResultWriter(repo, run_id, max_queue=16) as writer:
+            def produce(worker):
+                for i in range(100):
+                    writer.submit(f"w{worker}-{i}", results[i % len(results)])
+
+            threads = [threading.Thread(target=produce, args=(w,)) for w in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        assert writer.written == 400
+        assert repo.count_outputs(run_id) == 400
+        version = repo.conn.execute(
+            "SELECT extractor_version FROM extraction_runs WHERE run_id = ?", (run_id,)
+        ).fetchone()[0]
+    assert version == "test"
@@ -0,0 +1,58 @@
+import json
+import random
+import re
+from pathlib import Path
+
+import pytest
+
+from dundieplz.extract.packs import packs_for
+from dundieplz.extract.preprocess import prepare
+from dundieplz.extract.rule_llm_client import FAMILIES, PatternFamilies, RuleLLMClient, Span
+
+CASES_PATH = Path(__file__).resolve().parents[1] / "data" / "Synth_Case_1.json"
+
+
+def _reference_scan(client, text):
+    # One re.finditer per pattern, as the backend used to do.
+    patterns = packs_for(prepare(text)).patterns
+    out = {}
+    for family in FAMILIES:
+        spans = [
+            Span(text=text[m.start() : m.end()], start=m.start(), end=m.end())
+            for pat in patterns.get(family, ())
+            for m in re.finditer(pat, text, flags=re.IGNORECASE)
+        ]
+        out[family] = client._dedupe_overlapping_spans(spans)
+    return out
+
+
+@pytest.mark.parametrize("case", json.loads(CASES_PATH.read_text(encoding="utf-8")), ids=lambda c: c["case_id"])
+def test_synthetic_cases_expected_behavior(case):
+    out = RuleLLMClient().generate_json(case["text"])
+    got = {k: (out[k] if k == "temporal" else out[k]["presence"]) for k in case["expected_behavior"]}
+    assert got == case["expected_behavior"]
+
+
+def test_single_scan_matches_per_pattern_scans():
+    client = RuleLLMClient()
+    phrases = [
+        "Suicide attempt", "attempted suicide", "firearm injury", "firearm", "left a note",
+        "left note", "farewell messages", "I want to die", "denies SI", "right now", "now",
+        "earlier today", "12 months ago", "1 month  ago", "samu", "post-mortem", "next week",
+        "snow", "nowhere", "suicides", "patient", "and",
+    ]
+    rng = random.Random(1)
+    for _ in range(300):
+        words = [rng.choice(phrases) for _ in range(rng.randint(0, 30))]
+        text = "".join(w + rng.choice([" ", ", ", ".\n", "-"]) for w in words)
+        assert client._scan(text) == _reference_scan(client, text)
+
+
+def test_pattern_families_handle_opaque_patterns():
+    families = PatternFamilies({"a": [r"\bfoo\b", r"(?:x|y)z"], "b": [r"\d+ days?", r"oo"], "c": []})
+    found = families.scan("foo yz 3 days Foo")
+    assert found == {
+        "a": [(0, 3), (4, 6), (14, 17)],
+        "b": [(1, 3), (7, 13), (15, 17)],
+        "c": [],
+    }
@@ -0,0 +1,129 @@
+import random
+
+from dundieplz.extract.preprocess import prepare
+from dundieplz.extract.rule_llm_client import RuleLLMClient
+from dundieplz.extract.segment import BODY, segment
+
+NOTE = (
+    "Emergency department note.\n"
+    "Chief complaint and duration: overdose two hours ago.\n"
+    "Family history: father died by suicide. Mother has depression.\n"
+    "  - Plan: return tomorrow for follow-up\n"
+    "CONDUTA:\n"
+    "\n"
+    "observação\n"
+    "\n"
+    "Patient says I want to die.\n"
+)
+
+
+def test_sections_tile_the_note():
+    seg = segment(NOTE)
+    names = [s.name for s in seg.sections]
+    assert names == [BODY, "family_history", "plan", "plan", BODY]
+    assert seg.sections[0].start == 0 and seg.sections[-1].end == len(NOTE)
+    assert all(a.end == b.start for a, b in zip(seg.sections, seg.sections[1:]))
+    fh = seg.sections[1]
+    assert NOTE[fh.start : fh.header_end] == "Family history:"
+    assert seg.section_at(NOTE.index("father")).name == "family_history"
+    assert seg.ranges(frozenset({"family_history"})) == [(0, fh.start), (fh.end, len(NOTE))]
+
+    # a one-line entry ends with its line, a header block at the first
+    # blank line after its content
+    assert NOTE[fh.end - 1 : fh.end + 4] == "\n  - "
+    assert seg.section_at(NOTE.index("observação")).name == "plan"
+    assert seg.section_at(NOTE.index("I want")).name == BODY
+
+    # header words inside a line, or not right before the colon, are not headers
+    assert seg.section_at(NOTE.index("overdose")).name == BODY
+    assert [s.name for s in segment("We discussed the plan: none").sections] == [BODY]
+    assert [s.name for s in segment("Plan to end it all: tonight").sections] == [BODY]
+    assert [s.name for s in segment("").sections] == [BODY]
+
+
+def test_sentences_with_offsets():
+    text = "Seen by Dr. Smith today. M.F.A., 58 years old!\nDenies SI\n\nPlan: discharge."
+    seg = segment(text)
+    got = [(text[s.start : s.end], seg.sections[s.section].name) for s in seg.sentences]
+    assert got == [
+        ("Seen by Dr. Smith today.", BODY),
+        ("M.F.A., 58 years old!", BODY),
+        ("Denies SI", BODY),
+        ("Plan: discharge.", "plan"),
+    ]
+
+
+def test_random_notes_are_covered_exactly_once():
+    rng = random.Random(14)
+    pieces = ["Plan:", "History", "family history:", "Denies SI.", "now", "\n", "e.g. ", "Dr. X", "?", " "]
+    for _ in range(300):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 25)))
+        seg = segment(text)
+        assert seg.sections[0].start == 0 and seg.sections[-1].end == len(text)
+        assert all(a.end == b.start for a, b in zip(seg.sections, seg.sections[1:]))
+        last = 0
+        for sentence in seg.sentences:
+            assert last <= sentence.start < sentence.end
+            assert text[sentence.start : sentence.end] == text[sentence.start : sentence.end].strip()
+            last = sentence.end
+
+
+def test_document_caches_segments_and_maps_offsets():
+    doc = prepare("Plan:\nnãõ agora")
+    assert doc.segments is doc.segments
+    assert doc.segments.sections[0].name == "plan"
+    start = doc.text.index("agora")
+    (plain_start, plain_end), = doc.to_plain_spans([(start, len(doc.text))])
+    assert doc.plain[plain_start:plain_end] == "agora"
+
+
+# Presences and temporal of the pre-segmentation backend on these notes:
+# a one-line history entry must not hide the patient's own statements.
+BASELINE = [
+    (
+        "FH: noncontributory.\nPatient says I want to die and attempted suicide by overdose today.",
+        ("present", "indeterminate", "present", "present", "present", "current"),
+    ),
+    (
+        "PMH: none.\nPatient says I want to die and attempted suicide by overdose today.",
+        ("present", "indeterminate", "present", "present", "present", "current"),
+    ),
+    (
+        "Family history: mother has depression.\nPatient reports suicidal thoughts, has a firearm at home.",
+        ("present", "indeterminate", "present", "present", "present", "unknown"),
+    ),
+    (
+        "Medical history: hypertension.\nSuicide attempt by overdose now.",
+        ("present", "indeterminate", "present", "present", "present", "current"),
+    ),
+    (
+        "Plan to end it all: patient says I want to die.",
+        ("present", "indeterminate", "indeterminate", "indeterminate", "indeterminate", "unknown"),
+    ),
+]
+
+
+def test_one_line_entries_keep_the_baseline_decisions():
+    client = RuleLLMClient()
+    names = ("suicidal_ideation", "self_harm", "intent", "plan", "past_behavior")
+    for note, expected in BASELINE:
+        out = client.generate_json(note)
+        assert tuple(out[name]["presence"] for name in names) + (out["temporal"],) == expected, note
+        assert out["uncertainty_cues"] == []
+
+
+def test_families_only_match_in_their_sections():
+    client = RuleLLMClient()
+    out = client.generate_json("Patient is calm.\nFamily history: mother attempted suicide.\n")
+    assert out["suicidal_ideation"]["presence"] == "indeterminate"
+    assert out["past_behavior"]["presence"] == "indeterminate"
+
+    # the same words without headers still count
+    out = client.generate_json("Patient is calm. Mother attempted suicide.")
+    assert out["past_behavior"]["presence"] == "present"
+
+    # attempt and "now" in different sections: no longer "current"
+    headed = "Medical history: overdose in 2015.\nMental status: patient is now calm.\n"
+    assert client.generate_json(headed)["temporal"] != "current"
+    flat = "Overdose in 2015, patient is now calm."
+    assert client.generate_json(flat)["temporal"] == "current"
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from dundieplz.extract import serializer as serializer_module
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.llm_client import DummyLLMClient
+from dundieplz.extract.rule_llm_client import RuleLLMClient
+from dundieplz.extract.serializer import ResultSerializer, dumps_result
+from dundieplz.schemas.extractor_schema import ExtractionFailure, ExtractionResult
+
+
+TEXTS = ["", "I want to die. Denies SI. I am done, maybe tonight.", "Não queria mais viver   acho."]
+
+BACKENDS = ["auto", "json", "pydantic"] + (["orjson"] if serializer_module.orjson is not None else [])
+
+
+def _pairs():
+    for client in (RuleLLMClient(), DummyLLMClient()):
+        extractor = Extractor(llm_client=client)
+        for text in TEXTS:
+            model = extractor.extract(text)
+            record = extractor.extract_record(text)
+            record.meta.created_at = model.meta.created_at
+            yield model, record
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_default_output_matches_model_dump_json(backend):
+    ser = ResultSerializer(backend=backend)
+    for model, record in _pairs():
+        expected = model.model_dump_json().encode("utf-8")
+        assert ser.dumps(model) == expected
+        assert ser.dumps(record) == expected
+    failure = ExtractionFailure(index=3, error_type="ValueError", message="bad")
+    assert ser.dumps_line(failure) == failure.model_dump_json().encode("utf-8") + b"\n"
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_compact_drops_defaults_and_round_trips(backend):
+    ser = ResultSerializer(compact=True, backend=backend)
+    for model, record in _pairs():
+        raw = ser.dumps(model)
+        assert raw == ser.dumps(record)
+        assert ExtractionResult.model_validate_json(raw) == model
+
+    empty = json.loads(ser.dumps(Extractor(llm_client=DummyLLMClient()).extract("")))
+    assert set(empty) == {"text", "signals", "meta"}
+    assert set(empty["meta"]) == {"cue_packs", "created_at"}
+
+
+def test_indent_and_backend_selection():
+    failure = ExtractionFailure(index=1, error_type="X")
+    assert ResultSerializer(indent=True, backend="json").dumps(failure).decode("utf-8").startswith('{\n  "index": 1,')
+    assert dumps_result(failure) == failure.model_dump_json().encode("utf-8")
+    with pytest.raises(ValueError):
+        ResultSerializer(backend="pickle")
@@ -0,0 +1,205 @@
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from typer.testing import CliRunner
+
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.rule_llm_client import RuleLLMClient
+from dundieplz.ui.cli import app
+from dundieplz.ui.server import ExtractionService, make_server
+
+NOTES = [
+    "Patient denies SI.",
+    "Suicide attempt by overdose today, I want to die.",
+    "I am a burden.",
+]
+
+
+class UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("localhost")
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.unix_path)
+
+
+def _running(service, **kwargs):
+    server = make_server(service, port=0, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _request(conn, method, path, body=None):
+    conn.request(method, path, body=None if body is None else json.dumps(body))
+    response = conn.getresponse()
+    return response.status, response.read()
+
+
+def test_single_batch_health_and_metrics():
+    expected = [Extractor(llm_client=RuleLLMClient()).extract_record(note) for note in NOTES]
+
+    with ExtractionService(backends=["rules", "dummy"], max_pending=4, max_batch=3) as service:
+        server = _running(service)
+        conn = http.client.HTTPConnection(*server.server_address)
+        try:
+            # one keep-alive connection (reopened after each 400/413)
+            status, body = _request(conn, "POST", "/extract", {"text": NOTES[1]})
+            assert status == 200
+            assert json.loads(body)["signals"]["suicidal_ideation"]["presence"] == "present"
+
+            status, body = _request(conn, "POST", "/extract/batch", {"texts": NOTES})
+            results = json.loads(body)["results"]
+            assert status == 200 and [r["text"] for r in results] == NOTES
+            for result, reference in zip(results, expected):
+                assert result["signals"] == json.loads(reference.to_json())["signals"]
+
+            status, body = _request(conn, "POST", "/extract", {"text": "x", "backend": "dummy"})
+            assert status == 200 and json.loads(body)["meta"]["llm_backend"] == "dummy"
+
+            assert _request(conn, "POST", "/extract", {"text": 1})[0] == 400
+            assert _request(conn, "POST", "/extract", {"text": "x", "backend": "llm"})[0] == 400
+            assert _request(conn, "POST", "/extract/batch", {"texts": NOTES * 2})[0] == 413
+            assert _request(conn, "GET", "/nope")[0] == 404
+            with service.admit(4):
+                status, body = _request(conn, "POST", "/extract", {"text": "x"})
+                assert status == 503 and "in flight" in json.loads(body)["error"]
+
+            status, body = _request(conn, "GET", "/healthz")
+            assert status == 200 and json.loads(body)["in_flight"] == 0
+
+            status, body = _request(conn, "GET", "/metrics")
+            text = body.decode("utf-8")
+            assert 'dundieplz_server_documents_total{backend="rules"} 4' in text
+            assert 'dundieplz_server_requests_total{endpoint="/extract",code="503"} 1' in text
+            assert "dundieplz_server_rejected_total 1" in text
+            assert 'dundieplz_extract_documents_total{backend="rules",cached="false"} 4' in text
+        finally:
+            conn.close()
+            server.shutdown()
+            server.server_close()
+
+
+def _raw(address, request):
+    with socket.create_connection(address, timeout=10) as sock:
+        sock.sendall(request)
+        data = b""
+        while chunk := sock.recv(65536):  # the server closes after answering
+            data += chunk
+    return data
+
+
+def test_rejected_bodies_close_the_connection():
+    with ExtractionService() as service:
+        server = _running(service)
+        try:
+            # bytes of the refused body must not be parsed as the next request
+            head = b"POST /extract HTTP/1.1\r\nHost: x\r\nContent-Length: 100000000\r\n\r\n"
+            response = _raw(server.server_address, head + b"GET /healthz HTTP/1.1\r\n\r\n")
+            assert response.startswith(b"HTTP/1.1 413") and response.count(b"HTTP/1.1") == 1
+            assert b"Connection: close" in response
+
+            head = b"POST /extract HTTP/1.1\r\nHost: x\r\nContent-Length: -1\r\n\r\n"
+            response = _raw(server.server_address, head)
+            assert response.startswith(b"HTTP/1.1 400") and b"Content-Length: -1" in response
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_worker_pool_over_unix_socket(tmp_path):
+    path = tmp_path / "dundieplz.sock"
+    with ExtractionService(workers=2, chunksize=2) as service:
+        server = _running(service, unix_socket=path)
+        conn = UnixConnection(str(path))
+        try:
+            status, body = _request(conn, "POST", "/extract/batch", {"texts": NOTES * 3})
+            results = json.loads(body)["results"]
+            assert status == 200 and [r["text"] for r in results] == NOTES * 3
+
+            # stage metrics come back from the workers
+            status, body = _request(conn, "GET", "/metrics")
+            assert 'dundieplz_extract_documents_total{backend="rules",cached="false"} 9' in body.decode("utf-8")
+        finally:
+            conn.close()
+            server.shutdown()
+            server.server_close()
+    assert not path.exists()
+
+
+def test_pool_is_rebuilt_after_a_worker_dies():
+    with ExtractionService(workers=1) as service:
+        server = _running(service)
+        conn = http.client.HTTPConnection(*server.server_address)
+        try:
+            assert _request(conn, "GET", "/healthz")[0] == 200
+            for pid in list(service._pool._processes):
+                os.kill(pid, signal.SIGKILL)
+
+            status, body = _request(conn, "POST", "/extract", {"text": NOTES[1]})
+            assert status == 503 and "worker process died" in json.loads(body)["error"]
+            deadline = time.monotonic() + 30
+            while (status := _request(conn, "GET", "/healthz")[0]) != 200:
+                assert status == 503 and time.monotonic() < deadline
+                time.sleep(0.05)
+            assert _request(conn, "POST", "/extract", {"text": NOTES[1]})[0] == 200
+        finally:
+            conn.close()
+            server.shutdown()
+            server.server_close()
+
+
+def test_timeout_answers_504_and_holds_slots():
+    with pytest.raises(ValueError):
+        ExtractionService(timeout=1)
+    run = CliRunner().invoke(app, ["serve", "--timeout", "1"])
+    assert run.exit_code != 0 and "--timeout" in run.output
+
+    long_note = "I want to die. Patient denies plan. " * 20000  # well over the timeout per note
+    with ExtractionService(workers=1, chunksize=1, timeout=0.05) as service:
+        server = _running(service)
+        conn = http.client.HTTPConnection(*server.server_address)
+        try:
+            status, body = _request(conn, "POST", "/extract/batch", {"texts": [long_note] * 3})
+            assert status == 504
+            # the note already in the worker still counts against max_pending
+            assert service.health()["in_flight"] >= 1
+            deadline = time.monotonic() + 30
+            while service.health()["in_flight"]:
+                assert time.monotonic() < deadline
+                time.sleep(0.05)
+        finally:
+            conn.close()
+            server.shutdown()
+            server.server_close()
+
+
+def test_serve_command_stops_on_sigterm(tmp_path):
+    path = tmp_path / "cli.sock"
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "dundieplz.main", "serve", "--unix", str(path)],
+        stderr=subprocess.PIPE,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while not path.exists():
+            assert proc.poll() is None and time.monotonic() < deadline
+            time.sleep(0.05)
+        conn = UnixConnection(str(path))
+        assert _request(conn, "GET", "/healthz")[0] == 200
+        conn.close()
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=10) == 0
+    finally:
+        proc.kill()
+        proc.wait()
+    assert not path.exists()
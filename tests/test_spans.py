@@ -0,0 +1,93 @@
+import random
+from typing import Dict, List, Tuple
+
+from dundieplz.extract.extractor import Extractor
+from dundieplz.extract.rule_llm_client import RuleLLMClient
+from dundieplz.extract.spans import Span, dedupe_contained, dedupe_spans, merge_evidence
+from dundieplz.schemas.extractor_schema import EvidenceSource, EvidenceSpan
+
+
+def _reference_dedupe(spans: List[Span]) -> List[Span]:
+    # The original quadratic RuleLLMClient._dedupe_overlapping_spans.
+    if not spans:
+        return []
+    spans_sorted = sorted(spans, key=lambda s: (s.start, -(s.end - s.start), s.text.lower()))
+    kept: List[Span] = []
+    for sp in spans_sorted:
+        if any(sp.start >= kp.start and sp.end <= kp.end for kp in kept):
+            continue
+        kept.append(sp)
+    kept = sorted(kept, key=lambda s: (s.start, s.end))
+    uniq: Dict[Tuple[int, int, str], Span] = {}
+    for sp in kept:
+        uniq[(sp.start, sp.end, sp.text)] = sp
+    return list(uniq.values())
+
+
+def _random_spans(rng: random.Random) -> List[Span]:
+    width = rng.choice([5, 20, 200])
+    spans = []
+    for _ in range(rng.randint(0, 60)):
+        start = rng.randint(0, width)
+        end = start + rng.randint(0, 12)
+        text = rng.choice(["now", "Now", "NOW", "today", "overdose", ""])
+        spans.append(Span(text=text, start=start, end=end))
+    # Exact duplicates and same-bounds/different-text spans
+    spans += rng.sample(spans, k=min(len(spans), rng.randint(0, 5)))
+    return spans
+
+
+def test_dedupe_spans_matches_reference_on_random_inputs():
+    rng = random.Random(2024)
+    for _ in range(3000):
+        spans = _random_spans(rng)
+        rng.shuffle(spans)
+        assert dedupe_spans(spans) == _reference_dedupe(spans)
+
+
+def test_dedupe_spans_is_order_independent_and_idempotent():
+    rng = random.Random(7)
+    for _ in range(500):
+        spans = _random_spans(rng)
+        once = dedupe_spans(spans)
+        # Bounds never depend on input order (ties on text case may).
+        bounds = [(sp.start, sp.end) for sp in once]
+        assert [(sp.start, sp.end) for sp in dedupe_spans(list(reversed(spans)))] == bounds
+        assert dedupe_spans(once) == once
+        assert all(a.start < b.start and a.end < b.end for a, b in zip(once, once[1:]))
+
+
+def test_rule_client_long_note_with_repeated_mentions():
+    client = RuleLLMClient()
+    text = "Overdose now, today. " * 2000
+    found = client._scan(text)
+    assert len(found["attempt"]) == 2000
+    assert [sp.text for sp in found["temporal_current"][:2]] == ["now", "today"]
+
+
+def test_dedupe_contained_generic_bounds():
+    items = [(0, 10, "a"), (2, 5, "b"), (8, 12, "c"), (8, 12, "d")]
+    kept = dedupe_contained(items, bounds=lambda t: (t[0], t[1]))
+    assert kept == [(0, 10, "a"), (8, 12, "c")]
+
+
+def test_merge_evidence_precedence_and_unlocated():
+    rule = [EvidenceSpan(text="overdose", start=10, end=18, source=EvidenceSource.rule)]
+    cue = [
+        EvidenceSpan(text="overdose", start=10, end=18, source=EvidenceSource.cue_matcher),
+        EvidenceSpan(text="dose", start=14, end=18, source=EvidenceSource.cue_matcher),
+        EvidenceSpan(text="I am done", start=0, end=9, source=EvidenceSource.cue_matcher),
+    ]
+    llm = [EvidenceSpan(text="quote"), EvidenceSpan(text="quote")]
+    merged = merge_evidence(rule, cue, llm)
+    assert [(e.text, e.source) for e in merged] == [
+        ("I am done", EvidenceSource.cue_matcher),
+        ("overdose", EvidenceSource.rule),
+        ("quote", EvidenceSource.llm),
+    ]
+
+
+def test_extractor_merge_evidence_drops_shared_spans():
+    result = Extractor(llm_client=RuleLLMClient()).extract("Overdose yesterday. I am done.")
+    merged = Extractor.merge_evidence(result)
+    assert [(e.text, e.source.value) for e in merged] == [("Overdose", "rule"), ("I am done", "cue_matcher")]
@@ -0,0 +1,49 @@
+import subprocess
+import sys
+
+# Cold-start budget for the CLI module (cumulative -X importtime of
+# dundieplz.ui.cli, best of a few runs). typer itself is ~50 ms; the
+# budget is loose so slow CI machines do not flake, the module checks
+# below are what catch a heavy import creeping back in.
+CLI_IMPORT_BUDGET_US = 400_000
+
+HEAVY = {
+    "pydantic",
+    "asyncio",
+    "multiprocessing",
+    "rich",
+    "streamlit",
+    "openai",
+    "dotenv",
+    "dundieplz.extract.extractor",
+}
+
+
+def _importtime(*args):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_imports_no_heavy_modules_and_fits_budget():
+    runs = [_importtime("-c", "import dundieplz.ui.cli") for _ in range(3)]
+    assert HEAVY.isdisjoint(runs[0])
+    assert min(run["dundieplz.ui.cli"] for run in runs) < CLI_IMPORT_BUDGET_US
+
+    assert HEAVY.isdisjoint(_importtime("-m", "dundieplz.main", "--help"))
+
+
+def test_extractor_defers_async_process_and_profiling_imports():
+    loaded = _importtime("-c", "import dundieplz.extract.extractor")
+    assert {"asyncio", "multiprocessing", "cProfile", "pstats", "tracemalloc"}.isdisjoint(loaded)